@@ -32,9 +32,10 @@ services.display_controller.show(
     services.display_adapter.info("App Startup", "Initializing...")
 )
 
-# Recover any incomplete log segments from previous runs
+# Recover any incomplete log segments from previous runs (in the background)
 from system.log_recovery_service import recover_incomplete_segments
-recover_incomplete_segments()
+services.merge_worker.submit("startup recovery", recover_incomplete_segments)
+services.merge_worker.submit("catalog reconcile", services.log_catalog.reconcile)
 
 from system.routes import system_bp
 from gasera.routes import gasera_bp
@@ -1,8 +1,11 @@
 # gasera/acquisition/actions.py
+from __future__ import annotations
+
 from system.log_utils import info, warn
 from gasera.acquisition.motor import MotorAcquisitionEngine
 from gasera.acquisition.mux import MuxAcquisitionEngine
 from gasera.acquisition.base import BaseAcquisitionEngine
+from gasera.acquisition.task_queue import QueuedTask
 
 
 class EngineActions:
@@ -14,9 +17,12 @@ class EngineActions:
     def __init__(self, engine: BaseAcquisitionEngine):
         self._engine = engine
 
-    def start(self) -> tuple[bool, str]:
-        info("[ENGINE] Start requested")
-        ok, msg = self._engine.start()
+    def start(self, queued: QueuedTask | None = None) -> tuple[bool, str]:
+        if queued is not None:
+            info(f"[ENGINE] Start requested for queued task {queued.task_id}")
+        else:
+            info("[ENGINE] Start requested")
+        ok, msg = self._engine.start(queued)
         if not ok:
             warn(f"[ENGINE] Start rejected: {msg}")
         return ok, msg
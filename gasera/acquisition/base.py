@@ -8,25 +8,29 @@
 
 from __future__ import annotations
 
-import time
 import threading
 
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
-from typing import List, Optional, Callable
+from typing import Optional, Callable
 
 from system import services
+from gasera import clock
 from gasera.controller import TaskIDs
 from gasera.engine_timer import EngineTimer
 from gasera.motion.iface import MotionInterface
 from system.log_utils import debug, info, warn, error
-from gasera.measurement_logger import MeasurementLogger
+from gasera.log_writer import AsyncLogWriter
+from gasera.live_sample import LiveSample
 from gasera.acquisition.task_event import TaskEvent
+from gasera.acquisition.dispatcher import EventDispatcher
 from gasera.acquisition.phase import Phase
-from gasera.acquisition.progress import Progress
+from gasera.acquisition.progress import Progress, ProgressPublisher, ProgressSnapshot
 from gasera.acquisition.progress_view import ProgressView
+from gasera.acquisition.task_queue import QueuedTask, QueuedTaskStatus, TaskQueue
 
 from system.preferences import (
+    KEY_LOG_MIRROR_INTERNAL,
     KEY_MEASUREMENT_DURATION,
     KEY_MEASUREMENT_START_MODE,
     KEY_MOTOR_TIMEOUT,
@@ -49,6 +53,8 @@ class TaskConfig:
     measurement_start_mode: Optional[MeasurementStartMode] = MeasurementStartMode.PER_CYCLE
 
 class BaseAcquisitionEngine(ABC):
+    supports_task_queue = False          # engine can run queued tasks unattended
+
     def __init__(self, motion: MotionInterface):
         self.motion = motion
         self._worker: Optional[threading.Thread] = None
@@ -56,44 +62,56 @@ class BaseAcquisitionEngine(ABC):
         self._finish_event = threading.Event()   # graceful end
         self._repeat_event = threading.Event()
         self._lock = threading.RLock()
-        self.logger: Optional[MeasurementLogger] = None
+        self.logger: Optional[AsyncLogWriter] = None
 
         self.cfg: Optional[TaskConfig] = None
-        self.progress = Progress()
-        self._progress_subs: List[Callable] = []
-        self._task_event_subs: List[Callable] = []
+        self.progress = Progress()             # engine-private working copy
+        self._progress_pub = ProgressPublisher(self.progress)
+        self._duration_key: Optional[tuple] = None
+        self._dispatcher = EventDispatcher()
 
         self._last_notified_channel: int = -1
         self._task_timer = EngineTimer()     # measures task active time
 
-    def subscribe_progress_updates(self, cb: Callable[[Progress], None]) -> None:
-        self._progress_subs.append(cb)
+        self.task_queue: Optional[TaskQueue] = None
+        self._queued_task: Optional[QueuedTask] = None  # set while running a queued task
+
+    def subscribe_progress_updates(self, cb: Callable[[ProgressSnapshot], None]) -> None:
+        self._dispatcher.subscribe_progress(cb)
 
     def subscribe_task_events(self, cb: Callable[[TaskEvent], None]) -> None:
-        self._task_event_subs.append(cb)
+        self._dispatcher.subscribe_events(cb)
+
+    def get_dispatch_stats(self) -> dict:
+        """Per-subscriber delivery counters (delivered / coalesced / dropped / lag)."""
+        return self._dispatcher.stats()
 
     def _get_elapsed_seconds(self) -> float:
         """Return elapsed seconds for progress display."""
         return self._task_timer.elapsed()
 
+    def progress_snapshot(self) -> ProgressSnapshot:
+        """Latest published (immutable) progress; O(1), safe from any thread."""
+        return self._progress_pub.current
+
     def _emit_progress_updates(self):
         self.progress.elapsed_seconds = self._get_elapsed_seconds()
-        from gasera.acquisition.progress_view import ProgressView
-        pv = ProgressView(self.progress)
-        self.progress.duration_str = pv.duration_label
 
-        for cb in self._progress_subs:
-            try:
-                cb(self.progress)
-            except Exception:
-                pass
+        # duration label only changes with whole seconds / total time
+        duration_key = (int(self.progress.elapsed_seconds), self.progress.tt_seconds)
+        if duration_key != self._duration_key:
+            self._duration_key = duration_key
+            self.progress.duration_str = ProgressView(self.progress).duration_label
+
+        snapshot = self._progress_pub.publish(self.progress)
+        if snapshot is None:
+            return
+
+        # delivered on subscriber threads; never blocks the engine
+        self._dispatcher.publish_progress(snapshot)
 
     def _emit_task_events(self, event: TaskEvent):
-        for cb in self._task_event_subs:
-            try:
-                cb(event)
-            except Exception:
-                pass
+        self._dispatcher.publish_event(event)
 
     # -----------------------------
     #
@@ -116,41 +134,62 @@ class BaseAcquisitionEngine(ABC):
             measurement_start_mode = raw_mode
         )
 
+        # queued tasks carry their own timing; preferences only fill the rest
+        task = self._queued_task
+        if task is not None:
+            cfg.measure_seconds = task.measure_seconds
+            cfg.pause_seconds = task.pause_seconds
+            cfg.repeat_count = task.repeat_count
+
         self.cfg = cfg
         
         return True, "Configuration valid"
 
-    def start(self) -> tuple[bool, str]:
+    def _load_task_config(self) -> tuple[bool, str]:
+        self.progress.reset_all() # clear previous state right here before load config
+        self._duration_key = None
+        return self._validate_and_load_config()
+
+    def start(self, queued: Optional[QueuedTask] = None) -> tuple[bool, str]:
         with self._lock:
             if self.is_running():
                 warn("[ENGINE] start requested but already running")
                 services.buzzer_service.play("busy")
                 return False, "Measurement already running"
 
-            self.progress.reset_all() # clear previous state right here before load config
-            ok, msg = self._validate_and_load_config()
+            if queued is not None and not self.supports_task_queue:
+                return False, "Task queue not supported by this engine"
+
+            self._queued_task = queued
+            ok, msg = self._load_task_config()
             if not ok:
+                self._queued_task = None
                 services.buzzer_service.play("invalid")
                 return False, msg
 
             ok, msg = self._apply_online_mode_preference()
             if not ok:
+                self._queued_task = None
                 services.buzzer_service.play("error")
                 return False, msg
 
             ok, msg = self._on_start_prepare()
             if not ok:
+                self._queued_task = None
                 services.buzzer_service.play("error")
                 return False, msg
 
+            self._mark_queued(QueuedTaskStatus.RUNNING)
+
             # Initialize logging
-            self.logger = MeasurementLogger()
+            self.logger = self._new_logger()
 
             self._stop_event.clear()
             self._finish_event.clear()
             self._repeat_event.clear()
 
             self._worker = threading.Thread(target=self._run_loop_wrapper, daemon=True)
+            clock.register(self._worker)
             self._worker.start()
 
             return True, "Measurement Task started"
@@ -217,22 +256,66 @@ class BaseAcquisitionEngine(ABC):
     # Worker wrapper
     # -----------------------------
     def _run_loop_wrapper(self):
-        assert self.cfg is not None
-        info(
-            f"[ENGINE] start: measure={self.cfg.measure_seconds}s, pause={self.cfg.pause_seconds}s, "
-            f"repeat={self.cfg.repeat_count}, enabled_channels={self.progress.enabled_count}, motion_timeout={self.cfg.motion_timeout}s"
-        )
+        while True:
+            assert self.cfg is not None
+            info(
+                f"[ENGINE] start: measure={self.cfg.measure_seconds}s, pause={self.cfg.pause_seconds}s, "
+                f"repeat={self.cfg.repeat_count}, enabled_channels={self.progress.enabled_count}, motion_timeout={self.cfg.motion_timeout}s"
+            )
 
-        try:
-            self._task_timer.reset()
-            self._run_loop()
-        except Exception as e:
-            error(f"[ENGINE] unhandled exception: {e}")
-            self._stop_event.set()
-        finally:
-            self._finalize_run()
+            next_task = None
+            try:
+                self._task_timer.reset()
+                self._run_loop()
+            except Exception as e:
+                error(f"[ENGINE] unhandled exception: {e}")
+                self._stop_event.set()
+            finally:
+                next_task = self._next_chained_task()
+                self._finalize_run(keep_measuring=next_task is not None)
+
+            if next_task is None or not self._chain_task(next_task):
+                break
 
-    def _finalize_run(self) -> None:
+    def _next_chained_task(self) -> Optional[QueuedTask]:
+        """Ready queued task to run right after the current one (queued runs only)."""
+        if self._queued_task is None or self.task_queue is None:
+            return None
+        if self._stop_event.is_set() or self.check_gasera_stopped():
+            return None
+        if self.progress.repeat_index < (self.cfg.repeat_count or 0):
+            return None     # run ended early; let the scheduler restart cleanly
+        return self.task_queue.next_ready()
+
+    def _chain_task(self, task: QueuedTask) -> bool:
+        """
+        Switch to the next queued task without stopping Gasera.
+        The analyzer keeps measuring, so there is no idle gap between tasks.
+        """
+        with self._lock:
+            self._queued_task = task
+            ok, msg = self._load_task_config()
+            if not ok:
+                warn(f"[ENGINE] queued task {task.task_id} rejected: {msg}")
+                self._mark_queued(QueuedTaskStatus.FAILED, msg)
+                self._queued_task = None
+                self._stop_measurement()
+                return False
+
+            info(f"[ENGINE] chaining queued task {task.task_id}")
+            self._mark_queued(QueuedTaskStatus.RUNNING)
+            self._emit_task_events(TaskEvent.TASK_STARTED)
+
+            self.logger = self._new_logger()
+            self._finish_event.clear()
+            self._repeat_event.clear()
+            return True
+
+    def _mark_queued(self, status: str, message: str = "") -> None:
+        if self._queued_task is not None and self.task_queue is not None:
+            self.task_queue.mark(self._queued_task, status, message)
+
+    def _finalize_run(self, keep_measuring: bool = False) -> None:
         # 1. Let subclass finalize its summary numbers
         self._task_timer.pause()
         pv = ProgressView(self.progress)
@@ -241,23 +324,29 @@ class BaseAcquisitionEngine(ABC):
         # 2. Resolve final state
         if self._stop_event.is_set():
             self._stop_event.clear()
+            self._mark_queued(QueuedTaskStatus.ABORTED)
             self._set_phase(Phase.ABORTED)
             self._emit_task_events(TaskEvent.TASK_ABORTED)
             services.buzzer_service.play("cancel")
             info("[ENGINE] Measurement run aborted by user")
         else:
+            self._mark_queued(QueuedTaskStatus.DONE)
             self._set_phase(Phase.IDLE)
             self._emit_task_events(TaskEvent.TASK_FINISHED)
             services.buzzer_service.play("completed")
             info("[ENGINE] Measurement run complete")
+        self._queued_task = None
 
-        # 3. Ensure Gasera is stopped
-        if not self.check_gasera_idle():
+        # 3. Ensure Gasera is stopped (unless the next queued task takes over)
+        if keep_measuring:
+            debug("[ENGINE] next queued task ready, keeping Gasera measuring")
+        elif not self.check_gasera_idle():
             if not self._stop_measurement():
                 warn("[ENGINE] Failed to stop Gasera during finalization")
 
-        # 4. Close logger
+        # 4. Write out queued rows, then close logger
         if self.logger:
+            self.logger.drain()
             self.logger.close()
             self.logger = None
 
@@ -272,7 +361,7 @@ class BaseAcquisitionEngine(ABC):
             desired_online_mode = not save_on_gasera  # invert semantics for SONL
             resp_online = services.gasera_controller.set_online_mode(desired_online_mode)
             info(f"[ENGINE] Save On Gasera is {'enabled' if save_on_gasera else 'disabled'} resp={resp_online}")
-            time.sleep(GASERA_CMD_SETTLE_TIME)
+            clock.sleep(GASERA_CMD_SETTLE_TIME)
             return True, "SONL mode applied"
         except Exception as e:
             warn(f"[ENGINE] Failed to apply SONL mode before start: {e}")
@@ -288,7 +377,9 @@ class BaseAcquisitionEngine(ABC):
             error(f"[ENGINE] Gasera start_measurement failed: {msg}")
             return False, msg
 
-        time.sleep(GASERA_CMD_SETTLE_TIME)
+        services.device_status_service.expect_transition()
+
+        clock.sleep(GASERA_CMD_SETTLE_TIME)
         return True, "Gasera measurement started"
 
     def _stop_measurement(self) -> bool:
@@ -301,7 +392,9 @@ class BaseAcquisitionEngine(ABC):
             error(f"[ENGINE] Gasera stop_measurement failed: {msg}")
             return False
 
-        time.sleep(GASERA_CMD_SETTLE_TIME)
+        services.device_status_service.expect_transition()
+
+        clock.sleep(GASERA_CMD_SETTLE_TIME)
         return True
 
     def check_gasera_stopped(self) -> bool:
@@ -323,20 +416,20 @@ class BaseAcquisitionEngine(ABC):
         return False
 
     def _blocking_wait(self, duration: float, notify: bool = True) -> bool:
-        end_time = time.monotonic() + max(0.0, duration)
+        end_time = clock.monotonic() + max(0.0, duration)
         base_interval = 0.5 if duration < 10 else 1.0
         while True:
             if self._stop_event.is_set():
                 return False
 
-            remaining = end_time - time.monotonic()
+            remaining = end_time - clock.monotonic()
             if remaining <= 0:
                 break
 
             if notify:
                 self._emit_progress_updates()
 
-            time.sleep(min(base_interval, remaining))
+            clock.sleep(min(base_interval, remaining))
         return True
 
     def _set_phase(self, phase: str):
@@ -379,12 +472,17 @@ class BaseAcquisitionEngine(ABC):
 
         return ok
 
-    def on_live_data(self, live_data) -> bool:
-        """Shared live data sink (logger dedupe logic lives in MeasurementLogger)."""
-        if not live_data or not live_data.get("components"):
+    def _new_logger(self) -> AsyncLogWriter:
+        prefs = services.preferences_service
+        mirror = prefs.get_bool(KEY_LOG_MIRROR_INTERNAL, False) if prefs is not None else False
+        return AsyncLogWriter(mirror_internal=mirror)
+
+    def on_live_data(self, sample: LiveSample) -> bool:
+        """Shared live data sink: dedupes and queues; rows are written on the logger's threads."""
+        if sample is None or not sample.cas:
             return False
 
         if self.logger:
-            return self.logger.write_measurement(live_data)
+            return self.logger.write_measurement(sample)
 
         return True
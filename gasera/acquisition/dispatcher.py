@@ -0,0 +1,195 @@
+# gasera/acquisition/dispatcher.py
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List
+
+from system.log_utils import debug, warn
+
+_PROGRESS = object()    # queue marker: "deliver the latest progress value"
+
+
+class _Subscriber:
+    """
+    One worker thread per subscribing object.
+
+    Callbacks bound to the same object (e.g. DisplayAdapter.from_progress and
+    DisplayAdapter.from_task_event) share a worker, so they are never invoked
+    concurrently and keep their relative order.
+    """
+
+    def __init__(self, name: str, max_events: int):
+        self.name = name
+        self._max_events = max_events
+        self._cond = threading.Condition()
+        self._queue: deque = deque()
+        self._queued_events = 0
+
+        self._progress_cbs: List[Callable[[Any], None]] = []
+        self._event_cbs: List[Callable[[Any], None]] = []
+
+        self._progress_value: Any = None
+        self._progress_at = 0.0
+        self._progress_queued = False
+
+        self._stats: Dict[str, Any] = {
+            "delivered": 0,
+            "coalesced": 0,
+            "dropped": 0,
+            "errors": 0,
+            "max_depth": 0,
+            "last_lag_ms": 0.0,
+            "max_lag_ms": 0.0,
+        }
+
+        self._thread = threading.Thread(target=self._run, daemon=True, name=f"dispatch-{name}")
+        self._thread.start()
+
+    # producer side (never blocks on the consumer)
+    def offer_progress(self, value: Any) -> None:
+        with self._cond:
+            self._progress_value = value
+            self._progress_at = time.monotonic()
+            if self._progress_queued:
+                self._stats["coalesced"] += 1
+                if self._queue[-1][0] is _PROGRESS:
+                    return
+                # the newer value may already reflect events queued after the
+                # slot, so the slot moves behind them
+                self._remove_progress_slot()
+            self._progress_queued = True
+            self._queue.append((_PROGRESS, None, 0.0))
+            self._note_depth()
+            self._cond.notify()
+
+    def offer_event(self, event: Any) -> None:
+        with self._cond:
+            if self._queued_events >= self._max_events:
+                self._drop_oldest_event()
+            self._queue.append((self._event_cbs, event, time.monotonic()))
+            self._queued_events += 1
+            self._note_depth()
+            self._cond.notify()
+
+    def _remove_progress_slot(self) -> None:
+        for i, item in enumerate(self._queue):
+            if item[0] is _PROGRESS:
+                del self._queue[i]
+                return
+
+    def _drop_oldest_event(self) -> None:
+        for i, item in enumerate(self._queue):
+            if item[0] is not _PROGRESS:
+                del self._queue[i]
+                self._queued_events -= 1
+                self._stats["dropped"] += 1
+                warn(f"[DISPATCH] {self.name} lagging, dropped oldest task event")
+                return
+
+    def _note_depth(self) -> None:
+        depth = len(self._queue)
+        if depth > self._stats["max_depth"]:
+            self._stats["max_depth"] = depth
+
+    # consumer side
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._queue:
+                    self._cond.wait()
+                kind, value, queued_at = self._queue.popleft()
+                if kind is _PROGRESS:
+                    self._progress_queued = False
+                    callbacks = self._progress_cbs
+                    value = self._progress_value
+                    queued_at = self._progress_at
+                else:
+                    self._queued_events -= 1
+                    callbacks = kind
+
+            for cb in list(callbacks):
+                try:
+                    cb(value)
+                except Exception as e:
+                    with self._cond:
+                        self._stats["errors"] += 1
+                    debug(f"[DISPATCH] {self.name} callback error: {e}")
+
+            lag_ms = (time.monotonic() - queued_at) * 1000.0
+            with self._cond:
+                self._stats["delivered"] += 1
+                self._stats["last_lag_ms"] = round(lag_ms, 2)
+                if lag_ms > self._stats["max_lag_ms"]:
+                    self._stats["max_lag_ms"] = round(lag_ms, 2)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            out = dict(self._stats)
+            out["depth"] = len(self._queue)
+        return out
+
+
+class EventDispatcher:
+    """
+    Fans engine notifications out to subscribers off the publishing thread.
+
+    - progress: latest-value slot per subscriber (intermediate values are coalesced);
+      the slot moves behind task events queued before the latest value
+    - task events: bounded FIFO per subscriber, delivered in order;
+      on overflow the oldest pending event is dropped and counted
+    - publish_* never blocks, so a slow display or misbehaving callback
+      cannot delay engine timing
+    """
+
+    def __init__(self, max_events: int = 256):
+        self._max_events = max_events
+        self._lock = threading.Lock()
+        self._subscribers: Dict[int, _Subscriber] = {}
+        self._owners: Dict[int, Any] = {}   # keep owners alive so ids stay unique
+
+    def _subscriber_for(self, cb: Callable) -> _Subscriber:
+        # a falsy owner (e.g. an empty container's method) is still the owner
+        owner = getattr(cb, "__self__", None)
+        if owner is None:
+            owner = cb
+        key = id(owner)
+        with self._lock:
+            sub = self._subscribers.get(key)
+            if sub is None:
+                name = type(owner).__name__ if hasattr(cb, "__self__") else getattr(cb, "__name__", "callback")
+                taken = sum(1 for s in self._subscribers.values() if s.name.split("#")[0] == name)
+                if taken:
+                    name = f"{name}#{taken + 1}"
+                sub = _Subscriber(name, self._max_events)
+                self._subscribers[key] = sub
+                self._owners[key] = owner
+            return sub
+
+    def subscribe_progress(self, cb: Callable[[Any], None]) -> None:
+        sub = self._subscriber_for(cb)
+        with sub._cond:
+            sub._progress_cbs.append(cb)
+
+    def subscribe_events(self, cb: Callable[[Any], None]) -> None:
+        sub = self._subscriber_for(cb)
+        with sub._cond:
+            sub._event_cbs.append(cb)
+
+    def publish_progress(self, value: Any) -> None:
+        for sub in self._snapshot():
+            if sub._progress_cbs:
+                sub.offer_progress(value)
+
+    def publish_event(self, event: Any) -> None:
+        for sub in self._snapshot():
+            if sub._event_cbs:
+                sub.offer_event(event)
+
+    def _snapshot(self) -> List[_Subscriber]:
+        with self._lock:
+            return list(self._subscribers.values())
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {sub.name: sub.stats() for sub in self._snapshot()}
@@ -28,6 +28,7 @@ class MuxAcquisitionEngine(BaseAcquisitionEngine):
     """
 
     TOTAL_CHANNELS = 31
+    supports_task_queue = True
 
     def __init__(self, motion: MotionInterface):
         super().__init__(motion)
@@ -37,7 +38,10 @@ class MuxAcquisitionEngine(BaseAcquisitionEngine):
 
         prefs = services.preferences_service
 
-        include_mask = prefs.get(KEY_INCLUDE_CHANNELS, [ChannelState.ACTIVE] * self.TOTAL_CHANNELS)
+        if self._queued_task is not None:
+            include_mask = self._queued_task.include_channels
+        else:
+            include_mask = prefs.get(KEY_INCLUDE_CHANNELS, [ChannelState.ACTIVE] * self.TOTAL_CHANNELS)
         self.cfg.include_channels = list(include_mask)
 
         self.progress.enabled_count = sum(1 for s in self.cfg.include_channels if s > ChannelState.INACTIVE)
@@ -134,7 +138,9 @@ class MuxAcquisitionEngine(BaseAcquisitionEngine):
         # Mark channel as sampled (memory only, no disk write)
         channel = self.progress.current_channel
         self.cfg.include_channels[channel] = ChannelState.SAMPLED
-        services.preferences_service.update_from_dict({KEY_INCLUDE_CHANNELS: self.cfg.include_channels}, write_disk=False)
+        if self._queued_task is None:
+            # queued tasks carry their own mask; leave the user's channel selection alone
+            services.preferences_service.update_from_dict({KEY_INCLUDE_CHANNELS: self.cfg.include_channels}, write_disk=False)
         debug(f"[ENGINE] Channel {channel} marked as sampled")
 
         return True
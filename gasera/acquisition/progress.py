@@ -1,9 +1,12 @@
-from typing import Optional
+import json
+import threading
+from typing import Any, Optional
 from gasera.acquisition.phase import Phase
 
 class Progress:
     """
     Frontend contract (keep stable).
+    Engine-private working copy: consumers receive ProgressSnapshot instead.
     Snapshot-safe: do NOT add non-serializable fields.
     """
     def __init__(self):
@@ -31,3 +34,76 @@ class Progress:
 
     def to_dict(self) -> dict:
         return dict(self.__dict__)
+
+
+PROGRESS_FIELDS = tuple(Progress().__dict__.keys())
+
+
+class ProgressSnapshot:
+    """
+    Immutable, versioned copy of Progress.
+    - Same attribute names as Progress (ProgressView works on both)
+    - version increases monotonically with every published change
+    - dict / JSON serializations are built once and cached
+    """
+    __slots__ = PROGRESS_FIELDS + ("version", "_values", "_dict", "_json")
+
+    def __init__(self, values: tuple, version: int):
+        set_ = object.__setattr__
+        for name, value in zip(PROGRESS_FIELDS, values):
+            set_(self, name, value)
+        set_(self, "version", version)
+        set_(self, "_values", values)
+        set_(self, "_dict", None)
+        set_(self, "_json", None)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("ProgressSnapshot is immutable")
+
+    def changed_since(self, version: int) -> bool:
+        return self.version > version
+
+    def to_dict(self) -> dict:
+        """Cached dict view. Do not mutate; copy() before adding keys."""
+        if self._dict is None:
+            d = dict(zip(PROGRESS_FIELDS, self._values))
+            d["version"] = self.version
+            object.__setattr__(self, "_dict", d)
+        return self._dict
+
+    def to_json(self) -> str:
+        if self._json is None:
+            object.__setattr__(self, "_json", json.dumps(self.to_dict(), sort_keys=True))
+        return self._json
+
+
+class ProgressPublisher:
+    """
+    Turns the mutable working Progress into published snapshots.
+    The current snapshot is swapped atomically (single reference assignment),
+    so readers never observe a half-updated state.
+    """
+    def __init__(self, progress: Progress):
+        self._lock = threading.Lock()
+        self._version = 0
+        self._current = ProgressSnapshot(self._values_of(progress), 0)
+
+    @staticmethod
+    def _values_of(progress: Progress) -> tuple:
+        d = progress.__dict__
+        return tuple(d.get(name) for name in PROGRESS_FIELDS)
+
+    def publish(self, progress: Progress) -> Optional[ProgressSnapshot]:
+        """Publish a new snapshot if anything changed; return it, else None."""
+        values = self._values_of(progress)
+        with self._lock:
+            if values == self._current._values:
+                return None
+            self._version += 1
+            snap = ProgressSnapshot(values, self._version)
+            self._current = snap
+        return snap
+
+    @property
+    def current(self) -> ProgressSnapshot:
+        return self._current
@@ -1,13 +1,13 @@
 # gasera/acquisition/progress_view.py
 
 from dataclasses import dataclass
-from typing import Optional
-from gasera.acquisition.progress import Progress
+from typing import Optional, Union
+from gasera.acquisition.progress import Progress, ProgressSnapshot
 from system.utils import format_duration, format_consistent_pair
 
 @dataclass(frozen=True)
 class ProgressView:
-    p: Progress
+    p: Union[Progress, ProgressSnapshot]
 
     # -----------------------------
     # Channels / Steps
@@ -0,0 +1,264 @@
+# gasera/acquisition/task_queue.py
+from __future__ import annotations
+
+import json
+import threading
+import uuid
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from gasera import clock
+from system.log_utils import debug, info, warn, error
+from system.preferences import (
+    ChannelState,
+    KEY_INCLUDE_CHANNELS,
+    KEY_MEASUREMENT_DURATION,
+    KEY_PAUSE_SECONDS,
+    KEY_REPEAT_COUNT,
+)
+
+MAX_FINISHED_HISTORY = 50   # finished/cancelled tasks kept for the UI
+
+
+class QueuedTaskStatus:
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    ABORTED = "aborted"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+    FINISHED = (DONE, ABORTED, FAILED, CANCELLED)
+
+
+@dataclass
+class QueuedTask:
+    """One unattended measurement task with its own configuration."""
+    task_id: str
+    include_channels: List[int]
+    measure_seconds: int
+    pause_seconds: int
+    repeat_count: int
+    start_at: Optional[float] = None        # epoch seconds; None = as soon as possible
+    status: str = QueuedTaskStatus.PENDING
+    message: str = ""
+    submitted_at: float = field(default_factory=clock.now)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    def is_ready(self, now: float) -> bool:
+        return self.status == QueuedTaskStatus.PENDING and (self.start_at is None or self.start_at <= now)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "QueuedTask":
+        return cls(**{k: d[k] for k in cls.__dataclass_fields__ if k in d})
+
+
+def _parse_start_at(value: Any) -> Optional[float]:
+    if value in (None, ""):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        return datetime.fromisoformat(value.replace(" ", "T")).timestamp()
+    raise ValueError(f"invalid start_at: {value!r}")
+
+
+def _positive_int(spec: Dict[str, Any], key: str, default: Any, minimum: int) -> int:
+    try:
+        value = int(spec.get(key, default))
+    except (TypeError, ValueError):
+        raise ValueError(f"{key} must be an integer")
+    if value < minimum:
+        raise ValueError(f"{key} must be >= {minimum}")
+    return value
+
+
+class TaskQueue:
+    """
+    Persistent FIFO of measurement tasks (JSON file, like Preferences).
+
+    Tasks run in submission order once their optional start time has passed.
+    The engine chains ready tasks back-to-back; the scheduler thread only
+    starts the engine when it is idle.
+    """
+
+    def __init__(self, filename: str = "config/task_queue.json", max_channels: Optional[int] = None):
+        self.file = Path(filename)
+        self.max_channels = max_channels      # channels the engine can drive; None = unchecked
+        self._lock = threading.RLock()
+        self._tasks: List[QueuedTask] = []
+        self._version = 0
+        self._scheduler: Optional[threading.Thread] = None
+        self._load()
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+    def _load(self) -> None:
+        if not self.file.exists():
+            return
+        try:
+            with open(self.file, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+            self._tasks = [QueuedTask.from_dict(t) for t in raw.get("tasks", [])]
+        except Exception as e:
+            error(f"[QUEUE] load failed: {e}")
+            self._tasks = []
+            return
+
+        # a task that was running when the service stopped did not complete
+        for task in self._tasks:
+            if task.status == QueuedTaskStatus.RUNNING:
+                task.status = QueuedTaskStatus.ABORTED
+                task.message = "interrupted by restart"
+                task.finished_at = clock.now()
+
+        pending = sum(1 for t in self._tasks if t.status == QueuedTaskStatus.PENDING)
+        info(f"[QUEUE] loaded {len(self._tasks)} task(s), {pending} pending")
+
+    def _save(self) -> None:
+        try:
+            self.file.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.file.with_suffix(".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"tasks": [t.to_dict() for t in self._tasks]}, f, indent=2)
+            tmp.replace(self.file)
+        except Exception as e:
+            error(f"[QUEUE] save failed: {e}")
+
+    def _changed(self) -> None:
+        finished = [t for t in self._tasks if t.status in QueuedTaskStatus.FINISHED]
+        if len(finished) > MAX_FINISHED_HISTORY:
+            drop = {id(t) for t in finished[:len(finished) - MAX_FINISHED_HISTORY]}
+            self._tasks = [t for t in self._tasks if id(t) not in drop]
+        self._version += 1
+        self._save()
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def submit(self, specs: List[Dict[str, Any]], defaults: Dict[str, Any]) -> List[QueuedTask]:
+        """
+        Validate and append task specs. Missing keys fall back to `defaults`
+        (the preference values at submit time). Raises ValueError on bad input.
+        """
+        if not isinstance(specs, list) or not specs:
+            raise ValueError("tasks must be a non-empty list")
+
+        tasks = []
+        for spec in specs:
+            if not isinstance(spec, dict):
+                raise ValueError("each task must be an object")
+
+            mask = spec.get(KEY_INCLUDE_CHANNELS, defaults.get(KEY_INCLUDE_CHANNELS))
+            if not isinstance(mask, list) or not mask:
+                raise ValueError(f"{KEY_INCLUDE_CHANNELS} must be a non-empty list")
+            if self.max_channels is not None and len(mask) > self.max_channels:
+                raise ValueError(f"{KEY_INCLUDE_CHANNELS} has {len(mask)} entries, the engine supports {self.max_channels}")
+            mask = [ChannelState.ACTIVE if s else ChannelState.INACTIVE for s in mask]
+            if not any(mask):
+                raise ValueError("no channels enabled")
+
+            tasks.append(QueuedTask(
+                task_id=uuid.uuid4().hex[:8],
+                include_channels=mask,
+                measure_seconds=_positive_int(spec, KEY_MEASUREMENT_DURATION, defaults.get(KEY_MEASUREMENT_DURATION, 300), 1),
+                pause_seconds=_positive_int(spec, KEY_PAUSE_SECONDS, defaults.get(KEY_PAUSE_SECONDS, 300), 0),
+                repeat_count=_positive_int(spec, KEY_REPEAT_COUNT, defaults.get(KEY_REPEAT_COUNT, 1), 1),
+                start_at=_parse_start_at(spec.get("start_at")),
+            ))
+
+        with self._lock:
+            self._tasks.extend(tasks)
+            self._changed()
+
+        info(f"[QUEUE] submitted {len(tasks)} task(s)")
+        return tasks
+
+    def cancel(self, task_id: str) -> bool:
+        with self._lock:
+            for task in self._tasks:
+                if task.task_id == task_id and task.status == QueuedTaskStatus.PENDING:
+                    task.status = QueuedTaskStatus.CANCELLED
+                    task.finished_at = clock.now()
+                    self._changed()
+                    return True
+        return False
+
+    def clear_pending(self) -> int:
+        with self._lock:
+            pending = [t for t in self._tasks if t.status == QueuedTaskStatus.PENDING]
+            for task in pending:
+                task.status = QueuedTaskStatus.CANCELLED
+                task.finished_at = clock.now()
+            if pending:
+                self._changed()
+        return len(pending)
+
+    def next_ready(self, now: Optional[float] = None) -> Optional[QueuedTask]:
+        now = clock.now() if now is None else now
+        with self._lock:
+            for task in self._tasks:
+                if task.is_ready(now):
+                    return task
+        return None
+
+    def mark(self, task: QueuedTask, status: str, message: str = "") -> None:
+        with self._lock:
+            task.status = status
+            task.message = message
+            if status == QueuedTaskStatus.RUNNING:
+                task.started_at = clock.now()
+            elif status in QueuedTaskStatus.FINISHED:
+                task.finished_at = clock.now()
+            self._changed()
+        debug(f"[QUEUE] task {task.task_id} -> {status}")
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def state(self) -> Dict[str, Any]:
+        with self._lock:
+            running = next((t.task_id for t in self._tasks if t.status == QueuedTaskStatus.RUNNING), None)
+            return {
+                "version": self._version,
+                "running": running,
+                "pending": sum(1 for t in self._tasks if t.status == QueuedTaskStatus.PENDING),
+                "tasks": [t.to_dict() for t in self._tasks],
+            }
+
+    # ------------------------------------------------------------------
+    # Scheduler
+    # ------------------------------------------------------------------
+    def start_scheduler(self, is_running: Callable[[], bool], start: Callable[[QueuedTask], tuple], interval: float = 1.0) -> None:
+        """Start idle-engine tasks when they become ready (chaining is done by the engine)."""
+        if self._scheduler and self._scheduler.is_alive():
+            return
+
+        def _loop():
+            while True:
+                try:
+                    if not is_running():
+                        task = self.next_ready()
+                        if task is not None:
+                            ok, msg = start(task)
+                            if not ok and is_running():
+                                # a manual start won the race: keep the task queued
+                                debug(f"[QUEUE] task {task.task_id} deferred, engine busy")
+                            elif not ok:
+                                warn(f"[QUEUE] task {task.task_id} failed to start: {msg}")
+                                self.mark(task, QueuedTaskStatus.FAILED, msg)
+                except Exception as e:
+                    error(f"[QUEUE] scheduler error: {e}")
+                clock.sleep(interval)
+
+        self._scheduler = threading.Thread(target=_loop, daemon=True, name="task-queue")
+        clock.register(self._scheduler)
+        self._scheduler.start()
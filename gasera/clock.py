@@ -0,0 +1,183 @@
+# gasera/clock.py
+"""
+Pluggable time source for the engine, logger, live status service and simulator.
+
+Production code uses the module-level helpers (clock.monotonic(), clock.sleep(), ...),
+which delegate to the active clock:
+
+- SystemClock: real time (default)
+- VirtualClock: discrete-event simulated time; a multi-day schedule runs as
+  fast as the CPU allows
+
+Usage:
+    from gasera import clock
+    clock.set_clock(clock.VirtualClock())
+"""
+from __future__ import annotations
+
+import threading
+import time as _time
+from typing import Dict, Optional, Set
+
+
+class SystemClock:
+    """Wall-clock time (time.monotonic / time.time / time.sleep)."""
+
+    def monotonic(self) -> float:
+        return _time.monotonic()
+
+    def time(self) -> float:
+        return _time.time()
+
+    def sleep(self, seconds: float) -> None:
+        _time.sleep(max(0.0, seconds))
+
+    def wait(self, event: threading.Event, timeout: Optional[float] = None) -> bool:
+        return event.wait(timeout)
+
+    def register(self, thread: Optional[threading.Thread] = None) -> None:
+        pass
+
+    def unregister(self) -> None:
+        pass
+
+
+class VirtualClock:
+    """
+    Discrete-event clock.
+
+    Threads that call sleep()/wait() become participants. Simulated time only
+    advances when every live participant is blocked in sleep()/wait(); it then
+    jumps straight to the earliest wake-up. Threads that exit are pruned.
+
+    Register worker threads before start() so time cannot run ahead of them
+    while they spin up.
+
+    Participants must not block on anything else for long (sockets, joins),
+    otherwise time stands still until they return to the clock.
+    """
+
+    POLL_SEC = 0.005   # real-time poll for event wake-ups and exited participants
+
+    def __init__(self, start_epoch: Optional[float] = None):
+        self._cond = threading.Condition()
+        self._now = 0.0
+        self._epoch0 = _time.time() if start_epoch is None else start_epoch
+        self._participants: Set[threading.Thread] = set()
+        self._sleepers: Dict[threading.Thread, float] = {}    # thread -> wake-up time
+
+    def monotonic(self) -> float:
+        return self._now
+
+    def time(self) -> float:
+        return self._epoch0 + self._now
+
+    def register(self, thread: Optional[threading.Thread] = None) -> None:
+        """Make a thread (default: the caller) a participant, even before it starts."""
+        with self._cond:
+            self._participants.add(thread or threading.current_thread())
+
+    def unregister(self) -> None:
+        with self._cond:
+            t = threading.current_thread()
+            self._participants.discard(t)
+            self._sleepers.pop(t, None)
+            self._advance_if_idle()
+
+    def sleep(self, seconds: float) -> None:
+        self._block(max(0.0, seconds), None)
+
+    def wait(self, event: threading.Event, timeout: Optional[float] = None) -> bool:
+        if event.is_set():
+            return True
+        if timeout is None:
+            # not a timed sleep: step out of the schedule while blocked
+            self.unregister()
+            try:
+                return event.wait()
+            finally:
+                self.register()
+        return self._block(max(0.0, timeout), event)
+
+    def advance(self, seconds: float) -> None:
+        """Manually move time forward (for single-threaded callers)."""
+        with self._cond:
+            self._now += max(0.0, seconds)
+            self._release_due()
+
+    # ------------------------------------------------------------------
+    # internals (caller holds self._cond)
+    # ------------------------------------------------------------------
+    def _block(self, seconds: float, event: Optional[threading.Event]) -> bool:
+        me = threading.current_thread()
+        with self._cond:
+            self._participants.add(me)
+            self._sleepers[me] = self._now + seconds
+            self._advance_if_idle()
+
+            while me in self._sleepers:
+                if event is not None and event.is_set():
+                    del self._sleepers[me]
+                    self._advance_if_idle()
+                    return True
+                if not self._cond.wait(self.POLL_SEC):
+                    self._advance_if_idle()     # a participant may have exited
+
+        return event.is_set() if event is not None else True
+
+    def _advance_if_idle(self) -> None:
+        for t in list(self._participants):
+            if t.ident is not None and not t.is_alive():
+                self._participants.discard(t)
+                self._sleepers.pop(t, None)
+
+        if not self._sleepers or len(self._sleepers) < len(self._participants):
+            return
+
+        self._now = max(self._now, min(self._sleepers.values()))
+        self._release_due()
+
+    def _release_due(self) -> None:
+        # woken threads count as running immediately, so time cannot
+        # advance again before they get scheduled
+        due = [t for t, at in self._sleepers.items() if at <= self._now]
+        for t in due:
+            del self._sleepers[t]
+        if due:
+            self._cond.notify_all()
+
+
+_clock = SystemClock()
+
+
+def get_clock():
+    return _clock
+
+
+def set_clock(clock) -> None:
+    """Swap the active clock (call before services start)."""
+    global _clock
+    _clock = clock
+
+
+def monotonic() -> float:
+    return _clock.monotonic()
+
+
+def now() -> float:
+    """Epoch seconds according to the active clock."""
+    return _clock.time()
+
+
+def sleep(seconds: float) -> None:
+    _clock.sleep(seconds)
+
+
+def register(thread: Optional[threading.Thread] = None) -> None:
+    """Declare a worker thread as a clock participant (no-op on SystemClock)."""
+    _clock.register(thread)
+
+
+def wait(event: threading.Event, timeout: Optional[float] = None) -> bool:
+    """Event.wait() whose timeout runs on the active clock."""
+    return _clock.wait(event, timeout)
@@ -0,0 +1,279 @@
+# gasera/column_log.py
+"""
+Columnar binary log (.gcl): the compact, memory-mappable form of a
+completed run, produced from its run log when `log_format` is "binary".
+
+    b"GCL1"   magic
+    u32       metadata length
+    JSON      metadata, padded with spaces to an 8-byte boundary
+    records   fixed width, little-endian, one per row:
+              f64 epoch, u16 channel, u16 repeat, u8 phase index, 3 pad,
+              one f32 or f64 per component, padded to 8
+
+Metadata holds the component columns (name, "f4"/"f8"), the phase strings
+as logged, the row count, the record size and `blocks`, the channel/repeat
+index: [channel, repeat, first record, count] for each contiguous stretch.
+
+A component column is float32 only if every value survives the round trip
+at the logged precision (%.4f) and none is NaN. An empty field (component
+not reported) is stored as NaN with the EMPTY bit pattern; a NaN the device
+reported ("nan" in the run log) as the ordinary NaN, which only float64
+columns keep apart (version 1 files wrote NaN for both, exported as empty).
+So exports are byte-identical to the run log export; CSV/TSV downloads
+stream from the records.
+"""
+from __future__ import annotations
+
+import csv
+import io
+import json
+import mmap
+import os
+import struct
+import time
+from array import array
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from gasera.live_sample import TIMESTAMP_FORMAT, format_epoch
+from gasera.run_log import EXPORT_NEWLINE, iter_export as iter_run_log_export
+from gasera.storage_manager import is_stable_path
+
+COL_EXT = ".gcl"
+MAGIC = b"GCL1"
+FIXED_COLUMNS = ("timestamp", "phase", "channel", "repeat")
+
+_META_LEN = struct.Struct("<I")
+_RECORD_PREFIX = "<dHHB3x"
+_F4 = struct.Struct("<f")
+_F8 = struct.Struct("<d")
+# quiet NaN with a payload: "not reported", as opposed to a reported NaN
+_EMPTY_BITS = struct.pack("<Q", 0x7FF8_0000_0000_0E4D)
+EMPTY = _F8.unpack(_EMPTY_BITS)[0]
+FORMAT_VERSION = 2
+_MAX_PHASES = 255
+_WRITE_BATCH = 1024
+READ_CHUNK = 4096       # records per slice copied out of the map
+
+
+def _pad8(n: int) -> int:
+    return (n + 7) & ~7
+
+
+def record_struct(types: List[str]) -> struct.Struct:
+    fmt = _RECORD_PREFIX + "".join("f" if t == "f4" else "d" for t in types)
+    size = struct.calcsize(fmt)
+    return struct.Struct(fmt + "x" * (_pad8(size) - size))
+
+
+def _fits_f4(text: str) -> bool:
+    try:
+        value = float(text)
+        return value == value and f"{_F4.unpack(_F4.pack(value))[0]:.4f}" == text
+    except (OverflowError, ValueError):
+        return False
+
+
+def _rows(run_log: str) -> Iterator[List[str]]:
+    lines = (line[:-len(EXPORT_NEWLINE)] for line in iter_run_log_export(run_log))
+    yield from csv.reader(lines, delimiter="\t")
+
+
+def _parse_epoch(text: str) -> float:
+    return time.mktime(time.strptime(text, TIMESTAMP_FORMAT))
+
+
+def compact_run_log(run_log: str, target: str) -> int:
+    """
+    Write the columnar form of a finished run log to `target` (two streaming
+    passes: schema, then records). Returns the size of the new file.
+    """
+    header: Optional[List[str]] = None
+    phases: Dict[str, int] = {}
+    fits_f4: List[bool] = []
+    blocks: List[List[int]] = []
+    rows = 0
+
+    for fields in _rows(run_log):
+        if header is None:
+            header = fields
+            fits_f4 = [True] * (len(header) - len(FIXED_COLUMNS))
+            continue
+        if len(fields) != len(header):
+            raise ValueError(f"row {rows + 1} has {len(fields)} fields, header has {len(header)}")
+
+        _, phase, channel, repeat, *values = fields
+        if phase not in phases:
+            if len(phases) == _MAX_PHASES:
+                raise ValueError("too many distinct phases")
+            phases[phase] = len(phases)
+        for i, value in enumerate(values):
+            if fits_f4[i] and value and not _fits_f4(value):
+                fits_f4[i] = False
+
+        key = [int(channel), int(repeat)]
+        if blocks and blocks[-1][:2] == key:
+            blocks[-1][3] += 1
+        else:
+            blocks.append(key + [rows, 1])
+        rows += 1
+
+    if header is None:
+        raise ValueError("run log has no header")
+
+    types = ["f4" if ok else "f8" for ok in fits_f4]
+    record = record_struct(types)
+    meta = {
+        "version": FORMAT_VERSION,
+        "columns": [{"name": n, "type": t} for n, t in zip(header[len(FIXED_COLUMNS):], types)],
+        "phases": list(phases),
+        "rows": rows,
+        "record_size": record.size,
+        "blocks": blocks,
+    }
+    blob = json.dumps(meta, ensure_ascii=False).encode("utf-8")
+    prefix = len(MAGIC) + _META_LEN.size
+    blob += b" " * (_pad8(prefix + len(blob)) - prefix - len(blob))
+
+    tmp = target + ".part"
+    with open(tmp, "wb") as f:
+        f.write(MAGIC + _META_LEN.pack(len(blob)) + blob)
+        batch = []
+        rows_iter = _rows(run_log)
+        next(rows_iter)     # header
+        for timestamp, phase, channel, repeat, *values in rows_iter:
+            batch.append(record.pack(
+                _parse_epoch(timestamp), int(channel), int(repeat), phases[phase],
+                *[float(v) if v else EMPTY for v in values],
+            ))
+            if len(batch) >= _WRITE_BATCH:
+                f.write(b"".join(batch))
+                batch = []
+        f.write(b"".join(batch))
+        f.flush()
+        os.fsync(f.fileno())
+        size = f.tell()
+    os.replace(tmp, target)
+    return size
+
+
+class ColumnLog:
+    """
+    Read-only view of a .gcl file, memory-mapped when the file is stable
+    (see is_stable_path), read with pread otherwise. Records are unpacked in
+    slices of READ_CHUNK, so reading a column never loads the whole file.
+    """
+
+    def __init__(self, path: str, mapped: Optional[bool] = None):
+        self.path = path
+        self._file = open(path, "rb")
+        self._map: Optional[mmap.mmap] = None
+        self._size = os.fstat(self._file.fileno()).st_size
+        if self._size == 0:
+            self._file.close()
+            raise ValueError(f"{path}: empty file")
+        if is_stable_path(path) if mapped is None else mapped:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        prefix = len(MAGIC) + _META_LEN.size
+        head = self._read(0, prefix)
+        if head[:len(MAGIC)] != MAGIC or len(head) < prefix:
+            self.close()
+            raise ValueError(f"{path}: not a columnar log")
+        (meta_len,) = _META_LEN.unpack(head[len(MAGIC):])
+        self.meta: Dict[str, Any] = json.loads(self._read(prefix, meta_len).decode("utf-8"))
+        self.data_offset = prefix + meta_len
+
+        self.columns: List[str] = [c["name"] for c in self.meta["columns"]]
+        self.types: List[str] = [c["type"] for c in self.meta["columns"]]
+        self.phases: List[str] = self.meta["phases"]
+        self.rows: int = self.meta["rows"]
+        self._record = record_struct(self.types)
+        # columns where a NaN that is not EMPTY was a reported "nan"
+        self._nan_text = [self.meta.get("version", 1) >= 2 and t == "f8" for t in self.types]
+
+        if self.data_offset + self.rows * self._record.size > self._size:
+            self.close()
+            raise ValueError(f"{path}: truncated")
+
+    def _read(self, offset: int, size: int) -> bytes:
+        if self._map is not None:
+            return self._map[offset:offset + size]
+        data = os.pread(self._file.fileno(), size, offset)
+        if len(data) < size and offset + size <= self._size:
+            raise OSError(f"{self.path}: file shrank while reading")
+        return data
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self) -> "ColumnLog":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    @property
+    def header(self) -> List[str]:
+        return list(FIXED_COLUMNS) + self.columns
+
+    def blocks(self, channel: Optional[int] = None, repeat: Optional[int] = None) -> List[Tuple[int, int]]:
+        """(first record, count) of each stretch matching channel/repeat."""
+        return [
+            (first, count)
+            for ch, rep, first, count in self.meta["blocks"]
+            if (channel is None or ch == channel) and (repeat is None or rep == repeat)
+        ]
+
+    def records(self, start: int = 0, stop: Optional[int] = None) -> Iterator[tuple]:
+        """(epoch, channel, repeat, phase index, *values) for records [start, stop)."""
+        stop = self.rows if stop is None else min(stop, self.rows)
+        size = self._record.size
+        while start < stop:
+            end = min(stop, start + READ_CHUNK)
+            chunk = self._read(self.data_offset + start * size, (end - start) * size)
+            yield from self._record.iter_unpack(chunk)
+            start = end
+
+    def column(self, name: str) -> array:
+        """One column as an array: epoch/component values 'd', channel/repeat 'H'."""
+        if name == "timestamp":
+            idx, out = 0, array("d")
+        elif name in ("channel", "repeat"):
+            idx, out = FIXED_COLUMNS.index(name), array("H")
+        else:
+            idx, out = len(FIXED_COLUMNS) + self.columns.index(name), array("d")
+        out.extend(rec[idx] for rec in self.records())
+        return out
+
+    def iter_export(self) -> Iterator[str]:
+        """TSV lines identical to the run log export of the same run."""
+        buf = io.StringIO()
+        writer = csv.writer(buf, delimiter="\t", lineterminator=EXPORT_NEWLINE)
+
+        def line(row) -> str:
+            buf.seek(0)
+            buf.truncate()
+            writer.writerow(row)
+            return buf.getvalue()
+
+        yield line(self.header)
+        for record in self.records():
+            yield line(self.row_fields(record))
+
+    def row_fields(self, record: tuple) -> List[str]:
+        """One record from records() as the TSV fields the logger wrote."""
+        epoch, channel, repeat, phase, *values = record
+        row = [format_epoch(epoch), self.phases[phase], str(channel), str(repeat)]
+        for v, nan_text in zip(values, self._nan_text):
+            if v == v:
+                row.append(f"{v:.4f}")
+            else:
+                row.append("nan" if nan_text and _F8.pack(v) != _EMPTY_BITS else "")
+        return row
+
+
+def iter_export(path: str) -> Iterator[str]:
+    with ColumnLog(path) as log:
+        yield from log.iter_export()
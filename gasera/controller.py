@@ -1,7 +1,8 @@
 from typing import Optional
 from gasera.protocol import GaseraProtocol, DeviceStatus, ErrorList, TaskList, ACONResult, MeasurementStatus, DeviceName, IterationNumber, NetworkSettings, DateTimeResult
-from gasera.gas_info import get_gas_name, get_color_for_cas, get_cas_details
+from gasera.gas_info import COMPONENTS, get_component_meta
 from gasera.tcp_client import GaseraTCPClient
+from gasera.live_sample import LiveSample
 from system.log_utils import warn
 
 # Top-level (above GaseraController)
@@ -58,13 +59,11 @@ class GaseraController:
 
         components = []
         for rec in acon_result.records:
-            meta = get_cas_details(rec.cas) or {}
-            label = meta.get("label") or (f"{get_gas_name(rec.cas)} ({rec.cas})" if get_gas_name(rec.cas) else rec.cas)
-            color = meta.get("color") or get_color_for_cas(rec.cas) or "#999999"
-            name  = meta.get("symbol") or rec.cas
+            label, color = get_component_meta(rec.cas)
             components.append({
+                "id": COMPONENTS.id_for(rec.cas),
                 "cas": rec.cas,
-                "name": name,
+                "name": rec.cas,
                 "label": label,
                 "color": color,
                 "ppm": rec.ppm,
@@ -80,6 +79,27 @@ class GaseraController:
             "components": components
         }
 
+    def get_live_sample(self) -> Optional[LiveSample]:
+        """
+        Fetch the last ACON result as a LiveSample (no engine context yet).
+        Returns None when no result is available or the device did not answer.
+        """
+        command = self.proto.build_command("ACON")
+        response = self._send(command)
+        if response is None:
+            return None
+
+        try:
+            error, ts, cas_list, ppm_list = self.proto.parse_acon_columns(response)
+        except Exception as e:
+            warn(f"ACON parse error: {e}")
+            return None
+
+        if error or not cas_list:
+            return None
+
+        return LiveSample.from_columns(ts, cas_list, ppm_list)
+
     def get_device_status(self) -> Optional[DeviceStatus]:
         cmd = self.proto.ask_current_status()
         resp = self._send(cmd)
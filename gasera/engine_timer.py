@@ -1,11 +1,11 @@
-import time
+from gasera import clock
 
 class EngineTimer:
     """
     Logical stopwatch.
     - No background thread
     - Explicit start / pause / reset
-    - Monotonic time source
+    - Monotonic time source (gasera.clock)
     """
 
     def __init__(self):
@@ -15,12 +15,12 @@ class EngineTimer:
 
     def start(self):
         if not self._running:
-            self._last_start = time.monotonic()
+            self._last_start = clock.monotonic()
             self._running = True
 
     def pause(self):
         if self._running:
-            self._accum += time.monotonic() - self._last_start
+            self._accum += clock.monotonic() - self._last_start
             self._last_start = None
             self._running = False
 
@@ -31,5 +31,5 @@ class EngineTimer:
         
     def elapsed(self) -> float:
         if self._running:
-            return self._accum + (time.monotonic() - self._last_start)
+            return self._accum + (clock.monotonic() - self._last_start)
         return self._accum
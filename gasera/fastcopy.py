@@ -0,0 +1,77 @@
+# gasera/fastcopy.py
+"""
+Kernel-side file copying for log joins and recovery.
+
+Tries copy_file_range (in-kernel, may reflink), then sendfile (works
+across filesystems on older kernels), then a plain pread/write loop.
+"""
+from __future__ import annotations
+
+import errno
+import os
+from typing import Optional, Tuple
+
+CHUNK = 1 << 20
+
+# errors that mean "this method is not available here", not "the copy failed"
+_FALLBACK_ERRNOS = {
+    errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP,
+    getattr(errno, "ENOTSUP", errno.EOPNOTSUPP),
+}
+
+
+def _copy_file_range(src: int, dst: int, offset: int, count: int) -> int:
+    return os.copy_file_range(src, dst, min(count, 1 << 30), offset_src=offset)
+
+
+def _sendfile(src: int, dst: int, offset: int, count: int) -> int:
+    return os.sendfile(dst, src, offset, min(count, 1 << 30))
+
+
+def _read_write(src: int, dst: int, offset: int, count: int) -> int:
+    data = os.pread(src, min(count, CHUNK), offset)
+    view = memoryview(data)
+    while view:
+        written = os.write(dst, view)
+        view = view[written:]
+    return len(data)
+
+
+_METHODS = (
+    ("copy_file_range", _copy_file_range),
+    ("sendfile", _sendfile),
+    ("read_write", _read_write),
+)
+
+
+def copy_into(dst_fd: int, src_path: str, length: Optional[int] = None, start: int = 0) -> Tuple[int, str]:
+    """
+    Append bytes start..length of src_path (all of it by default) at the
+    current position of dst_fd. Returns (bytes copied, method used); raises
+    OSError (EIO) when the source ends before `length`.
+    """
+    with open(src_path, "rb") as src:
+        src_fd = src.fileno()
+        if length is None:
+            length = os.fstat(src_fd).st_size
+        count = max(0, length - start)
+
+        copied = 0
+        for name, method in _METHODS:
+            try:
+                while copied < count:
+                    n = method(src_fd, dst_fd, start + copied, count - copied)
+                    if n == 0:
+                        break
+                    copied += n
+            except AttributeError:
+                continue        # not provided by this platform / Python
+            except OSError as e:
+                if e.errno not in _FALLBACK_ERRNOS:
+                    raise
+                continue
+            if copied >= count:
+                return copied, name
+            # 0 bytes: end of file, or a method that copies nothing on this
+            # filesystem; the next method (finally a plain read) decides
+        raise OSError(errno.EIO, f"short copy: {copied} of {count} bytes", src_path)
@@ -1,4 +1,5 @@
-from typing import Dict, Optional, Any
+import threading
+from typing import Dict, List, Optional, Any, Tuple
 
 CAS_INFO: Dict[str, Dict[str, str]] = {
     "74-82-8": {
@@ -103,6 +104,58 @@ def get_cas_details(cas: str) -> Dict[str, Any]:
         "color": color,
     }
 
+class ComponentRegistry:
+    """
+    Interns component metadata once and assigns stable small integer ids.
+
+    - CAS_INFO entries get ids 0..n-1 in table order (stable across restarts)
+    - unknown CAS codes seen at runtime are appended; `version` changes so
+      clients know to refetch the table
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: List[Dict[str, Any]] = []
+        self._by_cas: Dict[str, Dict[str, Any]] = {}
+        self._version = 0
+        for cas in CAS_INFO:
+            self._add(cas)
+
+    def _add(self, cas: str) -> Dict[str, Any]:
+        entry = get_cas_details(cas)
+        entry["id"] = len(self._entries)
+        self._entries.append(entry)
+        self._by_cas[cas] = entry
+        self._version += 1
+        return entry
+
+    def entry(self, cas: str) -> Dict[str, Any]:
+        entry = self._by_cas.get(cas)
+        if entry is None:
+            with self._lock:
+                entry = self._by_cas.get(cas) or self._add(cas)
+        return entry
+
+    def id_for(self, cas: str) -> int:
+        return self.entry(cas)["id"]
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"version": self._version, "components": [dict(e) for e in self._entries]}
+
+
+COMPONENTS = ComponentRegistry()
+
+
+def get_component_meta(cas: str) -> Tuple[str, str]:
+    """Return the (label, color) pair for a CAS code (interned in COMPONENTS)."""
+    entry = COMPONENTS.entry(cas)
+    return entry["label"], entry["color"]
+
 def build_label_to_color_map() -> Dict[str, str]:
     """Return mapping of "Name (Formula, CAS)" -> color used by frontend."""
     out: Dict[str, str] = {}
@@ -0,0 +1,133 @@
+# gasera/live_history.py
+from __future__ import annotations
+
+import math
+import threading
+from array import array
+from typing import Any, Dict, Iterable, List, Optional
+
+from gasera.gas_info import COMPONENTS
+from gasera.live_sample import LiveSample, format_epoch
+
+NAN = float("nan")
+
+
+class _RunBuffer:
+    """
+    Fixed-capacity ring of samples for one run, stored column-wise.
+    - epoch / channel / repeat in typed arrays (no per-sample objects)
+    - one float column per CAS, NaN where a sample lacks that component
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.epoch = array("d", [0.0]) * capacity
+        self.channel = array("h", [0]) * capacity
+        self.repeat = array("h", [0]) * capacity
+        self.phase: List[Optional[str]] = [None] * capacity
+        self.columns: Dict[str, array] = {}
+        self.head = 0        # next write position
+        self.count = 0
+        self.dropped = 0     # overwritten by wrap-around
+
+    def append(self, sample: LiveSample) -> None:
+        i = self.head
+        self.epoch[i] = sample.epoch
+        self.channel[i] = sample.channel
+        self.repeat[i] = sample.repeat
+        self.phase[i] = sample.phase
+
+        for column in self.columns.values():
+            column[i] = NAN
+        for cas, ppm in zip(sample.cas, sample.ppm):
+            column = self.columns.get(cas)
+            if column is None:
+                column = self.columns[cas] = array("d", [NAN]) * self.capacity
+            column[i] = ppm
+
+        self.head = (i + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+        else:
+            self.dropped += 1
+
+    def indices(self) -> Iterable[int]:
+        """Positions in chronological order."""
+        start = (self.head - self.count) % self.capacity
+        for k in range(self.count):
+            yield (start + k) % self.capacity
+
+
+class LiveHistory:
+    """
+    In-memory history of live samples for the current and the previous run,
+    so dashboards can backfill their chart in one request.
+    """
+
+    def __init__(self, capacity: int = 10000):
+        self._capacity = capacity
+        self._lock = threading.Lock()
+        self._current = _RunBuffer(capacity)
+        self._previous: Optional[_RunBuffer] = None
+
+    def start_run(self) -> None:
+        """Rotate buffers: the current run becomes the previous one."""
+        with self._lock:
+            if self._current.count:
+                self._previous = self._current
+                self._current = _RunBuffer(self._capacity)
+
+    def append(self, sample: LiveSample) -> None:
+        with self._lock:
+            self._current.append(sample)
+
+    def query(
+        self,
+        since: Optional[float] = None,
+        channels: Optional[Iterable[int]] = None,
+        run: str = "current",
+    ) -> Dict[str, Any]:
+        """
+        Columnar slice of a run: samples newer than `since` (epoch seconds),
+        optionally limited to 1-based channel numbers.
+        """
+        wanted = set(channels) if channels else None
+
+        with self._lock:
+            buf = self._previous if run == "previous" else self._current
+            if buf is None:
+                return {"run": run, "count": 0, "dropped": 0, "epoch": [], "timestamp": [],
+                        "channel": [], "repeat": [], "phase": [], "components": []}
+
+            rows = [
+                i for i in buf.indices()
+                if (since is None or buf.epoch[i] > since)
+                and (wanted is None or buf.channel[i] in wanted)
+            ]
+            epochs = [buf.epoch[i] for i in rows]
+            result = {
+                "run": run,
+                "count": len(rows),
+                "dropped": buf.dropped,
+                "epoch": epochs,
+                "timestamp": [format_epoch(e) for e in epochs],
+                "channel": [buf.channel[i] for i in rows],
+                "repeat": [buf.repeat[i] for i in rows],
+                "phase": [buf.phase[i] for i in rows],
+                "components": [],
+            }
+
+            for cas, column in buf.columns.items():
+                values = [column[i] for i in rows]
+                if all(math.isnan(v) for v in values):
+                    continue
+                entry = COMPONENTS.entry(cas)
+                result["components"].append({
+                    "id": entry["id"],
+                    "cas": cas,
+                    "label": entry["label"],
+                    "color": entry["color"],
+                    "ppm": [None if math.isnan(v) else v for v in values],
+                })
+
+        return result
@@ -0,0 +1,97 @@
+# gasera/live_sample.py
+from __future__ import annotations
+
+import sys
+import time
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from gasera import clock
+from gasera.gas_info import COMPONENTS
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def format_epoch(epoch: float) -> str:
+    """Render an epoch timestamp the way logs and the frontend expect it."""
+    return time.strftime(TIMESTAMP_FORMAT, time.localtime(epoch))
+
+
+class LiveSample:
+    """
+    One ACON result tagged with engine context (channel / repeat / phase).
+
+    - epoch stays numeric end to end; formatting happens only at the edges
+      (CSV row, SSE payload).
+    - cas holds interned CAS strings, ids the matching COMPONENTS ids,
+      ppm the concentrations.
+    - Treat instances as immutable once published.
+    """
+
+    __slots__ = ("epoch", "channel", "repeat", "phase", "cas", "ids", "ppm", "_payload")
+
+    def __init__(
+        self,
+        epoch: float,
+        channel: int,
+        repeat: int,
+        phase: Optional[str],
+        cas: Tuple[str, ...],
+        ids: Tuple[int, ...],
+        ppm: Tuple[float, ...],
+    ):
+        self.epoch = epoch
+        self.channel = channel
+        self.repeat = repeat
+        self.phase = phase
+        self.cas = cas
+        self.ids = ids
+        self.ppm = ppm
+        self._payload: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def from_columns(
+        cls,
+        epoch: Optional[float],
+        cas_list: Sequence[str],
+        ppm_list: Sequence[float],
+        channel: int = 0,
+        repeat: int = 0,
+        phase: Optional[str] = None,
+    ) -> "LiveSample":
+        if epoch is None:
+            epoch = clock.now()
+        cas = tuple(sys.intern(c) for c in cas_list)
+        return cls(
+            float(epoch),
+            channel,
+            repeat,
+            phase,
+            cas,
+            tuple(COMPONENTS.id_for(c) for c in cas),
+            tuple(ppm_list),
+        )
+
+    def __len__(self) -> int:
+        return len(self.cas)
+
+    def with_context(self, channel: int, repeat: int, phase: Optional[str]) -> "LiveSample":
+        """Return a copy tagged with engine context; component arrays are shared."""
+        return LiveSample(self.epoch, channel, repeat, phase, self.cas, self.ids, self.ppm)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Compact SSE/JSON edge representation (computed once per sample).
+        Component metadata is not repeated: clients resolve `ids` through
+        /gasera/api/components and refetch when `components_version` changes.
+        """
+        if self._payload is None:
+            self._payload = {
+                "timestamp": format_epoch(self.epoch),
+                "phase": self.phase,
+                "channel": self.channel,
+                "repeat": self.repeat,
+                "ids": list(self.ids),
+                "ppm": list(self.ppm),
+                "components_version": COMPONENTS.version,
+            }
+        return self._payload
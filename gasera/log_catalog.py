@@ -0,0 +1,372 @@
+# gasera/log_catalog.py
+"""
+SQLite catalog of completed logs, one database per log root
+(`<root>/.catalog.db`), so listing, paging and searching runs are indexed
+queries instead of a directory scan.
+
+Runs are keyed by file stem (`gasera_log_<ts>_<RUNID>[...]`), which stays
+the same when a run log is compacted or listed under its .csv name. The
+logger records a run when it starts and publishes its summary when the
+final file exists; reconcile() brings the catalog in line with the files
+on disk (logs copied onto a stick, deleted by hand, recovered runs).
+The catalog can always be rebuilt from the files: a corrupt database is
+simply recreated.
+"""
+from __future__ import annotations
+
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from gasera.column_log import COL_EXT
+from gasera.log_reader import LogChunk, LogReader
+from gasera.run_log import RUN_EXT
+from gasera.storage_manager import USB_MOUNT, USB_UNMOUNT
+from system.log_utils import debug, info, warn
+
+CATALOG_FILE = ".catalog.db"
+LOG_EXTS = (COL_EXT, RUN_EXT, ".csv")   # preferred first when a stem has several
+
+STATE_ACTIVE = "active"
+STATE_COMPLETE = "complete"
+
+_CAS_RE = re.compile(r"(\d{2,7}-\d{2}-\d)\)?\s*$")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    stem     TEXT PRIMARY KEY,
+    file     TEXT,
+    run_id   TEXT,
+    state    TEXT NOT NULL,
+    started  REAL,
+    ended    REAL,
+    rows     INTEGER,
+    size     INTEGER,
+    mtime    REAL
+);
+CREATE INDEX IF NOT EXISTS runs_state_mtime ON runs(state, mtime);
+CREATE INDEX IF NOT EXISTS runs_started ON runs(started);
+CREATE INDEX IF NOT EXISTS runs_ended ON runs(ended);
+
+CREATE TABLE IF NOT EXISTS run_channels (
+    stem     TEXT NOT NULL REFERENCES runs(stem) ON DELETE CASCADE,
+    channel  INTEGER NOT NULL,
+    PRIMARY KEY (stem, channel)
+);
+CREATE INDEX IF NOT EXISTS run_channels_channel ON run_channels(channel, stem);
+
+CREATE TABLE IF NOT EXISTS run_gases (
+    stem     TEXT NOT NULL REFERENCES runs(stem) ON DELETE CASCADE,
+    name     TEXT NOT NULL,
+    cas      TEXT,
+    min_ppm  REAL,
+    max_ppm  REAL,
+    PRIMARY KEY (stem, name)
+);
+CREATE INDEX IF NOT EXISTS run_gases_cas ON run_gases(cas, max_ppm);
+CREATE INDEX IF NOT EXISTS run_gases_name ON run_gases(name, max_ppm);
+"""
+
+
+def cas_of(name: str) -> Optional[str]:
+    """CAS number at the end of a log column label, e.g. "Methane (CH₄, 74-82-8)"."""
+    m = _CAS_RE.search(name)
+    return m.group(1) if m else None
+
+
+class RunSummary:
+    """Catalog fields of one run, accumulated row by row or chunk by chunk."""
+
+    __slots__ = ("rows", "started", "ended", "channels", "gases")
+
+    def __init__(self):
+        self.rows = 0
+        self.started: Optional[float] = None
+        self.ended: Optional[float] = None
+        self.channels: set = set()
+        self.gases: Dict[str, List[float]] = {}     # name -> [min, max]
+
+    def _span(self, first: float, last: float) -> None:
+        self.started = first if self.started is None else min(self.started, first)
+        self.ended = last if self.ended is None else max(self.ended, last)
+
+    def _gas(self, name: str, low: float, high: float) -> None:
+        span = self.gases.get(name)
+        if span is None:
+            self.gases[name] = [low, high]
+        else:
+            span[0] = min(span[0], low)
+            span[1] = max(span[1], high)
+
+    def add(self, epoch: float, channel: int, values: Iterable[Tuple[str, float]]) -> None:
+        self.rows += 1
+        self._span(epoch, epoch)
+        self.channels.add(channel)
+        for name, ppm in values:
+            if not math.isnan(ppm):
+                self._gas(name, ppm, ppm)
+
+    def add_chunk(self, chunk: LogChunk) -> None:
+        if not len(chunk):
+            return
+        self.rows += len(chunk)
+        self._span(min(chunk.timestamp), max(chunk.timestamp))
+        self.channels.update(chunk.channel)
+        for name, values in chunk.ppm.items():
+            present = [v for v in values if v == v]
+            if present:
+                self._gas(name, min(present), max(present))
+
+    @classmethod
+    def from_log(cls, path: str) -> "RunSummary":
+        summary = cls()
+        with LogReader(path) as reader:
+            for chunk in reader.chunks():
+                summary.add_chunk(chunk)
+        return summary
+
+
+def _stem(name: str) -> str:
+    return os.path.splitext(os.path.basename(name))[0]
+
+
+def _run_id(stem: str) -> Optional[str]:
+    # gasera_log_<date>_<time>_<RUNID>[_MIRROR|_RECOVERED]
+    parts = stem.split("_")
+    return parts[4] if len(parts) > 4 and stem.startswith("gasera_log_") else None
+
+
+class LogCatalog:
+    """Catalog databases of all log roots seen, opened on first use."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._conns: Dict[str, sqlite3.Connection] = {}
+        self._reconciled: Set[str] = set()      # roots whose catalog matched the directory once
+
+    # ------------------------------------------------------------------
+    # Connections
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _connect(path: str) -> sqlite3.Connection:
+        conn = sqlite3.connect(path, timeout=5, check_same_thread=False)
+        try:
+            conn.execute("PRAGMA foreign_keys = ON")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            conn.executescript(_SCHEMA)
+        except Exception:
+            conn.close()
+            raise
+        return conn
+
+    def _open(self, root: str) -> sqlite3.Connection:
+        path = os.path.join(root, CATALOG_FILE)
+        try:
+            return self._connect(path)
+        except sqlite3.DatabaseError as e:
+            # the catalog is derived data: start over
+            warn(f"[CATALOG] {path} unusable ({e}), recreating")
+            os.remove(path)
+            return self._connect(path)
+
+    def _conn(self, root: str) -> sqlite3.Connection:
+        conn = self._conns.get(root)
+        if conn is None:
+            conn = self._conns[root] = self._open(root)
+        return conn
+
+    def close_root(self, root: str) -> None:
+        with self._lock:
+            self._reconciled.discard(root)
+            conn = self._conns.pop(root, None)
+            if conn is not None:
+                conn.close()
+
+    def on_storage_event(self, event: str, log_root: str) -> None:
+        from system import services
+
+        if event == USB_UNMOUNT and services.storage_manager is not None:
+            # the stick (and its catalog) is gone
+            self.close_root(services.storage_manager.usb_log_dir)
+        elif event == USB_MOUNT and services.merge_worker is not None:
+            services.merge_worker.submit("catalog reconcile", lambda: self.reconcile(log_root))
+
+    # ------------------------------------------------------------------
+    # Logger hooks
+    # ------------------------------------------------------------------
+    def run_started(self, root: str, stem: str, run_id: str, started: float) -> None:
+        with self._lock:
+            conn = self._conn(root)
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO runs (stem, run_id, state, started) VALUES (?, ?, ?, ?)",
+                    (stem, run_id, STATE_ACTIVE, started),
+                )
+
+    def publish(self, path: str, summary: RunSummary, run_id: Optional[str] = None) -> None:
+        """Record the finished log at `path` (replaces whatever the stem had)."""
+        root = os.path.dirname(path)
+        stem = _stem(path)
+        st = os.stat(path)
+        with self._lock:
+            conn = self._conn(root)
+            with conn:
+                conn.execute("DELETE FROM runs WHERE stem = ?", (stem,))
+                conn.execute(
+                    "INSERT INTO runs (stem, file, run_id, state, started, ended, rows, size, mtime)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (stem, os.path.basename(path), run_id or _run_id(stem), STATE_COMPLETE,
+                     summary.started, summary.ended, summary.rows, st.st_size, st.st_mtime),
+                )
+                conn.executemany(
+                    "INSERT INTO run_channels (stem, channel) VALUES (?, ?)",
+                    [(stem, ch) for ch in sorted(summary.channels)],
+                )
+                conn.executemany(
+                    "INSERT INTO run_gases (stem, name, cas, min_ppm, max_ppm) VALUES (?, ?, ?, ?, ?)",
+                    [(stem, name, cas_of(name), lo, hi) for name, (lo, hi) in summary.gases.items()],
+                )
+
+    def remove(self, path: str) -> None:
+        with self._lock:
+            conn = self._conn(os.path.dirname(path))
+            with conn:
+                conn.execute("DELETE FROM runs WHERE stem = ?", (_stem(path),))
+
+    # ------------------------------------------------------------------
+    # Reconciliation
+    # ------------------------------------------------------------------
+    def reconcile(self, root: Optional[str] = None) -> None:
+        """Add/refresh logs the catalog does not know as they are; drop vanished ones."""
+        if root is None:
+            from gasera.storage_utils import get_log_directory
+            root = get_log_directory()
+
+        files: Dict[str, Tuple[str, os.stat_result]] = {}
+        for name in os.listdir(root):
+            ext = os.path.splitext(name)[1].lower()
+            if ext not in LOG_EXTS:
+                continue
+            path = os.path.join(root, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            stem = _stem(name)
+            have = files.get(stem)
+            if have is None or LOG_EXTS.index(ext) < LOG_EXTS.index(os.path.splitext(have[0])[1].lower()):
+                files[stem] = (name, st)
+
+        with self._lock:
+            known = {
+                stem: (file, size, mtime, state)
+                for stem, file, size, mtime, state in self._conn(root).execute(
+                    "SELECT stem, file, size, mtime, state FROM runs"
+                )
+            }
+
+        added = 0
+        for stem, (name, st) in files.items():
+            if known.get(stem) == (name, st.st_size, st.st_mtime, STATE_COMPLETE):
+                continue
+            path = os.path.join(root, name)
+            try:
+                summary = RunSummary.from_log(path)
+            except Exception as e:
+                warn(f"[CATALOG] could not summarize {name}: {e}")
+                summary = RunSummary()
+            try:
+                self.publish(path, summary)
+                added += 1
+            except OSError:
+                continue    # deleted meanwhile
+
+        tmp_dir = os.path.join(root, ".tmp")
+        gone = [
+            stem for stem, (_, _, _, state) in known.items()
+            if stem not in files
+            and not (state == STATE_ACTIVE and os.path.exists(os.path.join(tmp_dir, stem + RUN_EXT)))
+        ]
+        if gone:
+            with self._lock:
+                conn = self._conn(root)
+                with conn:
+                    conn.executemany("DELETE FROM runs WHERE stem = ?", [(s,) for s in gone])
+
+        with self._lock:
+            self._reconciled.add(root)
+
+        if added or gone:
+            info(f"[CATALOG] {root}: {added} log(s) added/refreshed, {len(gone)} removed")
+        else:
+            debug(f"[CATALOG] {root}: up to date ({len(files)} logs)")
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def is_reconciled(self, root: str) -> bool:
+        """False until reconcile() has run for `root` (after startup or a mount the catalog may miss logs)."""
+        with self._lock:
+            return root in self._reconciled
+
+    def query(self, root: str, offset: int, limit: int, filters: Optional[Dict[str, Any]] = None) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        (total matches, one page of entries, newest first). Filters:
+        from/to (epoch, run overlaps the range), channel, gas (CAS or column
+        label) with optional above (peak >= ppm) / below (minimum <= ppm).
+        """
+        filters = filters or {}
+        where = ["r.state = ?"]
+        args: List[Any] = [STATE_COMPLETE]
+
+        if filters.get("from") is not None:
+            where.append("r.ended >= ?")
+            args.append(filters["from"])
+        if filters.get("to") is not None:
+            where.append("r.started <= ?")
+            args.append(filters["to"])
+        if filters.get("channel") is not None:
+            where.append("EXISTS (SELECT 1 FROM run_channels c WHERE c.stem = r.stem AND c.channel = ?)")
+            args.append(filters["channel"])
+        if filters.get("gas"):
+            cond = ["g.stem = r.stem", "(g.cas = ? OR g.name = ?)"]
+            args.extend([filters["gas"], filters["gas"]])
+            if filters.get("above") is not None:
+                cond.append("g.max_ppm >= ?")
+                args.append(filters["above"])
+            if filters.get("below") is not None:
+                cond.append("g.min_ppm <= ?")
+                args.append(filters["below"])
+            where.append(f"EXISTS (SELECT 1 FROM run_gases g WHERE {' AND '.join(cond)})")
+
+        clause = " AND ".join(where)
+        with self._lock:
+            conn = self._conn(root)
+            (total,) = conn.execute(f"SELECT COUNT(*) FROM runs r WHERE {clause}", args).fetchone()
+            if offset >= total:
+                offset = max(0, ((max(1, (total + limit - 1) // limit)) - 1) * limit)
+            rows = conn.execute(
+                "SELECT r.stem, r.run_id, r.started, r.ended, r.rows, r.size, r.mtime,"
+                " (SELECT GROUP_CONCAT(channel) FROM run_channels c WHERE c.stem = r.stem)"
+                f" FROM runs r WHERE {clause} ORDER BY r.mtime DESC LIMIT ? OFFSET ?",
+                args + [limit, offset],
+            ).fetchall()
+
+        entries = []
+        for stem, run_id, started, ended, nrows, size, mtime, channels in rows:
+            entries.append({
+                "name": stem + ".csv",
+                "size": size,
+                "mtime": int(mtime),
+                "modified_readable": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(mtime)),
+                "run_id": run_id,
+                "started": started,
+                "ended": ended,
+                "rows": nrows,
+                "channels": sorted(int(c) for c in channels.split(",")) if channels else [],
+            })
+        return total, entries
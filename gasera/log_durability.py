@@ -0,0 +1,114 @@
+# gasera/log_durability.py
+from __future__ import annotations
+
+import bisect
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from system.preferences import (
+    DEFAULTS,
+    KEY_LOG_COMMIT_ROWS,
+    KEY_LOG_COMMIT_SECONDS,
+    KEY_LOG_DURABILITY,
+    LogDurability,
+)
+
+
+@dataclass(frozen=True)
+class DurabilityPolicy:
+    """
+    When MeasurementLogger fsyncs. Rows are always flushed to the OS right
+    away (a crash of the app loses nothing); the policy only bounds what a
+    power cut can take with it.
+    """
+    mode: LogDurability = LogDurability.PER_ROW
+    max_rows: int = 1
+    max_seconds: float = 0.0
+
+    @classmethod
+    def from_preferences(cls, prefs, checkpoint_seconds: float) -> "DurabilityPolicy":
+        if prefs is None:
+            return cls()
+
+        try:
+            mode = LogDurability(prefs.get(KEY_LOG_DURABILITY, DEFAULTS[KEY_LOG_DURABILITY]))
+        except ValueError:
+            mode = DEFAULTS[KEY_LOG_DURABILITY]
+
+        rows = max(1, prefs.get_int(KEY_LOG_COMMIT_ROWS, DEFAULTS[KEY_LOG_COMMIT_ROWS]))
+        seconds = prefs.get_float(KEY_LOG_COMMIT_SECONDS, DEFAULTS[KEY_LOG_COMMIT_SECONDS])
+        seconds = min(max(0.1, seconds), checkpoint_seconds)
+        return cls(mode, rows, seconds)
+
+    def loss_window(self, checkpoint_seconds: float) -> Dict[str, Any]:
+        """Worst case on power loss: rows and seconds of data not yet on disk."""
+        if self.mode == LogDurability.PER_ROW:
+            return {"rows": 0, "seconds": 0.0}
+        if self.mode == LogDurability.GROUP:
+            return {"rows": self.max_rows - 1, "seconds": self.max_seconds}
+        return {"rows": None, "seconds": float(checkpoint_seconds)}
+
+    def to_dict(self, checkpoint_seconds: float) -> Dict[str, Any]:
+        return {
+            "mode": self.mode.value,
+            "max_rows": self.max_rows,
+            "max_seconds": self.max_seconds,
+            "loss_window": self.loss_window(checkpoint_seconds),
+        }
+
+
+class FsyncHistogram:
+    """Cumulative fsync latency histogram (milliseconds), shared by all loggers."""
+
+    BOUNDS_MS: List[float] = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000]
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = [0] * (len(self.BOUNDS_MS) + 1)
+        self._total = 0
+        self._sum_ms = 0.0
+        self._max_ms = 0.0
+
+    def record(self, seconds: float) -> None:
+        ms = seconds * 1000.0
+        with self._lock:
+            self._counts[bisect.bisect_left(self.BOUNDS_MS, ms)] += 1
+            self._total += 1
+            self._sum_ms += ms
+            self._max_ms = max(self._max_ms, ms)
+
+    def timed_fsync(self, fd: int) -> None:
+        t0 = time.perf_counter()
+        os.fsync(fd)
+        self.record(time.perf_counter() - t0)
+
+    def _percentile(self, q: float) -> Optional[float]:
+        # upper bucket bound containing the q-th sample
+        if not self._total:
+            return None
+        rank = q * self._total
+        seen = 0
+        for bound, count in zip(self.BOUNDS_MS + [None], self._counts):
+            seen += count
+            if seen >= rank:
+                return bound if bound is not None else round(self._max_ms, 1)
+        return round(self._max_ms, 1)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            buckets = {f"le_{b:g}ms": c for b, c in zip(self.BOUNDS_MS, self._counts)}
+            buckets["inf"] = self._counts[-1]
+            return {
+                "count": self._total,
+                "mean_ms": round(self._sum_ms / self._total, 2) if self._total else None,
+                "max_ms": round(self._max_ms, 2),
+                "p50_ms": self._percentile(0.5),
+                "p99_ms": self._percentile(0.99),
+                "buckets": buckets,
+            }
+
+
+FSYNC_STATS = FsyncHistogram()
@@ -0,0 +1,224 @@
+# gasera/log_index.py
+"""
+Sparse sidecar index for time-range queries over log files.
+
+`<log file>.idx` holds one entry per stride of INDEX_ROWS rows:
+
+    b"GIX1", u64 inode of the log file, u32 stride      (header, 16 bytes)
+    u64 start, u64 end, f64 first epoch, f64 last epoch,
+    u32 channel mask, u32 rows                            (entry, 40 bytes)
+
+start/end are LogReader positions (byte offsets for text and run logs,
+record numbers for columnar logs); channel N sets bit min(N, 31). The
+logger writes entries as it goes; any other log is indexed on first use.
+An index whose inode does not match (file replaced by a join, copy or
+compaction) is rebuilt; entries past the end of the file (a tail cut by
+recovery, or rows appended after the file was mapped) are ignored. Rows
+after the last entry (a run still being written) are scanned.
+"""
+from __future__ import annotations
+
+import csv
+import io
+import os
+import struct
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+from gasera.log_reader import LogReader
+from gasera.run_log import EXPORT_NEWLINE
+
+IDX_EXT = ".idx"
+INDEX_ROWS = 256
+
+_MAGIC = b"GIX1"
+_HEADER = struct.Struct("<4sQI")
+_ENTRY = struct.Struct("<QQddII")
+
+
+class IndexEntry(NamedTuple):
+    start: int
+    end: int
+    first_epoch: float
+    last_epoch: float
+    channel_mask: int
+    rows: int
+
+
+def index_path(log_path: str) -> str:
+    return log_path + IDX_EXT
+
+
+def channel_bit(channel: int) -> int:
+    return 1 << min(max(channel, 0), 31)
+
+
+def channel_mask(channels: Iterable[int]) -> int:
+    mask = 0
+    for ch in channels:
+        mask |= channel_bit(ch)
+    return mask
+
+
+def remove_index(log_path: str) -> None:
+    try:
+        os.remove(index_path(log_path))
+    except FileNotFoundError:
+        pass
+
+
+class IndexWriter:
+    """Appends entries for a log as rows are written to it (no fsync: the index can be rebuilt)."""
+
+    def __init__(self, log_path: str, log_fd: int, stride: int = INDEX_ROWS):
+        self.stride = stride
+        self._f = open(index_path(log_path), "wb", buffering=0)
+        self._f.write(_HEADER.pack(_MAGIC, os.fstat(log_fd).st_ino, stride))
+        self._reset(None)
+
+    def _reset(self, start: Optional[int]):
+        self._start = start
+        self._end = start
+        self._first = 0.0
+        self._last = 0.0
+        self._mask = 0
+        self._rows = 0
+
+    def add(self, start: int, end: int, epoch: float, channel: int) -> None:
+        """One row written at [start, end)."""
+        if self._rows == 0:
+            self._start = start
+            self._first = self._last = epoch
+        self._first = min(self._first, epoch)
+        self._last = max(self._last, epoch)
+        self._mask |= channel_bit(channel)
+        self._end = end
+        self._rows += 1
+        if self._rows >= self.stride:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self._rows:
+            self._f.write(_ENTRY.pack(self._start, self._end, self._first, self._last, self._mask, self._rows))
+        self._reset(None)
+
+    def close(self) -> None:
+        if self._f.closed:
+            return
+        try:
+            self._flush()
+        finally:
+            self._f.close()
+
+
+def load_index(log_path: str, end: int) -> Optional[List[IndexEntry]]:
+    """Entries of a current index up to `end` (LogReader.end); None if missing or stale."""
+    try:
+        with open(index_path(log_path), "rb") as f:
+            data = f.read()
+        st = os.stat(log_path)
+    except OSError:
+        return None
+
+    if len(data) < _HEADER.size:
+        return None
+    magic, inode, _ = _HEADER.unpack_from(data)
+    if magic != _MAGIC or inode != st.st_ino:
+        return None
+
+    usable = (len(data) - _HEADER.size) // _ENTRY.size * _ENTRY.size
+    entries = [IndexEntry(*e) for e in _ENTRY.iter_unpack(data[_HEADER.size:_HEADER.size + usable])]
+    while entries and entries[-1].end > end:
+        entries.pop()
+    return entries
+
+
+def build_index(log_path: str, persist: bool = True, stride: int = INDEX_ROWS) -> List[IndexEntry]:
+    """Index an existing log (one LogReader chunk per entry)."""
+    entries = []
+    with LogReader(log_path, chunk_rows=stride) as reader:
+        for chunk in reader.chunks():
+            mask = channel_mask(set(chunk.channel))
+            entries.append(IndexEntry(
+                chunk.start, chunk.end, min(chunk.timestamp), max(chunk.timestamp), mask, len(chunk),
+            ))
+
+    if persist:
+        tmp = index_path(log_path) + ".part"
+        with open(tmp, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, os.stat(log_path).st_ino, stride))
+            for e in entries:
+                f.write(_ENTRY.pack(*e))
+        os.replace(tmp, index_path(log_path))
+    return entries
+
+
+def get_index(log_path: str, end: int, persist: bool = True) -> List[IndexEntry]:
+    entries = load_index(log_path, end)
+    if entries is None:
+        entries = build_index(log_path, persist=persist)
+    return entries
+
+
+def plan_ranges(
+    entries: List[IndexEntry],
+    t_from: Optional[float],
+    t_to: Optional[float],
+    channels: Optional[Set[int]],
+) -> Tuple[List[Tuple[int, int]], Optional[int]]:
+    """
+    Position ranges worth reading (adjacent matches merged) and the end of
+    the indexed part, from which the unindexed tail must be scanned.
+    """
+    mask = channel_mask(channels) if channels else None
+    ranges: List[List[int]] = []
+    for e in entries:
+        if t_from is not None and e.last_epoch < t_from:
+            continue
+        if t_to is not None and e.first_epoch > t_to:
+            continue
+        if mask is not None and not e.channel_mask & mask:
+            continue
+        if ranges and ranges[-1][1] == e.start:
+            ranges[-1][1] = e.end
+        else:
+            ranges.append([e.start, e.end])
+    tail = entries[-1].end if entries else None
+    return [(a, b) for a, b in ranges], tail
+
+
+def iter_range(
+    log_path: str,
+    t_from: Optional[float] = None,
+    t_to: Optional[float] = None,
+    channels: Optional[Set[int]] = None,
+    persist_index: bool = True,
+) -> Iterator[str]:
+    """TSV lines (header + matching rows, as logged) of rows in [t_from, t_to] on `channels`."""
+    buf = io.StringIO()
+    writer = csv.writer(buf, delimiter="\t", lineterminator=EXPORT_NEWLINE)
+
+    def line(row) -> str:
+        buf.seek(0)
+        buf.truncate()
+        writer.writerow(row)
+        return buf.getvalue()
+
+    with LogReader(log_path) as reader:
+        if not reader.header:
+            return
+        entries = get_index(log_path, reader.end, persist=persist_index)
+        ranges, tail = plan_ranges(entries, t_from, t_to, channels)
+
+        yield line(reader.header)
+
+        spans: List[Tuple[Optional[int], Optional[int]]] = list(ranges)
+        spans.append((tail, None))      # rows written after the index (or all, if empty)
+        for start, stop in spans:
+            for epoch, channel, fields in reader.rows(start, stop):
+                if t_from is not None and epoch < t_from:
+                    continue
+                if t_to is not None and epoch > t_to:
+                    continue
+                if channels and channel not in channels:
+                    continue
+                yield line(fields)
@@ -0,0 +1,294 @@
+# gasera/log_reader.py
+"""
+Read measurement logs back as columns.
+
+Handles every format the logger has produced: columnar logs (.gcl), run
+logs (.wal, finished or still being written) and legacy CSV/TSV files and
+segments. Stable files are memory-mapped; files that may shrink or vanish
+(in .tmp or on the USB stick, see is_stable_path) are read with pread
+instead. Rows are parsed lazily, chunk_rows rows at a time. Columns are array.array objects; they support the buffer protocol,
+so numpy.frombuffer() can wrap them without a copy where numpy exists.
+
+Positions passed to chunks()/read() and reported as LogChunk.start/end
+are byte offsets of a line for text and run logs, record numbers for
+columnar logs; an end position can be passed back in to resume.
+"""
+from __future__ import annotations
+
+import csv
+import math
+import mmap
+import os
+import time
+from array import array
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from gasera.column_log import COL_EXT, FIXED_COLUMNS, ColumnLog
+from gasera.live_sample import TIMESTAMP_FORMAT
+from gasera.run_log import REC_HEADER, REC_ROW, RUN_EXT, decode_record
+from gasera.storage_manager import is_stable_path
+
+CHUNK_ROWS = 4096
+READ_BLOCK = 1 << 16      # pread size for files that are not mapped
+
+KIND_COLUMNAR = "columnar"
+KIND_RUN_LOG = "run_log"
+KIND_TEXT = "text"
+
+_MINUTE_FORMAT = "%Y-%m-%d %H:%M"
+_MINUTE_CACHE_SIZE = 1024
+
+
+class LogChunk:
+    """A block of consecutive rows, one array per column."""
+
+    __slots__ = ("timestamp", "channel", "repeat", "phase", "ppm", "start", "end")
+
+    def __init__(self, components: List[str], start: int):
+        self.timestamp = array("d")
+        self.channel = array("H")
+        self.repeat = array("H")
+        self.phase: List[str] = []
+        self.ppm: Dict[str, array] = {name: array("d") for name in components}
+        self.start = start
+        self.end = start
+
+    def __len__(self) -> int:
+        return len(self.timestamp)
+
+    def extend(self, other: "LogChunk") -> None:
+        self.timestamp.extend(other.timestamp)
+        self.channel.extend(other.channel)
+        self.repeat.extend(other.repeat)
+        self.phase.extend(other.phase)
+        for name, values in self.ppm.items():
+            values.extend(other.ppm[name])
+        self.end = other.end
+
+
+class LogReader:
+    """
+    Columnar reader over one log file. The header is parsed on open; rows
+    are only parsed as chunks are requested. A file still being written is
+    read up to its last complete row as of open().
+    """
+
+    def __init__(self, path: str, chunk_rows: int = CHUNK_ROWS, mapped: Optional[bool] = None):
+        self.path = path
+        self.chunk_rows = max(1, chunk_rows)
+        self.header: List[str] = []
+        self._columnar: Optional[ColumnLog] = None
+        self._file = None
+        self._map: Optional[mmap.mmap] = None
+        self._size = 0
+        self._data_start = 0
+        self._minutes: Dict[str, float] = {}
+        if mapped is None:
+            mapped = is_stable_path(path)
+
+        if path.endswith(COL_EXT):
+            self.kind = KIND_COLUMNAR
+            self._columnar = ColumnLog(path, mapped=mapped)
+            self.header = self._columnar.header
+            return
+
+        self.kind = KIND_RUN_LOG if path.endswith(RUN_EXT) else KIND_TEXT
+        self._file = open(path, "rb")
+        self._size = os.fstat(self._file.fileno()).st_size
+        if mapped and self._size:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._size = len(self._map)
+        self._read_header()
+
+    def close(self) -> None:
+        if self._columnar is not None:
+            self._columnar.close()
+        if self._map is not None:
+            self._map.close()
+        if self._file is not None:
+            self._file.close()
+
+    def __enter__(self) -> "LogReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    @property
+    def components(self) -> List[str]:
+        return self.header[len(FIXED_COLUMNS):]
+
+    @property
+    def end(self) -> int:
+        """Position just past the data present at open()."""
+        if self._columnar is not None:
+            return self._columnar.rows
+        return self._size
+
+    # ------------------------------------------------------------
+    # Text and run log parsing
+    # ------------------------------------------------------------
+    def _lines(self, pos: int, stop: Optional[int] = None) -> Iterator[Tuple[int, bytes]]:
+        end = self._size if stop is None else min(stop, self._size)
+        m = self._map
+        if m is None:
+            yield from self._read_lines(pos, end)
+            return
+        while pos < end:
+            nl = m.find(b"\n", pos, end)
+            if nl < 0:
+                return      # unterminated tail of a file still being written
+            yield pos, m[pos:nl + 1]
+            pos = nl + 1
+
+    def _read_lines(self, pos: int, end: int) -> Iterator[Tuple[int, bytes]]:
+        """_lines() for unmapped files; stops early if the file shrank meanwhile."""
+        fd = self._file.fileno()
+        buf, buf_pos = b"", pos
+        while pos < end:
+            nl = buf.find(b"\n", pos - buf_pos)
+            if nl < 0:
+                filled = buf_pos + len(buf)
+                if filled >= end:
+                    return      # unterminated tail
+                more = os.pread(fd, min(READ_BLOCK, end - filled), filled)
+                if not more:
+                    return      # truncated under us
+                buf, buf_pos = buf[pos - buf_pos:] + more, pos
+                continue
+            yield pos, buf[pos - buf_pos:nl + 1]
+            pos = buf_pos + nl + 1
+
+    def _fields(self, line: bytes) -> Optional[List[str]]:
+        """(kind-filtered) TSV fields of one line; None for non-row lines."""
+        if self.kind == KIND_RUN_LOG:
+            rec = decode_record(line)
+            if rec is None:
+                raise EOFError      # torn or corrupt: stop reading here
+            kind, text = rec
+            if kind not in (REC_HEADER, REC_ROW):
+                return None
+        else:
+            text = line.rstrip(b"\r\n").decode("utf-8")
+        if '"' in text:
+            return next(csv.reader([text], delimiter="\t"))
+        return text.split("\t")
+
+    def _read_header(self) -> None:
+        try:
+            for pos, line in self._lines(0):
+                fields = self._fields(line)
+                if fields is not None:
+                    self.header = fields
+                    self._data_start = pos + len(line)
+                    return
+        except EOFError:
+            pass
+
+    def _epoch(self, text: str) -> float:
+        # one mktime per minute instead of a strptime per row
+        if len(text) != 19:
+            return time.mktime(time.strptime(text, TIMESTAMP_FORMAT))
+        minute = text[:16]
+        base = self._minutes.get(minute)
+        if base is None:
+            if len(self._minutes) >= _MINUTE_CACHE_SIZE:
+                self._minutes.clear()
+            base = self._minutes[minute] = time.mktime(time.strptime(minute, _MINUTE_FORMAT))
+        return base + int(text[17:19])
+
+    def _text_chunks(self, start: int, stop: Optional[int]) -> Iterator[LogChunk]:
+        width = len(self.header)
+        components = self.components
+        chunk = LogChunk(components, start)
+        values = list(chunk.ppm.values())
+
+        try:
+            for pos, line in self._lines(start, stop):
+                fields = self._fields(line)
+                chunk.end = pos + len(line)
+                if fields is None or len(fields) != width or fields == self.header:
+                    continue
+
+                chunk.timestamp.append(self._epoch(fields[0]))
+                chunk.phase.append(fields[1].strip())
+                chunk.channel.append(int(fields[2]))
+                chunk.repeat.append(int(fields[3]))
+                for column, value in zip(values, fields[4:]):
+                    column.append(float(value) if value else math.nan)
+
+                if len(chunk) >= self.chunk_rows:
+                    yield chunk
+                    chunk = LogChunk(components, chunk.end)
+                    values = list(chunk.ppm.values())
+        except EOFError:
+            pass
+
+        if len(chunk):
+            yield chunk
+
+    # ------------------------------------------------------------
+    # Columnar logs
+    # ------------------------------------------------------------
+    def _columnar_chunks(self, start: int, stop: Optional[int]) -> Iterator[LogChunk]:
+        log = self._columnar
+        stop = log.rows if stop is None else min(stop, log.rows)
+        components = self.components
+        phases = [p.strip() for p in log.phases]
+
+        while start < stop:
+            end = min(stop, start + self.chunk_rows)
+            chunk = LogChunk(components, start)
+            values = list(chunk.ppm.values())
+            for epoch, channel, repeat, phase, *ppm in log.records(start, end):
+                chunk.timestamp.append(epoch)
+                chunk.channel.append(channel)
+                chunk.repeat.append(repeat)
+                chunk.phase.append(phases[phase])
+                for column, value in zip(values, ppm):
+                    column.append(value)
+            chunk.end = end
+            yield chunk
+            start = end
+
+    # ------------------------------------------------------------
+    # PUBLIC API
+    # ------------------------------------------------------------
+    def chunks(self, start: Optional[int] = None, stop: Optional[int] = None) -> Iterator[LogChunk]:
+        """Rows from position `start` (default: first row) up to `stop`, chunk by chunk."""
+        if not self.header:
+            return iter(())
+        if self._columnar is not None:
+            return self._columnar_chunks(start or 0, stop)
+        return self._text_chunks(self._data_start if start is None else start, stop)
+
+    def rows(self, start: Optional[int] = None, stop: Optional[int] = None) -> Iterator[Tuple[float, int, List[str]]]:
+        """
+        (epoch, channel, TSV fields as logged) per row, for exporting a
+        subset of a log without reformatting it.
+        """
+        if not self.header:
+            return
+        width = len(self.header)
+
+        if self._columnar is not None:
+            for record in self._columnar.records(start or 0, stop):
+                yield record[0], record[1], self._columnar.row_fields(record)
+            return
+
+        try:
+            for _, line in self._lines(self._data_start if start is None else start, stop):
+                fields = self._fields(line)
+                if fields is None or len(fields) != width or fields == self.header:
+                    continue
+                yield self._epoch(fields[0]), int(fields[2]), fields
+        except EOFError:
+            pass
+
+    def read(self, start: Optional[int] = None, stop: Optional[int] = None) -> LogChunk:
+        """All rows in [start, stop) as one chunk."""
+        first = self._data_start if start is None and self._columnar is None else (start or 0)
+        out = LogChunk(self.components, first)
+        for chunk in self.chunks(start, stop):
+            out.extend(chunk)
+        return out
@@ -0,0 +1,243 @@
+# gasera/log_series.py
+"""
+Downsampled chart series of a log, per channel x gas.
+
+A multi-day log has far more rows than a chart has pixels, so series are
+reduced server-side to about `points` values each, either with LTTB
+(largest triangle three buckets: keeps the visual shape) or min/max
+buckets (keeps every peak and dip). Two LRU caches keep zoom and pan
+cheap: parsed columns per file, and finished responses per file,
+resolution and window. Both are keyed by size and mtime, so a log still
+being written is re-read when it grows.
+"""
+from __future__ import annotations
+
+import bisect
+import os
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Set, Tuple
+
+from gasera.log_catalog import cas_of
+from gasera.log_reader import LogReader
+
+METHOD_LTTB = "lttb"
+METHOD_MINMAX = "minmax"
+METHODS = (METHOD_LTTB, METHOD_MINMAX)
+
+DEFAULT_POINTS = 1000
+MIN_POINTS = 10
+MAX_POINTS = 10000
+
+
+# ----------------------------------------------------------------------
+# Downsampling (index selection, so x and y stay paired)
+# ----------------------------------------------------------------------
+def lttb(xs: Sequence[float], ys: Sequence[float], n: int) -> List[int]:
+    """Indices of the n points LTTB keeps (first and last always included)."""
+    size = len(xs)
+    if n >= size:
+        return list(range(size))
+    if n < 3:
+        return [0, size - 1][:max(n, 1)]
+
+    every = (size - 2) / (n - 2)
+    out = [0]
+    a = 0
+    for i in range(n - 2):
+        # average of the next bucket is the third triangle corner
+        start = int((i + 1) * every) + 1
+        end = min(int((i + 2) * every) + 1, size)
+        span = end - start
+        avg_x = sum(xs[start:end]) / span
+        avg_y = sum(ys[start:end]) / span
+
+        lo = int(i * every) + 1
+        hi = int((i + 1) * every) + 1
+        ax, ay = xs[a], ys[a]
+        best, pick = -1.0, lo
+        for j in range(lo, hi):
+            area = abs((ax - avg_x) * (ys[j] - ay) - (ax - xs[j]) * (avg_y - ay))
+            if area > best:
+                best, pick = area, j
+        out.append(pick)
+        a = pick
+    out.append(size - 1)
+    return out
+
+
+def minmax(xs: Sequence[float], ys: Sequence[float], n: int) -> List[int]:
+    """Indices of the minimum and maximum of n/2 equal-count buckets, in order."""
+    size = len(xs)
+    if n >= size:
+        return list(range(size))
+
+    buckets = max(1, n // 2)
+    every = size / buckets
+    out: List[int] = []
+    for b in range(buckets):
+        lo = int(b * every)
+        hi = min(int((b + 1) * every), size)
+        if lo >= hi:
+            continue
+        low = high = lo
+        for j in range(lo + 1, hi):
+            if ys[j] < ys[low]:
+                low = j
+            elif ys[j] > ys[high]:
+                high = j
+        out.extend(sorted({low, high}))
+    return out
+
+
+_DOWNSAMPLERS: Dict[str, Callable[[Sequence[float], Sequence[float], int], List[int]]] = {
+    METHOD_LTTB: lttb,
+    METHOD_MINMAX: minmax,
+}
+
+
+# ----------------------------------------------------------------------
+# Caches
+# ----------------------------------------------------------------------
+class _LruCache:
+    def __init__(self, size: int):
+        self.size = size
+        self._items: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Any:
+        with self._lock:
+            value = self._items.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.size:
+                self._items.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._items), "hits": self.hits, "misses": self.misses}
+
+
+# parsed logs are large; responses are small
+_COLUMNS = _LruCache(3)
+_RESPONSES = _LruCache(64)
+
+
+class _Channel:
+    """Full-resolution columns of one channel, in log order."""
+
+    __slots__ = ("t", "gases")
+
+    def __init__(self, names: List[str]):
+        self.t = array("d")
+        self.gases: Dict[str, array] = {name: array("d") for name in names}
+
+
+def _file_key(path: str) -> Tuple[str, int, int]:
+    st = os.stat(path)
+    return path, st.st_size, st.st_mtime_ns
+
+
+def _load_columns(path: str, key: Hashable) -> Dict[int, _Channel]:
+    channels = _COLUMNS.get(key)
+    if channels is not None:
+        return channels
+
+    channels = {}
+    with LogReader(path) as reader:
+        names = reader.components
+        for chunk in reader.chunks():
+            columns = [(name, chunk.ppm[name]) for name in names]
+            for i, ch in enumerate(chunk.channel):
+                target = channels.get(ch)
+                if target is None:
+                    target = channels[ch] = _Channel(names)
+                target.t.append(chunk.timestamp[i])
+                for name, values in columns:
+                    target.gases[name].append(values[i])
+    _COLUMNS.put(key, channels)
+    return channels
+
+
+def _gas_selected(name: str, wanted: Optional[Set[str]]) -> bool:
+    return not wanted or name in wanted or cas_of(name) in wanted
+
+
+# ----------------------------------------------------------------------
+# PUBLIC API
+# ----------------------------------------------------------------------
+def get_series(
+    path: str,
+    points: int = DEFAULT_POINTS,
+    method: str = METHOD_LTTB,
+    channels: Optional[Set[int]] = None,
+    gases: Optional[Set[str]] = None,
+    t_from: Optional[float] = None,
+    t_to: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    {"points", "method", "series": [{"channel", "gas", "rows", "t", "v"}]}
+    with at most `points` values per series. gases match column labels or
+    CAS numbers. Raises ValueError for an unknown method.
+    """
+    if method not in _DOWNSAMPLERS:
+        raise ValueError(f"unknown method {method!r}, expected one of {', '.join(METHODS)}")
+    points = min(max(points, MIN_POINTS), MAX_POINTS)
+
+    file_key = _file_key(path)
+    key = (file_key, points, method,
+           tuple(sorted(channels)) if channels else None,
+           tuple(sorted(gases)) if gases else None,
+           t_from, t_to)
+    cached = _RESPONSES.get(key)
+    if cached is not None:
+        return cached
+
+    downsample = _DOWNSAMPLERS[method]
+    series = []
+    for ch, columns in sorted(_load_columns(path, file_key).items()):
+        if channels and ch not in channels:
+            continue
+        # rows are in time order, so a window is a slice
+        lo = 0 if t_from is None else bisect.bisect_left(columns.t, t_from)
+        hi = len(columns.t) if t_to is None else bisect.bisect_right(columns.t, t_to)
+
+        for name, values in columns.gases.items():
+            if not _gas_selected(name, gases):
+                continue
+            xs, ys = [], []
+            for i in range(lo, hi):
+                v = values[i]
+                if v == v:
+                    xs.append(columns.t[i])
+                    ys.append(v)
+            if not xs:
+                continue
+            keep = downsample(xs, ys, points)
+            series.append({
+                "channel": ch,
+                "gas": name,
+                "rows": len(xs),
+                "t": [xs[i] for i in keep],
+                "v": [ys[i] for i in keep],
+            })
+
+    result = {"points": points, "method": method, "series": series}
+    _RESPONSES.put(key, result)
+    return result
+
+
+def cache_stats() -> Dict[str, Dict[str, int]]:
+    return {"columns": _COLUMNS.stats(), "responses": _RESPONSES.stats()}
@@ -0,0 +1,206 @@
+# gasera/log_writer.py
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from gasera.live_sample import LiveSample
+from gasera.measurement_logger import MeasurementLogger
+from system.log_utils import debug, warn
+
+
+class Backpressure:
+    """What write_measurement() does when a sink queue is full."""
+    BLOCK = "block"              # wait up to block_timeout (50 ms), then drop the sample
+    DROP_NEWEST = "drop_newest"  # reject the incoming sample
+    DROP_OLDEST = "drop_oldest"  # evict the oldest queued sample (default)
+
+
+_STOP = object()
+
+
+class _Sink:
+    """One MeasurementLogger fed by its own bounded queue and thread."""
+
+    def __init__(self, name: str, logger: MeasurementLogger, max_queue: int):
+        self.name = name
+        self.logger = logger
+        self.queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue)
+        # stats are updated from the producer and the sink thread
+        self._lock = threading.Lock()
+        self.stats: Dict[str, Any] = {
+            "enqueued": 0,
+            "written": 0,
+            "failed": 0,
+            "dropped": 0,
+            "max_depth": 0,
+            "blocked_s": 0.0,
+            "last_write_ms": None,
+            "max_write_ms": 0.0,
+        }
+        self.thread = threading.Thread(target=self._run, daemon=True, name=f"log-writer-{name}")
+        self.thread.start()
+
+    def _run(self) -> None:
+        while True:
+            item = self.queue.get()
+            try:
+                if item is _STOP:
+                    return
+                t0 = time.perf_counter()
+                ok = self.logger.write_measurement(item)
+                ms = (time.perf_counter() - t0) * 1000.0
+                with self._lock:
+                    self.stats["written" if ok else "failed"] += 1
+                    self.stats["last_write_ms"] = round(ms, 2)
+                    self.stats["max_write_ms"] = round(max(self.stats["max_write_ms"], ms), 2)
+            except Exception as e:
+                self._count("failed")
+                warn(f"[LOGGER] {self.name} writer error: {e}")
+            finally:
+                self.queue.task_done()
+
+    def offer(self, sample: LiveSample, policy: str, block_timeout: float) -> bool:
+        try:
+            if policy == Backpressure.BLOCK:
+                t0 = time.perf_counter()
+                try:
+                    self.queue.put(sample, timeout=block_timeout)
+                finally:
+                    blocked = time.perf_counter() - t0
+                    with self._lock:
+                        self.stats["blocked_s"] = round(self.stats["blocked_s"] + blocked, 3)
+            else:
+                self.queue.put_nowait(sample)
+        except queue.Full:
+            if policy != Backpressure.DROP_OLDEST:
+                self._count("dropped")
+                return False
+            try:
+                self.queue.get_nowait()
+                self.queue.task_done()
+                self._count("dropped")
+            except queue.Empty:
+                pass
+            try:
+                self.queue.put_nowait(sample)
+            except queue.Full:
+                self._count("dropped")
+                return False
+
+        depth = self.queue.qsize()
+        with self._lock:
+            self.stats["enqueued"] += 1
+            self.stats["max_depth"] = max(self.stats["max_depth"], depth)
+        return True
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.stats[key] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            out = dict(self.stats)
+        out["depth"] = self.queue.qsize()
+        out["capacity"] = self.queue.maxsize
+        out["dir"] = self.logger.tmp_dir
+        return out
+
+
+class AsyncLogWriter:
+    """
+    Moves row formatting, writes and fsyncs off the live updater thread.
+
+    write_measurement() only dedupes and enqueues; each sink (the primary
+    logger and an optional internal-storage mirror) drains its own queue on
+    its own thread, so a slow USB stick never stalls ACON polling and the
+    mirror adds no producer-side latency.
+    """
+
+    def __init__(
+        self,
+        mirror_internal: bool = False,
+        max_queue: int = 2000,
+        backpressure: str = Backpressure.DROP_OLDEST,
+        block_timeout: float = 0.05,
+    ):
+        self.backpressure = backpressure
+        self.block_timeout = block_timeout
+        self._last_epoch: Optional[float] = None
+        self._closed = False
+
+        self.primary = MeasurementLogger()
+        self._sinks: List[_Sink] = [_Sink("primary", self.primary, max_queue)]
+
+        self.mirror: Optional[MeasurementLogger] = None
+        if mirror_internal:
+            self.mirror = MeasurementLogger(follow_storage=False, run_id=self.primary.run_id, suffix="_MIRROR")
+            self._sinks.append(_Sink("mirror", self.mirror, max_queue))
+
+    # The engine and routes treat this like the logger it wraps
+    @property
+    def run_id(self) -> str:
+        return self.primary.run_id
+
+    @property
+    def policy(self):
+        return self.primary.policy
+
+    @property
+    def run_stats(self):
+        return self.primary.run_stats
+
+    def owns(self, path: str) -> bool:
+        """True if path is a part of this run's log or of its mirror."""
+        return any(sink.logger.owns(path) for sink in self._sinks)
+
+    def write_measurement(self, sample: LiveSample) -> bool:
+        """
+        Queue one sample. True if it is new and the primary sink took it
+        (same contract as MeasurementLogger); False for duplicates and for
+        samples the primary queue rejected under backpressure. Evictions
+        by drop_oldest show only in stats().
+        """
+        if sample is None or not sample.cas or self._closed:
+            return False
+        if sample.epoch == self._last_epoch:
+            return False
+        self._last_epoch = sample.epoch
+
+        queued = [sink.offer(sample, self.backpressure, self.block_timeout) for sink in self._sinks]
+        return queued[0]
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued sample has been written. False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for sink in self._sinks:
+            while sink.queue.unfinished_tasks:
+                if deadline is not None and time.monotonic() >= deadline:
+                    warn(f"[LOGGER] drain timed out with {sink.queue.qsize()} rows queued ({sink.name})")
+                    return False
+                time.sleep(0.01)
+        return True
+
+    def close(self, success: bool = True) -> None:
+        self._closed = True
+        self.drain()
+        for sink in self._sinks:
+            sink.queue.put(_STOP)
+            sink.thread.join()
+
+        self.primary.close(success)
+        if self.mirror is not None:
+            if success and self.primary.base_dir == self.mirror.base_dir:
+                # the primary already landed on internal storage
+                self.mirror.discard()
+            else:
+                self.mirror.close(success)
+        debug(f"[LOGGER] writer closed: {self.stats()}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backpressure": self.backpressure,
+            "sinks": {sink.name: sink.snapshot() for sink in self._sinks},
+        }
@@ -1,86 +1,187 @@
-import os, csv, uuid, time, shutil
+import os, csv, io, uuid, threading
 from datetime import datetime
-from typing import List
-
+from typing import Dict, List, Optional, Tuple
+
+from gasera import clock
+from gasera.column_log import COL_EXT, compact_run_log
+from gasera.fastcopy import copy_into
+from gasera.gas_info import get_component_meta
+from gasera.log_catalog import RunSummary
+from gasera.log_durability import FSYNC_STATS, DurabilityPolicy
+from gasera.live_sample import LiveSample, format_epoch
+from gasera.log_index import IndexWriter, index_path, remove_index
+from gasera.run_log import (
+    REC_CHECKPOINT, REC_HEADER, REC_ROW, RUN_EXT,
+    checkpoint_payload, encode_record, join_parts,
+)
+from gasera.run_stats import RunStats, stats_path
+from gasera.storage_manager import INTERNAL_LOG_DIR, USB_MOUNT
 from gasera.storage_utils import get_log_directory
-from system.log_utils import debug, warn
+from system import services
+from system.preferences import DEFAULTS, KEY_LOG_FORMAT, LogDurability, LogFormat
+from system.log_utils import debug, info, warn
 
 
 class MeasurementLogger:
     """
-    Robust wide-format CSV logger with time-based segmentation.
+    Wide-format measurement logger writing one append-only run log.
 
     - Header is built automatically from the FIRST measurement.
-    - Data is written into hourly segment files under .tmp/.
-    - Files are flushed+fsync'ed regularly.
-    - At successful task end, segments are merged into one CSV.
+    - Rows are appended as checksummed records to <task>.wal under .tmp/,
+      with a checkpoint record every CHECKPOINT_ROWS rows / CHECKPOINT_SECONDS.
+    - Rows are flushed to the OS at once; fsync follows the durability
+      policy (per row, group commit every N rows / T seconds, or only at
+      checkpoints) and its latency is recorded in FSYNC_STATS.
+    - At successful task end the run log is renamed into the log directory;
+      CSV/TSV downloads are a streamed view of it (gasera.run_log). With
+      log_format "binary" it is then compacted to a columnar log
+      (gasera.column_log) in the background.
+    - Follows the active log root: on USB mount the run continues in a new
+      part on the stick and finished parts are migrated in the background;
+      on unmount (or a failed write) the records after the last checkpoint
+      are rewritten to internal storage from memory, so no row is lost.
     """
 
-    SEGMENT_SECONDS = 3600  # new segment every hour
+    CHECKPOINT_ROWS = 500
+    CHECKPOINT_SECONDS = 300
 
-    def __init__(self):
-        self.base_dir = get_log_directory()
-        self.tmp_dir = get_log_directory(temp_dir=True)
+    def __init__(self, follow_storage: bool = True, run_id: Optional[str] = None, suffix: str = ""):
+        """
+        follow_storage=False pins the run to internal storage (used for the
+        mirror copy); run_id/suffix let a mirror share its primary's name.
+        """
+        self._follow_storage = follow_storage
+        self.base_dir, self.tmp_dir = self._resolve_dirs()
 
-        self.run_id = uuid.uuid4().hex[:6].upper()
+        self.run_id = run_id or uuid.uuid4().hex[:6].upper()
 
-        ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-        self.task_name = f"gasera_log_{ts}_{self.run_id}"
-        self.final_path = os.path.join(self.base_dir, f"{self.task_name}.csv")
+        ts = datetime.fromtimestamp(clock.now()).strftime("%Y%m%d_%H%M%S")
+        self.task_name = f"gasera_log_{ts}_{self.run_id}{suffix}"
+        self.final_path = os.path.join(self.base_dir, f"{self.task_name}{RUN_EXT}")
 
         debug(f"[LOGGER] temp log dir: {self.tmp_dir}")
 
-        # segmentation state
-        self.segment_index = 0
-        self.segment_start_ts = 0.0
+        # writes (engine thread) vs. storage events (watcher thread) vs. commit timer
+        self._lock = threading.RLock()
+
+        # durability / group commit
+        self.policy = DurabilityPolicy.from_preferences(services.preferences_service, self.CHECKPOINT_SECONDS)
+        self._dirty_rows = 0
+        self._dirty_since = 0.0
+        self._commit_timer: Optional[threading.Timer] = None
+        debug(f"[LOGGER] durability: {self.policy.to_dict(self.CHECKPOINT_SECONDS)}")
+        self.log_format = self._log_format()
+
+        # run log state
+        self.part_index = 0
         self.f = None
-        self.writer = None
+        self._offset = 0                      # bytes in the open part
+        self._rows = 0                        # data rows in the open part
+        self._checkpoint_offset = 0           # end of the last checkpoint in the open part
+        self._checkpoint_at = 0.0
+        self._tail: List[bytes] = []          # records after that checkpoint, for replay
+        self._parts: List[List] = []          # [path, limit] per part, in order
+        self._index: Optional[IndexWriter] = None   # sparse index of the first part
+        self._migrate_thread: Optional[threading.Thread] = None
+
+        # TSV formatting of payloads (same dialect as the old segment files)
+        self._buf = io.StringIO()
+        self._tsv = csv.writer(self._buf, delimiter="\t", lineterminator="")
 
         # header / schema state
         self.header_written = False
+        self._header_record: Optional[bytes] = None    # repeated at the start of every part
         self.component_headers: List[str] = []
+        self.component_cas: Tuple[str, ...] = ()
+        self._column_by_cas: Dict[str, int] = {}
 
         # duplicate detection
-        self._last_logged_timestamp = None
+        self._last_logged_epoch: Optional[float] = None
 
-        self._open_new_segment()
+        # catalog fields, published with the final file; per channel x gas statistics
+        self._summary = RunSummary()
+        self.run_stats = RunStats()
 
-    # ------------------------------------------------------------
-    # Segment handling
-    # ------------------------------------------------------------
-    def _segment_path(self) -> str:
-        return os.path.join(
-            self.tmp_dir,
-            f"segment_{self.run_id}_{self.segment_index:03d}.tsv"
-        )
+        self._open_new_part()
+        self._catalog("run_started", self.base_dir, self.task_name, self.run_id, clock.now())
 
-    def _open_new_segment(self):
-        self.segment_start_ts = time.monotonic()
-        path = self._segment_path()
+        self._storage = services.storage_manager if follow_storage else None
+        if self._storage is not None:
+            self._storage.subscribe(self._on_storage_event)
 
-        debug(f"[LOGGER] opening segment: {path}")
-
-        self.f = open(path, "w", newline="")
-        self.writer = csv.writer(self.f, delimiter="\t")
-
-        # header only goes into the FIRST segment
-        if self.segment_index == 0 and self.header_written:
-            header = ["timestamp", "phase", "channel", "repeat"] + self.component_headers
-            self.writer.writerow(header)
+    # ------------------------------------------------------------
+    # Part handling
+    # ------------------------------------------------------------
+    def _resolve_dirs(self) -> Tuple[str, str]:
+        if self._follow_storage:
+            return get_log_directory(), get_log_directory(temp_dir=True)
+
+        storage = services.storage_manager
+        base = storage.internal_dir if storage is not None else INTERNAL_LOG_DIR
+        tmp = os.path.join(base, ".tmp")
+        os.makedirs(tmp, exist_ok=True)
+        return base, tmp
+
+    @staticmethod
+    def _log_format() -> LogFormat:
+        prefs = services.preferences_service
+        if prefs is None:
+            return DEFAULTS[KEY_LOG_FORMAT]
+        try:
+            return LogFormat(prefs.get(KEY_LOG_FORMAT, DEFAULTS[KEY_LOG_FORMAT]))
+        except ValueError:
+            return DEFAULTS[KEY_LOG_FORMAT]
+
+    def _part_path(self) -> str:
+        # a run normally has one part; more appear only on storage changes
+        suffix = f".{self.part_index:02d}" if self.part_index else ""
+        return os.path.join(self.tmp_dir, f"{self.task_name}{suffix}{RUN_EXT}")
+
+    def _open_new_part(self, replay: Optional[List[bytes]] = None):
+        path = self._part_path()
+
+        debug(f"[LOGGER] opening run log: {path}")
+
+        self.f = open(path, "ab")
+        self._offset = self.f.tell()
+        self._rows = 0
+        self._checkpoint_offset = self._offset
+        self._checkpoint_at = clock.monotonic()
+        self._tail = []
+        self._parts.append([path, None])
+        if self.part_index == 0:
+            # later parts are not indexed; a joined run is indexed on first use
+            try:
+                self._index = IndexWriter(path, self.f.fileno())
+            except OSError as e:
+                warn(f"[LOGGER] index not written: {e}")
+        self.part_index += 1
+
+        if self._header_record is not None:
+            # every part is self-describing, so a join that loses the first part keeps a header
+            self._append(self._header_record)
             self.f.flush()
-            os.fsync(self.f.fileno())
 
-        self.segment_index += 1
+        replay = [record for record in replay or () if record != self._header_record]
+        if replay:
+            # records lost with their storage
+            for record in replay:
+                self._append(record)
+            self.f.flush()
+            self._dirty_rows = len(replay)
+            self._commit()
 
-    def _close_segment(self):
+    def _close_part(self):
         if not self.f:
             return
 
         try:
-            self.f.flush()
-            os.fsync(self.f.fileno())
+            self._checkpoint()
         except Exception as e:
             warn(f"[LOGGER] flush failed: {e}")
+        self._dirty_rows = 0
+        self._cancel_commit_timer()
+        self._close_index()
 
         try:
             self.f.close()
@@ -88,170 +189,433 @@ class MeasurementLogger:
             pass
 
         self.f = None
-        self.writer = None
 
-    def _cleanup_segments(self):
+    def _close_index(self, remove: bool = False):
+        if self._index is None:
+            return
         try:
-            for name in os.listdir(self.tmp_dir):
-                if name.startswith(f"segment_{self.run_id}_"):
-                    path = os.path.join(self.tmp_dir, name)
-                    if os.path.isfile(path):
-                        os.remove(path)
-            debug(f"[LOGGER] cleaned up segment files in {self.tmp_dir}")
+            self._index.close()
         except Exception as e:
-            warn(f"[LOGGER] cleanup failed: {e}")
+            warn(f"[LOGGER] index close failed: {e}")
+        self._index = None
+        if remove:
+            try:
+                remove_index(self._parts[0][0])
+            except OSError:
+                pass
+
+    def _index_row(self, start: int, sample: LiveSample):
+        try:
+            self._index.add(start, self._offset, sample.epoch, sample.channel)
+        except Exception as e:
+            # the index is only an accelerator; never fail a row over it
+            warn(f"[LOGGER] index write failed, dropping index: {e}")
+            self._close_index(remove=True)
+
+    def _catalog(self, method: str, *args):
+        catalog = services.log_catalog
+        if catalog is None:
+            return
+        try:
+            getattr(catalog, method)(*args)
+        except Exception as e:
+            # listing falls back to / is repaired by reconcile(); never fail the run over it
+            warn(f"[CATALOG] {method} failed for {self.task_name}: {e}")
+
+    def _summarize(self, sample: LiveSample):
+        names = self.component_headers
+        by_cas = self._column_by_cas
+        values = [(names[by_cas[cas]], ppm) for cas, ppm in zip(sample.cas, sample.ppm) if cas in by_cas]
+        self._summary.add(sample.epoch, sample.channel, values)
+        self.run_stats.add(sample.channel, values)
+
+    def _payload(self, row: list) -> str:
+        self._buf.seek(0)
+        self._buf.truncate()
+        self._tsv.writerow(row)
+        return self._buf.getvalue()
+
+    def _append(self, record: bytes):
+        self._tail.append(record)
+        self.f.write(record)
+        self._offset += len(record)
+        if record[:1] == REC_ROW.encode():
+            self._rows += 1
+
+    def _write_record(self, kind: str, row: list):
+        self._append(encode_record(kind, self._payload(row)))
+        self.f.flush()
+
+        if self._dirty_rows == 0:
+            self._dirty_since = clock.monotonic()
+        self._dirty_rows += 1
+
+        if (len(self._tail) >= self.CHECKPOINT_ROWS
+                or clock.monotonic() - self._checkpoint_at >= self.CHECKPOINT_SECONDS):
+            self._checkpoint()
+            return
+
+        mode = self.policy.mode
+        if mode == LogDurability.PER_ROW:
+            self._commit()
+        elif mode == LogDurability.GROUP:
+            if (self._dirty_rows >= self.policy.max_rows
+                    or clock.monotonic() - self._dirty_since >= self.policy.max_seconds):
+                self._commit()
+            else:
+                self._arm_commit_timer()
+        # CHECKPOINT: committed by _checkpoint()
+
+    def _checkpoint(self):
+        """fsync, then mark everything before this point as durable."""
+        self._commit(force=True)
+        at = self._offset
+        self.f.write(encode_record(REC_CHECKPOINT, checkpoint_payload(self._rows, at)))
+        self.f.flush()
+        self._offset = self.f.tell()
+        self._checkpoint_offset = self._offset
+        self._checkpoint_at = clock.monotonic()
+        self._tail = []
+
+    # ------------------------------------------------------------
+    # Group commit
+    # ------------------------------------------------------------
+    def _commit(self, force: bool = False):
+        if self.f is None or (self._dirty_rows == 0 and not force):
+            return
+        FSYNC_STATS.timed_fsync(self.f.fileno())
+        self._dirty_rows = 0
+        self._cancel_commit_timer()
+
+    def _arm_commit_timer(self):
+        # bounds the loss window when rows stop arriving (pause, last channel)
+        if self._commit_timer is not None:
+            return
+        delay = max(0.0, self.policy.max_seconds - (clock.monotonic() - self._dirty_since))
+        self._commit_timer = threading.Timer(delay, self._on_commit_timer)
+        self._commit_timer.daemon = True
+        self._commit_timer.start()
+
+    def _cancel_commit_timer(self):
+        if self._commit_timer is not None:
+            self._commit_timer.cancel()
+            self._commit_timer = None
+
+    def _on_commit_timer(self):
+        with self._lock:
+            self._commit_timer = None
+            try:
+                self._commit()
+            except Exception as e:
+                warn(f"[LOGGER] group commit failed: {e}")
+
+    def _cleanup_parts(self):
+        for path, _ in self._parts:
+            try:
+                remove_index(path)
+                if os.path.isfile(path):
+                    os.remove(path)
+            except Exception as e:
+                warn(f"[LOGGER] cleanup failed for {path}: {e}")
+        debug(f"[LOGGER] cleaned up {len(self._parts)} run log part(s)")
+
+    # ------------------------------------------------------------
+    # Storage changes
+    # ------------------------------------------------------------
+    def _on_storage_event(self, event: str, log_root: str):
+        with self._lock:
+            if self.f is None or log_root == self.base_dir:
+                return
+            # after an unmount the open part is on storage that is gone
+            self._relocate(healthy=event == USB_MOUNT)
+        info(f"[LOGGER] {event}: run {self.run_id} continues in {self.tmp_dir}")
+
+    def _relocate(self, healthy: bool):
+        """
+        Continue the run in a new part under the active log root.
+        healthy=False: the open part is unreliable (storage gone or write
+        failed), so it is cut at its last checkpoint and the records after
+        it are replayed from memory.
+        """
+        # the first part's offsets no longer describe the finished run
+        self._close_index(remove=True)
+
+        replay = None
+        if healthy:
+            self._close_part()
+        else:
+            replay = self._tail
+            cut = self._checkpoint_offset
+            try:
+                self.f.close()
+            except Exception:
+                pass
+            self.f = None
+            self._dirty_rows = 0
+            self._cancel_commit_timer()
+
+            self._parts[-1][1] = cut
+            try:
+                os.truncate(self._parts[-1][0], cut)    # best effort; its storage may be gone
+            except OSError:
+                pass
+
+        self.base_dir, self.tmp_dir = self._resolve_dirs()
+        self.final_path = os.path.join(self.base_dir, f"{self.task_name}{RUN_EXT}")
+        self._open_new_part(replay=replay)
+
+        if healthy:
+            self._start_migration()
+
+    def _start_migration(self):
+        if self._migrate_thread and self._migrate_thread.is_alive():
+            return
+        self._migrate_thread = threading.Thread(
+            target=self._migrate_parts, daemon=True, name=f"log-migrate-{self.run_id}"
+        )
+        self._migrate_thread.start()
+
+    def _migrate_parts(self):
+        """Move finished parts that live outside the active tmp dir into it."""
+        while True:
+            with self._lock:
+                open_path = self._parts[-1][0] if self.f else None
+                pending = [
+                    p for p, _ in self._parts
+                    if p != open_path and os.path.dirname(p) != self.tmp_dir
+                ]
+                target_dir = self.tmp_dir
+            if not pending:
+                return
+
+            src = pending[0]
+            dst = os.path.join(target_dir, os.path.basename(src))
+            try:
+                with open(dst, "wb") as f:
+                    copy_into(f.fileno(), src)
+                    os.fsync(f.fileno())
+            except Exception as e:
+                warn(f"[LOGGER] run log migration stopped at {src}: {e}")
+                return
+
+            with self._lock:
+                entry = next((e for e in self._parts if e[0] == src), None)
+                if target_dir != self.tmp_dir or entry is None:
+                    continue    # storage changed meanwhile; re-plan
+                entry[0] = dst
+            try:
+                os.remove(src)
+            except Exception:
+                pass
+            debug(f"[LOGGER] migrated {os.path.basename(src)} → {target_dir}")
 
     # ------------------------------------------------------------
     # Header logic (from old logger)
     # ------------------------------------------------------------
-    def _write_header_if_needed(self, components):
+    def _write_header_if_needed(self, sample: LiveSample):
         if self.header_written:
             return
 
-        if not components:
+        if not sample.cas:
             warn("[LOGGER] No components found to build CSV header")
             return
 
-        self.component_headers = [c["label"] for c in components]
+        self.component_cas = sample.cas
+        self.component_headers = [get_component_meta(cas)[0] for cas in sample.cas]
+        self._column_by_cas = {cas: i for i, cas in enumerate(sample.cas)}
         self.header_written = True
 
-        # If first segment already open, write header immediately
-        if self.segment_index == 1 and self.writer:
-            header = ["timestamp", "phase", "channel", "repeat"] + self.component_headers
-            self.writer.writerow(header)
-            self.f.flush()
-            os.fsync(self.f.fileno())
+        header = ["timestamp", "phase", "channel", "repeat"] + self.component_headers
+        self._header_record = encode_record(REC_HEADER, self._payload(header))
+        self._write_record(REC_HEADER, header)
 
         debug(f"[LOGGER] CSV header written: {self.component_headers}")
 
+    def _format_values(self, sample: LiveSample) -> List[str]:
+        if sample.cas == self.component_cas:
+            # fast path: analyzer reports the same component order every time
+            return [f"{v:.4f}" for v in sample.ppm]
+
+        values = [""] * len(self.component_cas)
+        for cas, ppm in zip(sample.cas, sample.ppm):
+            idx = self._column_by_cas.get(cas)
+            if idx is not None:
+                values[idx] = f"{ppm:.4f}"
+        return values
+
     # ------------------------------------------------------------
     # PUBLIC API — write one measurement
     # ------------------------------------------------------------
-    def write_measurement(self, live: dict) -> bool:
-        if not live:
-            return False
-
-        if self._is_duplicate_live_result(live):
+    def write_measurement(self, sample: LiveSample) -> bool:
+        if sample is None or not sample.cas:
             return False
 
-        # rotate segment if needed
-        if time.monotonic() - self.segment_start_ts >= self.SEGMENT_SECONDS:
-            self._close_segment()
-            self._open_new_segment()
+        with self._lock:
+            if self._is_duplicate_live_result(sample):
+                return False
 
-        ts = live.get("timestamp") or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        comps = live.get("components", [])
-        if not comps:
-            return False
-
-        self._write_header_if_needed(comps)
-        if not self.header_written:
-            return False
-
-        phase_text = str(live.get("phase", ""))
-        phase_padded = phase_text.ljust(10)
-
-        row = [
-            ts,
-            phase_padded,
-            live.get("channel"),
-            live.get("repeat"),
-        ]
-
-        def _fmt_ppm(v):
+            row = None
             try:
-                return f"{float(v):.4f}"
-            except Exception:
-                return ""
-
-        values_by_label = {
-            c.get("label"): _fmt_ppm(c.get("ppm"))
-            for c in comps
-            if c and c.get("label") is not None
-        }
-
-        for label in self.component_headers:
-            row.append(values_by_label.get(label, ""))
-
-        try:
-            self.writer.writerow(row)
-            self.f.flush()
-            os.fsync(self.f.fileno())
+                self._write_header_if_needed(sample)
+                if not self.header_written:
+                    return False
+
+                row = [
+                    format_epoch(sample.epoch),
+                    str(sample.phase or "").ljust(10),
+                    sample.channel,
+                    sample.repeat,
+                ]
+                row.extend(self._format_values(sample))
+                start = self._offset
+                self._write_record(REC_ROW, row)
+                if self._index is not None:
+                    self._index_row(start, sample)
+                self._summarize(sample)
+                return True
+            except Exception as e:
+                warn(f"[LOGGER] write failed: {e}")
+
+            # make sure the failed record is part of the replay
+            record = None
+            if row is not None:
+                record = encode_record(REC_ROW, self._payload(row))
+                if not self._tail or self._tail[-1] != record:
+                    self._tail.append(record)
+
+            # storage may have vanished before the watcher noticed;
+            # refresh() relocates through _on_storage_event if so
+            failed_path = self._parts[-1][0]
+            if self._storage is not None:
+                self._storage.refresh()
+            try:
+                if self._parts[-1][0] == failed_path:
+                    self._relocate(healthy=False)
+            except Exception as e:
+                warn(f"[LOGGER] could not reopen run log: {e}")
+                return False
+
+            # a relocation by refresh() onto new storage closes the old part
+            # instead of replaying it, so the row may not have been carried over
+            if record is None or record not in self._tail:
+                warn("[LOGGER] failed row was not replayed")
+                return False
             return True
-        except Exception as e:
-            warn(f"[LOGGER] write failed: {e}")
-            self._close_segment()
-            self._open_new_segment()
-            return False
 
     # ------------------------------------------------------------
     # Finalization
     # ------------------------------------------------------------
     def close(self, success: bool = True):
-        self._close_segment()
+        if self._storage is not None:
+            self._storage.unsubscribe(self._on_storage_event)
+
+        with self._lock:
+            self._close_part()
+        if self._migrate_thread:
+            self._migrate_thread.join()
 
         if not success:
-            warn("[LOGGER] task failed, keeping segment files")
+            warn("[LOGGER] task failed, keeping run log for recovery")
             return
 
         try:
-            self._merge_segments()
+            self.run_stats.save(stats_path(self.final_path))
         except Exception as e:
-            warn(f"[LOGGER] merge failed: {e}")
-            warn("[LOGGER] segment files kept")
-            return
-            
-        # merge successful → cleanup
-        self._cleanup_segments()
-
-    def _merge_segments(self):
-        segments = sorted(
-            f for f in os.listdir(self.tmp_dir)
-            if f.startswith(f"segment_{self.run_id}_") and f.endswith(".tsv")
-        )
+            warn(f"[LOGGER] run statistics not saved: {e}")
 
-        if not segments:
-            warn("[LOGGER] no segments to merge")
+        try:
+            self._finalize_parts()
+        except Exception as e:
+            warn(f"[LOGGER] finalize failed: {e}")
+            warn("[LOGGER] run log kept")
+
+    def owns(self, path: str) -> bool:
+        """True if path is one of this run's log parts."""
+        # no lock: parts are only appended, and a slow write must not stall readers
+        real = os.path.realpath(path)
+        return any(os.path.realpath(part) == real for part, _ in list(self._parts))
+
+    def discard(self):
+        """Close and delete this run's log without producing a result file."""
+        with self._lock:
+            self._close_part()
+        if self._migrate_thread:
+            self._migrate_thread.join()
+        self._cleanup_parts()
+        self._catalog("remove", self.final_path)
+
+    def _finalize_parts(self) -> None:
+        """
+        Publish the run log as final_path. The usual single-part run is a
+        rename; parts left by storage changes are joined into one file and
+        binary runs are compacted, both on the merge worker when there is
+        one, so close() does not wait on them.
+        """
+        if not self._parts:
+            warn("[LOGGER] no run log to finalize")
             return
 
-        debug(f"[LOGGER] merging {len(segments)} segments → {self.final_path}")
-
-        with open(self.final_path, "w", newline="") as out:
-            for name in segments:
-                path = os.path.join(self.tmp_dir, name)
-                with open(path, "r") as src:
-                    shutil.copyfileobj(src, out)
-
-        debug("[LOGGER] merge successful")
+        first, limit = self._parts[0]
+        if len(self._parts) == 1 and limit is None:
+            os.replace(first, self.final_path)
+            if os.path.isfile(index_path(first)):
+                os.replace(index_path(first), index_path(self.final_path))
+            debug(f"[LOGGER] run log finalized → {self.final_path}")
+            self._catalog("publish", self.final_path, self._summary, self.run_id)
+            if self.log_format != LogFormat.BINARY:
+                return
+            name, job = f"compact {self.task_name}", self._compact
+        else:
+            name, job = f"join {self.task_name}", self._join_parts
+
+        worker = services.merge_worker
+        if worker is None:
+            job()
+        else:
+            worker.submit(name, job)
+
+    def _join_parts(self) -> Optional[int]:
+        """Join the parts into final_path; bytes copied, or None if some were unreachable."""
+        debug(f"[LOGGER] joining {len(self._parts)} run log parts → {self.final_path}")
+
+        missing, copied = join_parts(self._parts, self.final_path)
+        for path in missing:
+            warn(f"[LOGGER] run log part unavailable, skipped: {path}")
+        if missing:
+            warn("[LOGGER] some parts were unreachable, run log parts kept")
+            # list the joined file with the rows it actually holds
+            try:
+                summary = RunSummary.from_log(self.final_path)
+            except Exception as e:
+                warn(f"[CATALOG] could not summarize {self.final_path}: {e}")
+                summary = RunSummary()
+            self._catalog("publish", self.final_path, summary, self.run_id)
+            return None
+        self._cleanup_parts()
+        debug("[LOGGER] join successful")
+        self._catalog("publish", self.final_path, self._summary, self.run_id)
+        if self.log_format == LogFormat.BINARY:
+            copied += self._compact()
+        return copied
+
+    def _compact(self) -> int:
+        """Replace the finished run log with its columnar form; returns its size."""
+        target = os.path.splitext(self.final_path)[0] + COL_EXT
+        size = compact_run_log(self.final_path, target)
+        remove_index(self.final_path)
+        os.remove(self.final_path)
+        debug(f"[LOGGER] compacted {os.path.basename(self.final_path)} → {os.path.basename(target)} ({size} bytes)")
+        self.final_path = target
+        self._catalog("publish", self.final_path, self._summary, self.run_id)
+        return size
 
     # ------------------------------------------------------------
-    # Duplicate detection (unchanged)
+    # Duplicate detection
     # ------------------------------------------------------------
-    def _extract_timestamp(self, result):
-        ts = result.get("timestamp")
-
-        if isinstance(ts, (int, float)):
-            return float(ts)
-
-        if isinstance(ts, str):
-            try:
-                iso = ts.replace(" ", "T")
-                return datetime.fromisoformat(iso).timestamp()
-            except Exception:
-                try:
-                    return datetime.strptime(ts, "%Y-%m-%d %H:%M:%S").timestamp()
-                except Exception:
-                    return None
-
-        return None
-
-    def _is_duplicate_live_result(self, result):
-        ts = self._extract_timestamp(result)
-        if ts is None:
+    def _is_duplicate_live_result(self, sample: LiveSample) -> bool:
+        if self._last_logged_epoch == sample.epoch:
             return True
 
-        if self._last_logged_timestamp == ts:
-            return True
-
-        self._last_logged_timestamp = ts
+        self._last_logged_epoch = sample.epoch
         return False
+
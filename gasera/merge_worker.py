@@ -0,0 +1,94 @@
+# gasera/merge_worker.py
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional
+
+from system.log_utils import debug, info, warn
+
+
+class MergeWorker:
+    """
+    Background thread for log joins and startup recovery, so neither the
+    engine's _finalize_run nor app startup waits on large copies.
+
+    Jobs return the number of bytes they copied (or None); throughput is
+    reported per job and in total through stats().
+    """
+
+    def __init__(self, history: int = 20):
+        self._queue: "queue.Queue[tuple]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._recent: Deque[Dict[str, Any]] = deque(maxlen=history)
+        self._totals = {"jobs": 0, "failed": 0, "bytes": 0, "seconds": 0.0}
+        self._running: Optional[str] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, daemon=True, name="log-merge")
+        self._thread.start()
+
+    def submit(self, name: str, job: Callable[[], Optional[int]]) -> None:
+        self._queue.put((name, job))
+        debug(f"[MERGE] queued {name} ({self._queue.qsize()} pending)")
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Block until every submitted job has finished (tests, shutdown)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+    def _run(self) -> None:
+        while True:
+            name, job = self._queue.get()
+            with self._lock:
+                self._running = name
+            t0 = time.perf_counter()
+            ok = True
+            copied = 0
+            try:
+                copied = job() or 0
+            except Exception as e:
+                ok = False
+                warn(f"[MERGE] {name} failed: {e}")
+            elapsed = time.perf_counter() - t0
+
+            record = {
+                "name": name,
+                "ok": ok,
+                "bytes": copied,
+                "seconds": round(elapsed, 3),
+                "mb_per_s": round(copied / elapsed / 1e6, 1) if elapsed > 0 and copied else None,
+                "finished_at": time.time(),
+            }
+            with self._lock:
+                self._running = None
+                self._recent.append(record)
+                self._totals["jobs"] += 1
+                self._totals["failed"] += 0 if ok else 1
+                self._totals["bytes"] += copied
+                self._totals["seconds"] += elapsed
+            if copied:
+                info(f"[MERGE] {name}: {copied} bytes in {elapsed:.2f}s ({record['mb_per_s']} MB/s)")
+            self._queue.task_done()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            totals = dict(self._totals)
+            seconds = totals["seconds"]
+            totals["seconds"] = round(seconds, 3)
+            totals["mb_per_s"] = round(totals["bytes"] / seconds / 1e6, 1) if seconds > 0 and totals["bytes"] else None
+            return {
+                "pending": self._queue.qsize(),
+                "running": self._running,
+                "totals": totals,
+                "recent": list(self._recent),
+            }
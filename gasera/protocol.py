@@ -1,7 +1,7 @@
 from dataclasses import dataclass
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 from datetime import datetime
-from .gas_info import get_cas_details
+from .gas_info import get_component_meta
 
 STX = chr(2)
 ETX = chr(3)
@@ -46,7 +46,7 @@ class ACONResult:
 
     def as_string(self):
             return f"Measurement Results ({self.readable_time}):\n" + "\n".join(
-                f"{get_cas_details(rec.cas)['label']}: {rec.ppm:.4f} ppm" for rec in self.records
+                f"{get_component_meta(rec.cas)[0]}: {rec.ppm:.4f} ppm" for rec in self.records
             ) if not self.error else "Error retrieving measurement results."
     
     @property
@@ -357,6 +357,23 @@ class GaseraProtocol:
                 i += 3
         return ACONResult(error, records)
 
+    def parse_acon_columns(self, response: str) -> Tuple[bool, Optional[int], List[str], List[float]]:
+        """
+        Allocation-light ACON parser for the live path.
+        Returns (error, timestamp, cas_list, ppm_list) without per-record objects.
+        """
+        cmd, parts = self.parse_response(response)
+        if parts[0] != '0':
+            return True, None, [], []
+
+        n = (len(parts) - 1) // 3
+        if n == 0:
+            return False, None, [], []
+
+        cas_list = parts[2:3 * n + 1:3]
+        ppm_list = [float(v) for v in parts[3:3 * n + 1:3]]
+        return False, int(parts[1]), cas_list, ppm_list
+
     def parse_amst(self, response: str) -> MeasurementStatus:
         cmd, parts = self.parse_response(response)
         error = parts[0] != '0'
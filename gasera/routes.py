@@ -1,11 +1,20 @@
-import os, time, json
-from flask import Blueprint, jsonify, Response, stream_with_context, request, send_file
+import os
+from datetime import datetime
+from typing import Iterable, Iterator, Optional, Set
+from urllib.parse import urlsplit
+
+from flask import Blueprint, jsonify, Response, redirect, stream_with_context, request, send_file
 
 from system import services
 from gasera import gas_info
-from gasera.sse.utils import SseDeltaTracker
-from system.log_utils import verbose, debug, info, warn
-from .storage_utils import usb_mounted, get_log_directory, get_free_space, get_total_space, list_log_files, safe_join_in_logdir
+from gasera import column_log
+from gasera.log_index import iter_range, remove_index
+from gasera import log_series
+from gasera.run_stats import RunStats, load_stats, remove_stats, stats_path
+from gasera.run_log import RUN_EXT, iter_export
+from gasera.sse.async_server import SSE_PATH, SSE_PORT
+from system.log_utils import info, warn
+from .storage_utils import get_log_directory, get_free_space, get_total_space, list_log_files, safe_join_in_logdir
 
 gasera_bp = Blueprint("gasera", __name__)
 
@@ -25,6 +34,11 @@ def gasera_api_gas_colors() -> tuple[Response, int]:
     color_map = gas_info.build_label_to_color_map()
     return jsonify(color_map), 200
 
+@gasera_bp.route("/api/components")
+def gasera_api_components() -> tuple[Response, int]:
+    """Component table (id -> cas/label/color) used to decode live_data ids."""
+    return jsonify({"ok": True, **gas_info.COMPONENTS.to_dict()}), 200
+
 # ----------------------------------------------------------------------
 # Measurement control
 # ----------------------------------------------------------------------
@@ -90,51 +104,131 @@ def update_measurement_config() -> tuple[Response, int]:
 
     return jsonify({"ok": True, KEY_MEASUREMENT_START_MODE: mode}), 200
 
+@gasera_bp.route("/api/measurement/progress", methods=["GET"])
+def get_measurement_progress() -> tuple[Response, int]:
+    """
+    Current progress snapshot.
+    ?since=<version> answers 304 when nothing changed since that version.
+    """
+    snapshot = services.live_status_service.get_progress_snapshot()
+
+    since = request.args.get("since", type=int)
+    if since is not None and not snapshot.changed_since(since):
+        return Response(status=304), 304
+
+    return Response(snapshot.to_json(), mimetype="application/json"), 200
+
+@gasera_bp.route("/api/live/history", methods=["GET"])
+def get_live_history() -> tuple[Response, int]:
+    """
+    Columnar live samples of the current (or ?run=previous) run for chart backfill.
+    ?since=<epoch> returns only newer samples; ?channels=1,5,7 filters by channel.
+    """
+    since = request.args.get("since", type=float)
+    run = request.args.get("run", "current")
+    if run not in ("current", "previous"):
+        return jsonify({"ok": False, "error": "run must be 'current' or 'previous'"}), 400
+
+    channels = None
+    raw = request.args.get("channels")
+    if raw:
+        try:
+            channels = [int(c) for c in raw.split(",") if c.strip()]
+        except ValueError:
+            return jsonify({"ok": False, "error": "channels must be comma-separated integers"}), 400
+
+    data = services.live_status_service.history.query(since=since, channels=channels, run=run)
+    return jsonify({"ok": True, **data}), 200
+
+# ----------------------------------------------------------------------
+# Task queue (unattended back-to-back runs)
+# ----------------------------------------------------------------------
+@gasera_bp.route("/api/queue", methods=["GET"])
+def get_task_queue() -> tuple[Response, int]:
+    return jsonify({"ok": True, **services.task_queue.state()}), 200
+
+@gasera_bp.route("/api/queue", methods=["POST"])
+def submit_tasks() -> tuple[Response, int]:
+    """
+    Body: {"tasks": [{"include_channels": [...], "measurement_duration": s,
+                      "pause_seconds": s, "repeat_count": n, "start_at": epoch|ISO}, ...]}
+    Omitted keys default to the current preferences.
+    """
+    if not services.engine_service.supports_task_queue:
+        return jsonify({"ok": False, "error": "Task queue not supported by this device"}), 400
+
+    data = request.get_json(silent=True) or {}
+    try:
+        tasks = services.task_queue.submit(data.get("tasks"), services.preferences_service.as_dict())
+    except ValueError as e:
+        return jsonify({"ok": False, "error": str(e)}), 400
+
+    return jsonify({"ok": True, "task_ids": [t.task_id for t in tasks]}), 200
+
+@gasera_bp.route("/api/queue/<task_id>", methods=["DELETE"])
+def cancel_task(task_id: str) -> tuple[Response, int]:
+    if not services.task_queue.cancel(task_id):
+        return jsonify({"ok": False, "error": "No pending task with that id"}), 404
+    return jsonify({"ok": True}), 200
+
+@gasera_bp.route("/api/queue", methods=["DELETE"])
+def clear_task_queue() -> tuple[Response, int]:
+    """Cancel all pending tasks (a running task is aborted via /api/measurement/abort)."""
+    count = services.task_queue.clear_pending()
+    return jsonify({"ok": True, "cancelled": count}), 200
+
 # ----------------------------------------------------------------------
 # Server-Sent Events
 # ----------------------------------------------------------------------
 @gasera_bp.route("/api/measurement/events")
 def sse_events() -> Response:
-    """SSE stream merging high-frequency (progress, live data) and low-frequency (device status) updates."""
-    def event_stream():
-        last_payload = None
-        last_beat = time.monotonic()
-        tracker = SseDeltaTracker()
-
-        while True:
-            try:
-                _progress, _live_data = services.live_status_service.get_live_snapshots()
-                _device_status = services.device_status_service.get_device_snapshots()
-                _motion_status = services.motion_status_service.get_motion_snapshots()
-
-                state = tracker.build(_progress, _live_data, _device_status, _motion_status)
-                payload = json.dumps(state, sort_keys=True)
-                if payload != last_payload:
-                    yield f"data: {payload}\n\n"
-                    yield ":\n\n"
-                    last_payload = payload
-                    last_beat = time.monotonic()
-
-                    # Clear buzzer change flag after successful send
-                    if state.get("device_status", {}).get("buzzer", {}).get("_changed"):
-                        services.device_status_service.clear_buzzer_change()
-                                        
-                    verbose(f"[SSE] sent update: {state}")
-                elif time.monotonic() - last_beat > 10:
-                    yield ": keep-alive\n\n"
-                    last_beat = time.monotonic()
-                    verbose("[SSE] sent keep-alive")
-
-                time.sleep(0.5)
-
-            except GeneratorExit:
-                debug("[SSE] client disconnected")
-                break
-            except Exception as e:
-                warn(f"[SSE] stream error: {e}")
-                time.sleep(1)
-
-    return Response(stream_with_context(event_stream()), mimetype="text/event-stream")
+    """
+    The SSE stream is served by the asyncio server (gasera/sse/async_server.py),
+    which nginx proxies on this path. Clients reaching Waitress directly (no
+    nginx, dev setups) are redirected there instead of pinning a worker thread
+    for the whole connection.
+    """
+    host = urlsplit(request.host_url).hostname or "127.0.0.1"
+    if ":" in host:
+        host = f"[{host}]"     # IPv6 literal
+    location = f"http://{host}:{SSE_PORT}{SSE_PATH}"
+    if request.query_string:
+        location += "?" + request.query_string.decode("latin-1")
+    return redirect(location, code=307)
+
+# ----------------------------------------------------------------------
+# Runtime metrics
+# ----------------------------------------------------------------------
+@gasera_bp.route("/api/metrics", methods=["GET"])
+def get_metrics() -> tuple[Response, int]:
+    """Return internal counters (result fetching, missed iterations, ...)."""
+    return jsonify({
+        "ok": True,
+        "live": services.live_status_service.get_metrics(),
+        "dispatcher": services.engine_service.get_dispatch_stats(),
+        "sse": services.sse_broker.stats(),
+        "device": services.device_status_service.get_metrics(),
+        "logger": _logger_metrics(),
+        "merge": services.merge_worker.stats(),
+        "series_cache": log_series.cache_stats(),
+    }), 200
+
+def _logger_metrics() -> dict:
+    from gasera.log_durability import FSYNC_STATS, DurabilityPolicy
+    from gasera.measurement_logger import MeasurementLogger
+
+    checkpoint_seconds = MeasurementLogger.CHECKPOINT_SECONDS
+    logger = getattr(services.engine_service, "logger", None)
+    if logger is not None:
+        policy = logger.policy     # the running task keeps the policy it started with
+    else:
+        policy = DurabilityPolicy.from_preferences(services.preferences_service, checkpoint_seconds)
+
+    return {
+        "durability": policy.to_dict(checkpoint_seconds),
+        "fsync": FSYNC_STATS.snapshot(),
+        "writer": logger.stats() if logger is not None else None,
+    }
 
 # ----------------------------------------------------------------------
 # Static file serving for gasera frontend
@@ -146,24 +240,67 @@ def list_logs():
     page_size = int(request.args.get("page_size", 50))
     get_segments = request.args.get("segments", "").lower() in ("1", "true", "yes")
 
-    result = list_log_files(page, page_size, get_segments=get_segments)
+    try:
+        filters = _list_filters()
+    except ValueError as e:
+        return jsonify({"ok": False, "error": f"Invalid filter: {e}"}), 400
+
+    result = list_log_files(page, page_size, get_segments=get_segments, filters=filters)
     result["ok"] = True
     result["segments"] = get_segments
     return jsonify(result)
 
-def stream_csv_with_locale(path: str, locale: str):
+def _list_filters() -> dict:
+    # from/to: run overlaps the range; gas (CAS or column label) with above/below in ppm
+    def number(name):
+        value = request.args.get(name, "").strip()
+        return float(value) if value else None
+
+    channel = request.args.get("channel", "").strip()
+    return {
+        "from": _time_arg("from"),
+        "to": _time_arg("to"),
+        "channel": int(channel) if channel else None,
+        "gas": request.args.get("gas", "").strip() or None,
+        "above": number("above"),
+        "below": number("below"),
+    }
+
+def _catalog_remove(path: str):
+    if services.log_catalog is None:
+        return
+    try:
+        services.log_catalog.remove(path)
+    except Exception as e:
+        warn(f"[CATALOG] remove failed for {path}: {e}")
+
+def _owned_by_active_run(path: str) -> bool:
+    writer = getattr(services.engine_service, "logger", None)
+    return writer is not None and writer.owns(path)
+
+def _iter_log_lines(path: str):
+    # run logs and columnar logs are exported as a view (no copy); legacy CSV/TSV files as-is
+    if path.endswith(RUN_EXT):
+        yield from iter_export(path)
+        return
+    if path.endswith(column_log.COL_EXT):
+        yield from column_log.iter_export(path)
+        return
+    with open(path, "r", newline="") as f:
+        yield from f
+
+def _localize_lines(lines: Iterable[str], locale: Optional[str]) -> Iterator[str]:
     # TAB is always used
     out_decimal = "," if locale == "tr-TR" else "."
 
-    def generate():
-        with open(path, "r", newline="") as f:
-            for line in f:
-                if out_decimal == ",":
-                    yield line.replace(".", ",")
-                else:
-                    yield line
+    for line in lines:
+        if out_decimal == ",":
+            yield line.replace(".", ",")
+        else:
+            yield line
 
-    return generate()
+def stream_csv_with_locale(path: str, locale: str):
+    return _localize_lines(_iter_log_lines(path), locale)
 
 @gasera_bp.route("/api/logs/<path:filename>", methods=["GET"])
 def download_log(filename):
@@ -189,7 +326,9 @@ def download_log(filename):
         
         # Canonical path: no locale or US locale
         if not locale or locale in ("en-US"):
-            return send_file(path, as_attachment=True)
+            if not path.endswith((RUN_EXT, column_log.COL_EXT)):
+                return send_file(path, as_attachment=True)
+            locale = "en-US"
 
         # Locale requested → export view
         return Response(
@@ -205,6 +344,118 @@ def download_log(filename):
     except Exception as e:
         return jsonify({"ok": False, "error": str(e)}), 500
 
+def _time_arg(name: str) -> Optional[float]:
+    # epoch seconds or ISO local time ("2024-05-01T12:00:00" / "2024-05-01 12:00:00")
+    value = request.args.get(name, "").strip()
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+def _channels_arg() -> Optional[Set[int]]:
+    value = request.args.get("channels", "").strip()
+    if not value:
+        return None
+    return {int(ch) for ch in value.split(",") if ch.strip()}
+
+@gasera_bp.route("/api/logs/<path:filename>/range", methods=["GET"])
+def log_range(filename):
+    """
+    Rows of one log between `from` and `to` (inclusive, either optional),
+    optionally only for `channels` (comma-separated). Uses the sparse
+    index to read just the matching parts of the file.
+    """
+    get_segments = request.args.get("segments", "").lower() in ("1", "true", "yes")
+    log_dir = get_log_directory(temp_dir=get_segments)
+
+    try:
+        t_from = _time_arg("from")
+        t_to = _time_arg("to")
+        channels = _channels_arg()
+    except ValueError as e:
+        return jsonify({"ok": False, "error": f"Invalid range: {e}"}), 400
+
+    try:
+        path = safe_join_in_logdir(log_dir, filename)
+    except FileNotFoundError:
+        return jsonify({"ok": False, "error": "File not found"}), 404
+
+    # indexes of files still in .tmp are not persisted; the logger owns those
+    lines = iter_range(path, t_from, t_to, channels, persist_index=not get_segments)
+    return Response(
+        stream_with_context(_localize_lines(lines, request.args.get("locale"))),
+        mimetype="text/csv",
+    )
+
+@gasera_bp.route("/api/logs/<path:filename>/stats", methods=["GET"])
+def log_stats(filename):
+    """
+    Per channel x gas statistics of one log: the live accumulators of the
+    active run, its sidecar, or computed once from the file.
+    """
+    get_segments = request.args.get("segments", "").lower() in ("1", "true", "yes")
+    log_dir = get_log_directory(temp_dir=get_segments)
+
+    try:
+        path = safe_join_in_logdir(log_dir, filename)
+        writer = getattr(services.engine_service, "logger", None)
+        if writer is not None and writer.owns(path):
+            # the run being logged: no need to re-read a growing file
+            return jsonify({"ok": True, "stats": writer.run_stats.snapshot()}), 200
+
+        stats = None if get_segments else load_stats(path)
+        if stats is None:
+            run_stats = RunStats.from_log(path)
+            stats = run_stats.snapshot()
+            if not get_segments:
+                # older logs and recovered runs: summarize once
+                run_stats.save(stats_path(path))
+        return jsonify({"ok": True, "stats": stats}), 200
+    except FileNotFoundError:
+        return jsonify({"ok": False, "error": "File not found"}), 404
+    except Exception as e:
+        return jsonify({"ok": False, "error": str(e)}), 500
+
+@gasera_bp.route("/api/logs/<path:filename>/series", methods=["GET"])
+def log_series_view(filename):
+    """
+    Chart series of one log per channel x gas, downsampled to `points`
+    values each (`method` lttb or minmax), optionally limited to
+    `from`/`to`, `channels` and `gases` (comma-separated labels or CAS).
+    """
+    get_segments = request.args.get("segments", "").lower() in ("1", "true", "yes")
+    log_dir = get_log_directory(temp_dir=get_segments)
+
+    try:
+        t_from = _time_arg("from")
+        t_to = _time_arg("to")
+        channels = _channels_arg()
+        points = int(request.args.get("points", log_series.DEFAULT_POINTS))
+    except ValueError as e:
+        return jsonify({"ok": False, "error": f"Invalid arguments: {e}"}), 400
+    method = request.args.get("method", log_series.METHOD_LTTB).strip().lower()
+    gases = {g.strip() for g in request.args.get("gases", "").split(",") if g.strip()} or None
+
+    try:
+        path = safe_join_in_logdir(log_dir, filename)
+        result = log_series.get_series(path, points, method, channels, gases, t_from, t_to)
+        return jsonify({"ok": True, **result}), 200
+    except FileNotFoundError:
+        return jsonify({"ok": False, "error": "File not found"}), 404
+    except ValueError as e:
+        return jsonify({"ok": False, "error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"ok": False, "error": str(e)}), 500
+
+@gasera_bp.route("/api/run/stats", methods=["GET"])
+def run_stats():
+    """Live statistics of the run being logged (None when idle)."""
+    writer = getattr(services.engine_service, "logger", None)
+    stats = writer.run_stats.snapshot() if writer is not None else None
+    return jsonify({"ok": True, "active": writer is not None, "stats": stats}), 200
+
 @gasera_bp.route("/api/logs/delete/<path:filename>", methods=["DELETE"])
 def delete_log(filename):
     get_segments = request.args.get("segments", "").lower() in ("1", "true", "yes")
@@ -218,7 +469,14 @@ def delete_log(filename):
         if not get_segments and not filename.lower().endswith(".csv"):
             return jsonify({"ok": False, "error": "Log files can only be deleted in the default format (CSV)."}), 400
 
+        if _owned_by_active_run(path):
+            return jsonify({"ok": False, "error": "Log is still being written by the running task"}), 409
+
         os.remove(path)
+        remove_index(path)
+        remove_stats(path)
+        if not get_segments:
+            _catalog_remove(path)
         return jsonify({"ok": True, "deleted_file": filename, "segments": get_segments}), 200
     except FileNotFoundError:
         return jsonify({"ok": False, "error": "File not found"}), 404
@@ -232,20 +490,27 @@ def delete_all_logs():
     ext = ".tsv" if get_segments else ".csv"
 
     try:
-        files = [f for f in os.listdir(log_dir) if f.lower().endswith(ext)]
+        files = [f for f in os.listdir(log_dir) if f.lower().endswith((ext, RUN_EXT, column_log.COL_EXT))]
+        # the running task's log parts stay
+        files = [f for f in files if not _owned_by_active_run(os.path.join(log_dir, f))]
         for f in files:
             os.remove(os.path.join(log_dir, f))
+            remove_index(os.path.join(log_dir, f))
+            remove_stats(os.path.join(log_dir, f))
+            if not get_segments:
+                _catalog_remove(os.path.join(log_dir, f))
         return jsonify({"ok": True, "deleted_files": len(files)}), 200
     except Exception as e:
         return jsonify({"ok": False, "error": str(e)}), 500
 
 @gasera_bp.route("/api/logs/storage", methods=["GET"])
 def log_storage_info():
-    usb_root = "/media/usb0"
-    usb_path = "/media/usb0/logs"
-    internal_path = "/data/logs"
+    storage = services.storage_manager
+    usb_root = storage.usb_root
+    usb_path = storage.usb_log_dir
+    internal_path = storage.internal_dir
 
-    mounted = usb_mounted()
+    mounted = storage.usb_mounted
 
     os.makedirs(internal_path, exist_ok=True)
     if mounted:
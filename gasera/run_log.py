@@ -0,0 +1,253 @@
+# gasera/run_log.py
+"""
+Append-only run log ("write-ahead" file) used by MeasurementLogger.
+
+Every line is one record:
+
+    <kind>\t<crc32 of payload, 8 hex>\t<payload>\n
+
+    H  header row (TSV payload)
+    R  data row (TSV payload)
+    C  checkpoint: "<rows>\t<offset>" where offset is the byte position of
+       the checkpoint line itself; everything before it was fsync'ed
+
+Exports (CSV/TSV downloads) are a streamed view of the H/R payloads, so
+finishing a run is a rename, not a copy. Crash recovery trusts the file up
+to the last valid checkpoint and only verifies the records after it.
+"""
+from __future__ import annotations
+
+import os
+import zlib
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from gasera.fastcopy import copy_into
+
+RUN_EXT = ".wal"
+
+REC_HEADER = "H"
+REC_ROW = "R"
+REC_CHECKPOINT = "C"
+
+EXPORT_NEWLINE = "\r\n"     # matches the csv module output of the old TSV logs
+TAIL_CHUNK = 64 * 1024
+
+
+def encode_record(kind: str, payload: str) -> bytes:
+    data = payload.encode("utf-8")
+    return b"%s\t%08x\t%s\n" % (kind.encode(), zlib.crc32(data), data)
+
+
+def decode_record(line: bytes) -> Optional[Tuple[str, str]]:
+    """(kind, payload) for a complete, intact line; None otherwise."""
+    if not line.endswith(b"\n"):
+        return None
+    parts = line[:-1].split(b"\t", 2)
+    if len(parts) != 3 or len(parts[1]) != 8:
+        return None
+    kind, crc, data = parts
+    try:
+        if int(crc, 16) != zlib.crc32(data):
+            return None
+        return kind.decode(), data.decode("utf-8")
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def checkpoint_payload(rows: int, offset: int) -> str:
+    return f"{rows}\t{offset}"
+
+
+def _valid_checkpoint(line: bytes, offset: int) -> Optional[int]:
+    """Row count of a checkpoint written at `offset`, or None."""
+    rec = decode_record(line)
+    if rec is None or rec[0] != REC_CHECKPOINT:
+        return None
+    try:
+        rows, at = (int(x) for x in rec[1].split("\t"))
+    except ValueError:
+        return None
+    return rows if at == offset else None
+
+
+def find_last_checkpoint(path: str) -> Tuple[int, int]:
+    """
+    (offset just past the last valid checkpoint, rows before it), reading
+    only the tail of the file; (0, 0) when there is none.
+    """
+    size = os.path.getsize(path)
+    marker = REC_CHECKPOINT.encode() + b"\t"
+    chunk = TAIL_CHUNK
+
+    with open(path, "rb") as f:
+        while True:
+            start = max(0, size - chunk)
+            f.seek(start)
+            pieces = f.read(size - start).split(b"\n")[:-1]   # drop the unterminated rest
+
+            lines = []
+            at = start
+            for piece in pieces:
+                lines.append((at, piece + b"\n"))
+                at += len(piece) + 1
+            if start > 0:
+                lines = lines[1:]   # may begin mid-line
+
+            for at, line in reversed(lines):
+                if line.startswith(marker):
+                    rows = _valid_checkpoint(line, at)
+                    if rows is not None:
+                        return at + len(line), rows
+
+            if start == 0:
+                return 0, 0
+            chunk *= 2
+
+
+def recover_tail(path: str) -> Tuple[int, int]:
+    """
+    Verify records after the last checkpoint and truncate a torn or corrupt
+    tail. Returns (rows in the file, bytes truncated).
+    """
+    offset, rows = find_last_checkpoint(path)
+    size = os.path.getsize(path)
+
+    good = offset
+    with open(path, "rb") as f:
+        f.seek(offset)
+        for line in f:
+            rec = decode_record(line)
+            if rec is None:
+                break
+            if rec[0] == REC_CHECKPOINT and _valid_checkpoint(line, good) is None:
+                break
+            if rec[0] == REC_ROW:
+                rows += 1
+            good += len(line)
+
+    if good < size:
+        with open(path, "r+b") as f:
+            f.truncate(good)
+            f.flush()
+            os.fsync(f.fileno())
+    return rows, size - good
+
+
+def _iter_records(path: str, limit: Optional[int] = None) -> Iterator[Tuple[str, str]]:
+    pos = 0
+    with open(path, "rb") as f:
+        for line in f:
+            pos += len(line)
+            if limit is not None and pos > limit:
+                return
+            rec = decode_record(line)
+            if rec is None:
+                return      # torn tail of a run still being written
+            yield rec
+
+
+def _export_lines(records: Iterable[Tuple[str, str]]) -> Iterator[str]:
+    header = False
+    for kind, payload in records:
+        if kind == REC_HEADER:
+            if header:
+                continue    # every part repeats it
+            header = True
+        elif kind != REC_ROW:
+            continue
+        yield payload + EXPORT_NEWLINE
+
+
+def iter_export(path: str, limit: Optional[int] = None) -> Iterator[str]:
+    """TSV lines (header once + rows) of one run log, up to byte `limit`."""
+    return _export_lines(_iter_records(path, limit))
+
+
+def iter_export_parts(parts: Iterable[Tuple[str, Optional[int]]]) -> Iterator[str]:
+    return _export_lines(rec for path, limit in parts for rec in _iter_records(path, limit))
+
+
+def count_rows(path: str) -> int:
+    """Rows in a finished run log (checkpoint count + verified tail)."""
+    offset, rows = find_last_checkpoint(path)
+    with open(path, "rb") as f:
+        f.seek(offset)
+        for line in f:
+            rec = decode_record(line)
+            if rec is None:
+                break
+            if rec[0] == REC_ROW:
+                rows += 1
+    return rows
+
+
+def rows_at(path: str, limit: Optional[int] = None) -> int:
+    """Rows in a run log, or in its first `limit` bytes when cut at a checkpoint."""
+    if limit is None:
+        return count_rows(path)
+    if limit <= 0:
+        return 0
+
+    with open(path, "rb") as f:
+        start = max(0, limit - 512)
+        f.seek(start)
+        block = f.read(limit - start)
+    line = block[block.rfind(b"\n", 0, len(block) - 1) + 1:]
+    rows = _valid_checkpoint(line, limit - len(line))
+    if rows is not None:
+        return rows
+
+    # not cut at a checkpoint: count the hard way
+    rows = 0
+    for payload in iter_export(path, limit):
+        rows += 1
+    return max(0, rows - 1)
+
+
+def _header_length(path: str) -> int:
+    """Bytes of the header record a part starts with (0 if it has none)."""
+    with open(path, "rb") as f:
+        line = f.readline()
+    rec = decode_record(line)
+    return len(line) if rec is not None and rec[0] == REC_HEADER else 0
+
+
+def join_parts(parts: Sequence[Tuple[str, Optional[int]]], target: str) -> Tuple[List[str], int]:
+    """
+    Concatenate run log parts ((path, limit) pairs) into `target` with
+    kernel-side copies, then add one checkpoint for the whole file.
+    Checkpoints copied in from the parts no longer match their offsets and
+    are ignored by readers. Every part starts with the header record; only
+    the first part copied keeps it. Unreadable or short parts are skipped.
+    Returns (skipped paths, bytes copied).
+    """
+    missing: List[str] = []
+    rows = 0
+    copied = 0
+    header = False
+    tmp = target + ".part"
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        for path, limit in parts:
+            start = os.lseek(fd, 0, os.SEEK_CUR)
+            try:
+                part_rows = rows_at(path, limit)
+                header_len = _header_length(path)
+                n, _ = copy_into(fd, path, limit, start=header_len if header else 0)
+            except OSError:
+                # drop whatever made it across so no torn record remains
+                os.ftruncate(fd, start)
+                os.lseek(fd, start, os.SEEK_SET)
+                missing.append(path)
+                continue
+            rows += part_rows
+            copied += n
+            header = header or 0 < header_len <= n
+
+        offset = os.lseek(fd, 0, os.SEEK_CUR)
+        os.write(fd, encode_record(REC_CHECKPOINT, checkpoint_payload(rows, offset)))
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+    os.replace(tmp, target)
+    return missing, copied
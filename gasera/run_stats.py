@@ -0,0 +1,143 @@
+# gasera/run_stats.py
+"""
+Streaming per-run statistics: count, mean, variance, min, max and last
+value for every channel x gas, updated in O(1) per value (Welford), so
+dashboards and reports never rescan the raw log.
+
+The logger keeps one RunStats per run and writes it next to the finished
+log as `<stem>.stats.json`; older logs are summarized on first request.
+"""
+from __future__ import annotations
+
+import json
+import math
+import os
+import threading
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from gasera.log_reader import LogReader
+
+STATS_EXT = ".stats.json"
+
+
+def stats_path(log_path: str) -> str:
+    """Sidecar path; shared by every format of the same run (.wal/.gcl/.csv)."""
+    return os.path.splitext(log_path)[0] + STATS_EXT
+
+
+def remove_stats(log_path: str) -> None:
+    try:
+        os.remove(stats_path(log_path))
+    except FileNotFoundError:
+        pass
+
+
+class Welford:
+    """Running count / mean / variance / min / max / last of one series."""
+
+    __slots__ = ("count", "mean", "m2", "min", "max", "last")
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.last = math.nan
+
+    def add(self, x: float) -> None:
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+        if x < self.min:
+            self.min = x
+        if x > self.max:
+            self.max = x
+        self.last = x
+
+    @property
+    def variance(self) -> Optional[float]:
+        """Sample variance; None below two values."""
+        return self.m2 / (self.count - 1) if self.count > 1 else None
+
+    def to_dict(self) -> Dict[str, Any]:
+        variance = self.variance
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "variance": variance,
+            "std": math.sqrt(variance) if variance is not None else None,
+            "min": self.min,
+            "max": self.max,
+            "last": self.last,
+        }
+
+
+class RunStats:
+    """
+    Welford accumulators per channel x gas. add() runs on the log writer
+    thread; snapshots are taken from HTTP/SSE threads, hence the lock.
+    `version` changes with every row, `last_channel` names the channel it
+    touched.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cells: Dict[int, Dict[str, Welford]] = {}
+        self.version = 0
+        self.last_channel: Optional[int] = None
+
+    def add(self, channel: int, values: Iterable[Tuple[str, float]]) -> None:
+        with self._lock:
+            gases = self._cells.get(channel)
+            if gases is None:
+                gases = self._cells[channel] = {}
+            for name, ppm in values:
+                if math.isnan(ppm):
+                    continue
+                cell = gases.get(name)
+                if cell is None:
+                    cell = gases[name] = Welford()
+                cell.add(ppm)
+            self.version += 1
+            self.last_channel = channel
+
+    def channel_snapshot(self, channel: int) -> Dict[str, Any]:
+        with self._lock:
+            gases = self._cells.get(channel, {})
+            return {name: cell.to_dict() for name, cell in gases.items()}
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "version": self.version,
+                "channels": {
+                    str(ch): {name: cell.to_dict() for name, cell in gases.items()}
+                    for ch, gases in sorted(self._cells.items())
+                },
+            }
+
+    def save(self, path: str) -> None:
+        tmp = path + ".part"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    @classmethod
+    def from_log(cls, path: str) -> "RunStats":
+        stats = cls()
+        with LogReader(path) as reader:
+            for chunk in reader.chunks():
+                columns = list(chunk.ppm.items())
+                for i, channel in enumerate(chunk.channel):
+                    stats.add(channel, ((name, values[i]) for name, values in columns))
+        return stats
+
+
+def load_stats(log_path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(stats_path(log_path), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
@@ -0,0 +1,224 @@
+# gasera/sse/async_server.py
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import FrozenSet, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from system import services
+from system.log_utils import debug, info, warn, error
+from gasera.sse.broker import SseClient, parse_topics
+
+SSE_PATH = "/gasera/api/measurement/events"
+SSE_PORT = 5002
+STATE_PATH = "/system/state"
+MAX_HEADER_BYTES = 16 * 1024
+
+STATE_DEFAULT_TIMEOUT = 25.0
+STATE_MAX_TIMEOUT = 60.0
+
+
+class AsyncSseClient(SseClient):
+    """
+    Broker subscriber consumed by the event loop.
+
+    offer() runs on the broker thread and hands frames to the loop with
+    call_soon_threadsafe; the pending counter keeps the queue bounded.
+    """
+
+    def __init__(self, topics: FrozenSet[str], max_queue: int, loop: asyncio.AbstractEventLoop):
+        super().__init__(topics, max_queue)
+        self._loop = loop
+        self._max_queue = max_queue
+        self._aqueue: "asyncio.Queue[Optional[bytes]]" = asyncio.Queue()
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+
+    def offer(self, frame: bytes) -> bool:
+        with self._pending_lock:
+            if self._pending >= self._max_queue:
+                return False
+            self._pending += 1
+        self._loop.call_soon_threadsafe(self._aqueue.put_nowait, frame)
+        return True
+
+    def close(self) -> None:
+        self._loop.call_soon_threadsafe(self._aqueue.put_nowait, None)
+
+    def depth(self) -> int:
+        return self._pending
+
+    async def next_frame(self) -> Optional[bytes]:
+        frame = await self._aqueue.get()
+        if frame is not None:
+            with self._pending_lock:
+                self._pending -= 1
+        return frame
+
+
+def _response_head(status: str, content_type: str, extra: str = "") -> bytes:
+    return (
+        f"HTTP/1.1 {status}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        "Access-Control-Allow-Origin: *\r\n"
+        f"{extra}"
+        "\r\n"
+    ).encode()
+
+
+async def _read_request(reader: asyncio.StreamReader) -> Tuple[str, str, dict]:
+    head = await reader.readuntil(b"\r\n\r\n")
+    if len(head) > MAX_HEADER_BYTES:
+        raise ValueError("request header too large")
+
+    lines = head.decode("latin-1").split("\r\n")
+    method, target, _ = lines[0].split(" ", 2)
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+    return method, target, headers
+
+
+async def _handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    loop = asyncio.get_running_loop()
+    client: Optional[AsyncSseClient] = None
+    try:
+        try:
+            method, target, headers = await _read_request(reader)
+        except (ValueError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            writer.write(_response_head("400 Bad Request", "text/plain", "Content-Length: 0\r\nConnection: close\r\n"))
+            return
+
+        url = urlsplit(target)
+        if method != "GET" or url.path not in (SSE_PATH, STATE_PATH):
+            writer.write(_response_head("404 Not Found", "text/plain", "Content-Length: 0\r\nConnection: close\r\n"))
+            return
+
+        query = parse_qs(url.query)
+        try:
+            topics = parse_topics(query.get("topics", [None])[0])
+        except ValueError as e:
+            body = str(e).encode()
+            writer.write(_response_head("400 Bad Request", "text/plain", f"Content-Length: {len(body)}\r\nConnection: close\r\n") + body)
+            return
+
+        if url.path == STATE_PATH:
+            await _serve_state(writer, query, headers, topics)
+            return
+
+        last_event_id = headers.get("last-event-id") or query.get("last_event_id", [None])[0]
+        client = services.sse_broker.subscribe(
+            topics,
+            last_event_id,
+            client_factory=lambda t, n: AsyncSseClient(t, n, loop),
+        )
+
+        writer.write(_response_head(
+            "200 OK",
+            "text/event-stream",
+            "Cache-Control: no-cache\r\nConnection: keep-alive\r\nX-Accel-Buffering: no\r\n",
+        ))
+        await writer.drain()
+
+        while True:
+            frame = await client.next_frame()
+            if frame is None:
+                break   # disconnected by the broker (too slow)
+            writer.write(frame)
+            await writer.drain()
+
+    except (ConnectionError, asyncio.CancelledError):
+        pass
+    except Exception as e:
+        warn(f"[SSE] async stream error: {e}")
+    finally:
+        if client is not None:
+            services.sse_broker.unsubscribe(client)
+        try:
+            writer.close()
+        except Exception:
+            pass
+        debug("[SSE] async client disconnected")
+
+
+async def _serve_state(writer: asyncio.StreamWriter, query: dict, headers: dict, topics: FrozenSet[str]) -> None:
+    """
+    Long-poll of the combined state (the blocking form of GET /system/state).
+    - ?since=<version> (or If-None-Match: <etag>) waits until a topic in
+      ?topics= changes or ?timeout= seconds pass (default 25, max 60); then 304
+    - an unknown version (other boot, newer than the current one, or out of
+      the history) gets the full state at once
+    Waiting costs a socket and a broker listener, not a thread.
+    """
+    broker = services.sse_broker
+    try:
+        raw_since = query.get("since", [None])[0]
+        since = int(raw_since) if raw_since is not None else broker.parse_version(headers.get("if-none-match"))
+        timeout = float(query.get("timeout", [STATE_DEFAULT_TIMEOUT])[0])
+    except ValueError as e:
+        body = str(e).encode()
+        writer.write(_response_head("400 Bad Request", "text/plain", f"Content-Length: {len(body)}\r\nConnection: close\r\n") + body)
+        return
+    timeout = max(0.0, min(timeout, STATE_MAX_TIMEOUT))
+
+    loop = asyncio.get_running_loop()
+    wake = asyncio.Event()
+
+    def listener():
+        loop.call_soon_threadsafe(wake.set)
+
+    broker.add_listener(listener)
+    try:
+        deadline = loop.time() + timeout
+        while True:
+            # clear before checking, so a version published in between wakes the next wait
+            wake.clear()
+            if broker.has_changes(since, topics):
+                break
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                await asyncio.wait_for(wake.wait(), remaining)
+            except asyncio.TimeoutError:
+                break
+    finally:
+        broker.remove_listener(listener)
+
+    seq, body = broker.state_since(since, topics)
+    etag = broker.etag(seq)
+    if body is None:
+        writer.write(_response_head("304 Not Modified", "application/json", f"ETag: {etag}\r\nContent-Length: 0\r\nConnection: close\r\n"))
+    else:
+        data = body.encode()
+        writer.write(_response_head(
+            "200 OK",
+            "application/json",
+            f"ETag: {etag}\r\nCache-Control: no-cache\r\nContent-Length: {len(data)}\r\nConnection: close\r\n",
+        ) + data)
+    await writer.drain()
+
+
+def start_sse_server(host: str = "0.0.0.0", port: int = SSE_PORT) -> threading.Thread:
+    """
+    Serve the SSE endpoint and the /system/state long-poll from one
+    event-loop thread. Idle streams and waiting polls cost a socket, not a
+    worker thread, so dashboards and pollers cannot starve the Waitress pool
+    that handles API requests.
+    """
+    def _run():
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            server = loop.run_until_complete(asyncio.start_server(_handle, host, port, limit=MAX_HEADER_BYTES))
+            info(f"[SSE] async server listening on http://{host}:{port} ({SSE_PATH}, {STATE_PATH})")
+            loop.run_until_complete(server.serve_forever())
+        except Exception as e:
+            error(f"[SSE] async server stopped: {e}")
+
+    thread = threading.Thread(target=_run, daemon=True, name="sse-async")
+    thread.start()
+    return thread
@@ -0,0 +1,409 @@
+# gasera/sse/broker.py
+from __future__ import annotations
+
+import json
+import queue
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from system import services
+from system.log_utils import debug, info, warn, error
+
+# topic name -> key in the SSE payload (progress fields stay top-level)
+TOPIC_KEYS = {
+    "live": "live_data",
+    "device": "device_status",
+    "motion": "motion_status",
+    "queue": "task_queue",
+    "stats": "run_stats",
+}
+TOPICS: FrozenSet[str] = frozenset(("progress",) + tuple(TOPIC_KEYS))
+
+KEEPALIVE_FRAME = b": keep-alive\n\n"
+
+
+def parse_topics(raw: Optional[str]) -> FrozenSet[str]:
+    """'progress,live' -> frozenset; empty/None means all topics. Raises ValueError on unknown names."""
+    if not raw:
+        return TOPICS
+    topics = frozenset(t.strip() for t in raw.split(",") if t.strip())
+    unknown = topics - TOPICS
+    if unknown:
+        raise ValueError(f"unknown topics: {', '.join(sorted(unknown))}")
+    return topics or TOPICS
+
+
+class SseClient:
+    """One subscriber: topic filter + bounded queue of pre-encoded frames (None = disconnect)."""
+
+    def __init__(self, topics: FrozenSet[str], max_queue: int):
+        self.topics = topics
+        self.queue: "queue.Queue[Optional[bytes]]" = queue.Queue(maxsize=max_queue)
+        self.closed = False
+        self.sent = 0
+        self.connected_at = time.monotonic()
+
+    def offer(self, frame: bytes) -> bool:
+        """Enqueue without blocking; False when the client is too far behind."""
+        try:
+            self.queue.put_nowait(frame)
+            return True
+        except queue.Full:
+            return False
+
+    def close(self) -> None:
+        """Drop pending frames and wake the consumer with the disconnect marker."""
+        try:
+            while True:
+                self.queue.get_nowait()
+        except queue.Empty:
+            pass
+        self.queue.put_nowait(None)
+
+    def depth(self) -> int:
+        return self.queue.qsize()
+
+    def get(self, timeout: Optional[float] = None) -> Optional[bytes]:
+        return self.queue.get(timeout=timeout)
+
+
+class SseBroker:
+    """
+    Central SSE publisher.
+
+    A single thread samples the status services, serializes each topic once
+    when it actually changes, and fans the same encoded frame out to every
+    subscriber with a matching topic filter. Frames keep the existing payload
+    contract: progress fields at top level plus changed extras
+    (device_status / live_data / motion_status / task_queue).
+
+    Clients whose queue fills up are disconnected instead of slowing others.
+
+    Every frame carries an id "<boot>-<seq>". The last `history` events are
+    kept so a reconnecting client (Last-Event-ID) gets what it missed; when
+    the id is unknown or too old it gets a full snapshot instead.
+    """
+
+    def __init__(self, interval: float = 0.5, keepalive: float = 10.0, max_queue: int = 32, history: int = 512):
+        self._interval = interval
+        self._keepalive = keepalive
+        self._max_queue = max_queue
+
+        # ids restart with the process; the boot prefix invalidates stale ones
+        self._boot = format(int(time.time()), "x")
+        self._seq = 0
+        self._history: Deque[Tuple[int, FrozenSet[str], Dict[str, str]]] = deque(maxlen=history)
+
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[], None]] = []      # long-poll waiters
+        self._clients: List[SseClient] = []
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        # last published state per topic (broker thread only)
+        self._fragments: Dict[str, str] = {}
+        self._progress_version: Optional[int] = None
+        self._last_live: Any = None
+        self._device_version: Optional[int] = None
+        self._last_motion: Optional[Dict[str, Any]] = None
+        self._queue_version: Optional[int] = None
+        self._run_stats_version: Any = None
+        self._last_frame_at = time.monotonic()
+
+        self._stats = {
+            "frames_built": 0,
+            "frames_sent": 0,
+            "slow_disconnects": 0,
+            "connects": 0,
+            "resumed": 0,
+            "resync_snapshots": 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Subscriptions
+    # ------------------------------------------------------------------
+    def subscribe(
+        self,
+        topics: Iterable[str] = TOPICS,
+        last_event_id: Optional[str] = None,
+        client_factory: Callable[[FrozenSet[str], int], SseClient] = SseClient,
+    ) -> SseClient:
+        topics = frozenset(topics)
+        with self._lock:
+            frames = self._replay(topics, last_event_id)
+            if frames is None:
+                frame = self._frame(topics, set(self._fragments), self._fragments, self._seq)
+                frames = [frame] if frame else []
+                if last_event_id:
+                    self._stats["resync_snapshots"] += 1
+            elif frames:
+                self._stats["resumed"] += 1
+
+            client = client_factory(topics, self._max_queue + len(frames))
+            for frame in frames:
+                client.offer(frame)
+            self._clients.append(client)
+            self._stats["connects"] += 1
+        debug(f"[SSE] client subscribed topics={sorted(topics)} last_event_id={last_event_id} replay={len(frames)}")
+        return client
+
+    def _replay(self, topics: FrozenSet[str], last_event_id: Optional[str]) -> Optional[List[bytes]]:
+        """Frames after last_event_id, or None when a full snapshot is needed (caller holds lock)."""
+        if not last_event_id:
+            return None
+        boot, _, seq = last_event_id.partition("-")
+        if boot != self._boot or not seq.isdigit():
+            return None
+
+        last_seq = int(seq)
+        if last_seq > self._seq:
+            return None
+        if last_seq == self._seq:
+            return []
+        if not self._history or last_seq < self._history[0][0] - 1:
+            return None     # fell out of the buffer
+
+        frames = []
+        for event_seq, changed, fragments in self._history:
+            if event_seq > last_seq:
+                frame = self._frame(topics, changed, fragments, event_seq)
+                if frame:
+                    frames.append(frame)
+        return frames
+
+    def unsubscribe(self, client: SseClient) -> None:
+        with self._lock:
+            if client in self._clients:
+                self._clients.remove(client)
+        client.closed = True
+        debug("[SSE] client unsubscribed")
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+
+        def _loop():
+            while not self._stop_event.is_set():
+                try:
+                    self._tick()
+                except Exception as e:
+                    error(f"[SSE] broker error: {e}")
+                self._stop_event.wait(self._interval)
+
+        self._thread = threading.Thread(target=_loop, daemon=True, name="sse-broker")
+        self._thread.start()
+        info("[SSE] broker started")
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    # ------------------------------------------------------------------
+    # Change detection (one serialization per change)
+    # ------------------------------------------------------------------
+    def _collect(self) -> Dict[str, str]:
+        """Return {topic: encoded JSON} for topics that changed since the last tick."""
+        changed: Dict[str, str] = {}
+
+        snapshot = services.live_status_service.get_progress_snapshot()
+        if snapshot.version != self._progress_version:
+            self._progress_version = snapshot.version
+            changed["progress"] = snapshot.to_json()
+
+        sample = services.live_status_service.get_latest_live_sample()
+        if sample is not None and sample is not self._last_live:
+            self._last_live = sample
+            changed["live"] = json.dumps(sample.to_dict(), sort_keys=True)
+
+        device_service = services.device_status_service
+        if device_service.version != self._device_version:
+            self._device_version = device_service.version
+            device = device_service.get_device_snapshots()
+            changed["device"] = json.dumps(device, sort_keys=True)
+            # the buzzer flag is consumed once, by the shared frame
+            if device.get("buzzer", {}).get("_changed"):
+                services.device_status_service.clear_buzzer_change()
+
+        motion = services.motion_status_service.get_motion_snapshots()
+        if motion is not None and motion != self._last_motion:
+            self._last_motion = motion
+            changed["motion"] = json.dumps(motion, sort_keys=True)
+
+        task_queue = services.task_queue
+        if task_queue is not None and task_queue.version != self._queue_version:
+            self._queue_version = task_queue.version
+            changed["queue"] = json.dumps(task_queue.state(), sort_keys=True)
+
+        # only the channel the last row touched; clients load the rest from /api/run/stats
+        writer = getattr(services.engine_service, "logger", None)
+        stats = writer.run_stats if writer is not None else None
+        version = (id(stats), stats.version) if stats is not None else None
+        if version != self._run_stats_version:
+            self._run_stats_version = version
+            if stats is not None and stats.last_channel is not None:
+                changed["stats"] = json.dumps({
+                    "version": stats.version,
+                    "channel": stats.last_channel,
+                    "gases": stats.channel_snapshot(stats.last_channel),
+                }, sort_keys=True)
+
+        return changed
+
+    def _frame(self, topics: FrozenSet[str], changed: Iterable[str], fragments: Dict[str, str], seq: int) -> Optional[bytes]:
+        """Assemble one frame for a topic filter from encoded fragments."""
+        if not (topics & set(changed)):
+            return None
+
+        parts = []
+        progress = fragments.get("progress")
+        if "progress" in topics and progress and progress != "{}":
+            parts.append(progress[1:-1])
+        for topic, key in TOPIC_KEYS.items():
+            if topic in topics and topic in changed and topic in fragments:
+                parts.append(f'"{key}": {fragments[topic]}')
+
+        if not parts:
+            return None
+        head = f"id: {self._boot}-{seq}\n" if seq else ""
+        return (head + "data: {" + ", ".join(parts) + "}\n\n:\n\n").encode()
+
+    # ------------------------------------------------------------------
+    # Fan-out
+    # ------------------------------------------------------------------
+    def _tick(self) -> None:
+        changed = self._collect()
+
+        # record + snapshot clients atomically, so a subscriber gets each
+        # event exactly once (either replayed or fanned out)
+        with self._lock:
+            if changed:
+                self._fragments.update(changed)
+                self._seq += 1
+                # progress is top-level in every frame: keep the value current at this event
+                fragments = dict(changed)
+                if "progress" in self._fragments:
+                    fragments["progress"] = self._fragments["progress"]
+                self._history.append((self._seq, frozenset(changed), fragments))
+            seq = self._seq
+            clients = list(self._clients)
+            listeners = list(self._listeners) if changed else []
+
+        for listener in listeners:
+            try:
+                listener()
+            except Exception as e:
+                warn(f"[SSE] long-poll listener failed: {e}")
+
+        now = time.monotonic()
+        frames: Dict[FrozenSet[str], Optional[bytes]] = {}
+
+        if changed:
+            fragments = self._fragments
+            for client in clients:
+                if client.topics not in frames:
+                    frames[client.topics] = self._frame(client.topics, changed, fragments, seq)
+            self._stats["frames_built"] += sum(1 for f in frames.values() if f)
+            self._last_frame_at = now
+        elif now - self._last_frame_at >= self._keepalive:
+            frames = {client.topics: KEEPALIVE_FRAME for client in clients}
+            self._last_frame_at = now
+
+        for client in clients:
+            frame = frames.get(client.topics)
+            if frame:
+                self._offer(client, frame)
+
+    def _offer(self, client: SseClient, frame: bytes) -> None:
+        if client.closed:
+            return
+        if client.offer(frame):
+            client.sent += 1
+            self._stats["frames_sent"] += 1
+        else:
+            warn("[SSE] client too slow, disconnecting")
+            self._stats["slow_disconnects"] += 1
+            self.unsubscribe(client)
+            client.close()
+
+    # ------------------------------------------------------------------
+    # Long-poll access (same versions as the SSE event ids)
+    # ------------------------------------------------------------------
+    def parse_version(self, tag: Optional[str]) -> Optional[int]:
+        """'<boot>-<seq>' (ETag / event id) -> seq, None when from another boot."""
+        if not tag:
+            return None
+        boot, _, seq = tag.strip().removeprefix("W/").strip('"').partition("-")
+        if boot != self._boot or not seq.isdigit():
+            return None
+        return int(seq)
+
+    def etag(self, seq: int) -> str:
+        return f'"{self._boot}-{seq}"'
+
+    def add_listener(self, callback: Callable[[], None]) -> None:
+        """Call `callback` (on the broker thread, without the lock) after every new version."""
+        with self._lock:
+            self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[], None]) -> None:
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    def _changed_since(self, since: Optional[int]) -> Optional[set]:
+        """
+        Topics changed after `since`; None when `since` is unknown: missing,
+        ahead of the current version (a client of an earlier boot) or older
+        than the history (caller holds lock).
+        """
+        if since is None or since > self._seq:
+            return None
+        if since == self._seq:
+            return set()
+        if not self._history or since < self._history[0][0] - 1:
+            return None
+        changed = set()
+        for event_seq, event_topics, _ in self._history:
+            if event_seq > since:
+                changed |= event_topics
+        return changed
+
+    def has_changes(self, since: Optional[int], topics: FrozenSet[str] = TOPICS) -> bool:
+        """True when state_since() would return a body (something in `topics` is newer, or `since` is unknown)."""
+        with self._lock:
+            changed = self._changed_since(since)
+        return changed is None or bool(changed & topics)
+
+    def state_since(self, since: Optional[int], topics: FrozenSet[str] = TOPICS) -> Tuple[int, Optional[str]]:
+        """
+        JSON with the topics changed after `since` (all topics when `since` is
+        unknown), or None when nothing in `topics` changed. Progress is nested
+        under "progress".
+        """
+        with self._lock:
+            seq = self._seq
+            fragments = dict(self._fragments)
+            changed = self._changed_since(since)
+        if changed is None:
+            changed = set(fragments)
+        elif not changed & topics:
+            return seq, None
+
+        parts = [f'"version": {seq}', f'"etag": {json.dumps(self.etag(seq))}']
+        parts.append('"changed": ' + json.dumps(sorted(changed & topics)))
+        for topic in sorted(changed & topics):
+            if topic in fragments:
+                parts.append(f'"{TOPIC_KEYS.get(topic, topic)}": {fragments[topic]}')
+        return seq, "{" + ", ".join(parts) + "}"
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            clients = [
+                {"topics": sorted(c.topics), "sent": c.sent, "depth": c.depth()}
+                for c in self._clients
+            ]
+        return {**self._stats, "clients": clients}
@@ -1,13 +1,16 @@
 from __future__ import annotations
 
 import threading
-import time
-from typing import Dict, Any
+from collections import deque
+from typing import Callable, Deque, Dict, Any, List, Optional
 
-from system.log_utils import debug
+from system.log_utils import debug, warn
 from system.preferences import KEY_BUZZER_ENABLED
 from system import services
-from gasera.storage_utils import check_usb_change
+from gasera import clock
+from gasera.storage_manager import USB_MOUNT
+
+MEASURING_CODE = 5
 
 
 class DeviceStatusService:
@@ -15,9 +18,26 @@ class DeviceStatusService:
 
     Usage: instantiate after `system.services` wiring, then call
     `register_callbacks()` and `start_poller()` from the app init.
+
+    Poll cadence adapts to the analyzer state:
+    - fast:      for a short window after STAM/STPM (expect_transition) and
+                 when a measurement phase is about to end (learned durations)
+    - measuring: regular cadence while measuring
+    - idle:      slow cadence while idle
+    - offline:   exponential backoff up to `offline_max`
+
+    Consumers can subscribe() to be called on change, or compare `version`.
     """
 
-    def __init__(self, poll_interval: float = 2.0):
+    def __init__(
+        self,
+        fast_interval: float = 0.5,
+        measuring_interval: float = 2.0,
+        idle_interval: float = 5.0,
+        offline_min: float = 2.0,
+        offline_max: float = 30.0,
+        transition_window: float = 10.0,
+    ):
         self._latest_device_status: Dict[str, Any] = {
             "connection": {"online": False},
             "usb": {"mounted": False},
@@ -30,8 +50,35 @@ class DeviceStatusService:
 
         self._lock = threading.RLock()
 
-        self._device_poll_interval = poll_interval
+        self._fast_interval = fast_interval
+        self._measuring_interval = measuring_interval
+        self._idle_interval = idle_interval
+        self._offline_min = offline_min
+        self._offline_max = offline_max
+        self._transition_window = transition_window
+
         self._poller_thread: threading.Thread | None = None
+        self._wake = threading.Event()
+        self._fast_until = 0.0
+        self._offline_interval = offline_min
+
+        # phase boundary prediction (poller thread only)
+        self._phase: Optional[str] = None
+        self._phase_started_at = 0.0
+        self._phase_durations: Dict[str, float] = {}
+
+        self._version = 0
+        self._subscribers: List[Callable[[Dict[str, Any]], None]] = []
+
+        self._poll_times: Deque[float] = deque(maxlen=120)
+        self._metrics: Dict[str, Any] = {
+            "polls": 0,
+            "changes": 0,
+            "errors": 0,
+            "mode": "idle",
+            "interval": idle_interval,
+            "last_poll_at": None,
+        }
 
     # Public accessors
     def get_device_snapshots(self) -> Dict[str, Any]:
@@ -56,62 +103,144 @@ class DeviceStatusService:
         with self._lock:
             return self._latest_device_status.get("gasera", {}).copy()
 
+    @property
+    def version(self) -> int:
+        """Increments whenever the device snapshot changes."""
+        return self._version
+
+    def subscribe(self, cb: Callable[[Dict[str, Any]], None]) -> None:
+        """Call cb(snapshot) on every change (from the poller thread; keep it short)."""
+        with self._lock:
+            self._subscribers.append(cb)
+
     def clear_buzzer_change(self) -> None:
         with self._lock:
             self._buzzer_change_pending = None
 
-    # Internal updaters
-    def _update_usb_status(self) -> None:
-        try:
-            mounted, _ = check_usb_change()
-        except Exception:
-            mounted = self._latest_usb_mounted
+    def expect_transition(self, window: Optional[float] = None) -> None:
+        """Poll fast for a while (call after STAM/STPM) and poll right now."""
+        self._fast_until = clock.monotonic() + (window or self._transition_window)
+        self._wake.set()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        now = clock.monotonic()
+        with self._lock:
+            out = dict(self._metrics)
+            times = list(self._poll_times)
+        window = times[-1] - times[0] if len(times) > 1 else 0.0
+        out["polls_per_min"] = round((len(times) - 1) * 60.0 / window, 1) if window > 0 else 0.0
+        out["staleness_s"] = round(now - out["last_poll_at"], 2) if out["last_poll_at"] else None
+        out["version"] = self._version
+        out["last_poll_at"] = None if out["last_poll_at"] is None else round(out["last_poll_at"], 2)
+        return out
+
+    # Change notification
+    def _changed(self) -> None:
+        with self._lock:
+            self._version += 1
+            self._metrics["changes"] += 1
+            subscribers = list(self._subscribers)
+        if not subscribers:
+            return
+        snapshot = self.get_device_snapshots()
+        for cb in subscribers:
+            try:
+                cb(snapshot)
+            except Exception as e:
+                debug(f"[DEVICE] subscriber error: {e}")
 
+    # Internal updaters
+    def _on_storage_event(self, event: str, log_root: str) -> None:
         with self._lock:
-            self._latest_usb_mounted = mounted
+            self._latest_usb_mounted = event == USB_MOUNT
+        debug(f"[DEVICE] {event} ({log_root})")
+        self._changed()
 
-    def _update_gasera_status(self) -> None:
+    def _update_gasera_status(self) -> bool:
+        status: Dict[str, Any]
         try:
             dev_status = services.gasera_controller.get_device_status()
         except Exception:
-            with self._lock:
-                self._latest_device_status["gasera"] = {"online": False, "error": True}
-            return
+            dev_status = None
 
         if not dev_status or dev_status.error:
-            with self._lock:
-                self._latest_device_status["gasera"] = {"online": False, "error": True}
-            return
+            status = {"online": False, "error": True}
+        else:
+            status = {
+                "online": True,
+                "status": dev_status.status_str,
+                "status_code": dev_status.status_code,
+            }
+            if dev_status.status_code == MEASURING_CODE:
+                status["phase"] = self._read_gasera_phase()
 
-        status = {
-            "online": True,
-            "status": dev_status.status_str,
-            "status_code": dev_status.status_code,
-        }
+        self._track_phase(status.get("phase"))
 
         with self._lock:
+            changed = status != self._latest_device_status.get("gasera")
             self._latest_device_status["gasera"] = status
+        return changed
+
+    def _read_gasera_phase(self) -> str:
+        try:
+            meas_status = services.gasera_controller.get_measurement_status()
+            return meas_status.description if meas_status and not meas_status.error else "unknown"
+        except Exception:
+            return "unknown"
+
+    def _track_phase(self, phase: Optional[str]) -> None:
+        """Learn how long each phase lasts, to poll fast right before it ends."""
+        now = clock.monotonic()
+        if phase == self._phase:
+            return
+        if self._phase not in (None, "unknown") and self._phase_started_at:
+            self._phase_durations[self._phase] = now - self._phase_started_at
+        self._phase = phase
+        self._phase_started_at = now
+
+    def _near_phase_boundary(self) -> bool:
+        expected = self._phase_durations.get(self._phase) if self._phase else None
+        if not expected:
+            return False
+        elapsed = clock.monotonic() - self._phase_started_at
+        return elapsed >= expected - self._measuring_interval
+
+    def _next_interval(self) -> float:
+        gasera = self.get_latest_gasera_status()
+
+        if not gasera.get("online", False):
+            mode, interval = "offline", self._offline_interval
+            self._offline_interval = min(self._offline_interval * 2, self._offline_max)
+        else:
+            self._offline_interval = self._offline_min
+            if clock.monotonic() < self._fast_until:
+                mode, interval = "fast", self._fast_interval
+            elif gasera.get("status_code") == MEASURING_CODE:
+                if self._near_phase_boundary():
+                    mode, interval = "fast", self._fast_interval
+                else:
+                    mode, interval = "measuring", self._measuring_interval
+            else:
+                mode, interval = "idle", self._idle_interval
 
-    def _update_gasera_phase(self) -> None:
         with self._lock:
-            status = self._latest_device_status.get("gasera", {}).copy()
+            if mode != self._metrics["mode"]:
+                debug(f"[DEVICE] poll mode -> {mode} ({interval}s)")
+            self._metrics["mode"] = mode
+            self._metrics["interval"] = interval
+        return interval
 
-        online = status.get("online", False)
-        code = status.get("status_code")
+    def _poll_once(self) -> None:
+        changed = self._update_gasera_status()
 
-        if online and code == 5:
-            try:
-                meas_status = services.gasera_controller.get_measurement_status()
-                phase = (
-                    meas_status.description
-                    if meas_status and not meas_status.error
-                    else "unknown"
-                )
-            except Exception:
-                phase = "unknown"
+        now = clock.monotonic()
+        with self._lock:
+            self._metrics["polls"] += 1
+            self._metrics["last_poll_at"] = now
+            self._poll_times.append(now)
 
-            with self._lock:
-                self._latest_device_status["gasera"]["phase"] = phase
+        if changed:
+            self._changed()
 
     # Poller lifecycle
     def start_poller(self) -> None:
@@ -120,18 +249,24 @@ class DeviceStatusService:
 
         def _loop():
             while True:
+                # clear before polling: a wake set during the poll triggers the next one
+                self._wake.clear()
                 try:
-                    self._update_usb_status()
-                    self._update_gasera_status()
-                    time.sleep(self._device_poll_interval)
-                    self._update_gasera_phase()
-                    time.sleep(self._device_poll_interval)
-                except Exception:
-                    time.sleep(self._device_poll_interval)
+                    self._poll_once()
+                    interval = self._next_interval()
+                except Exception as e:
+                    with self._lock:
+                        self._metrics["errors"] += 1
+                    warn(f"[DEVICE] poll error: {e}")
+                    interval = self._offline_min
+
+                # expect_transition() cuts the wait short
+                clock.wait(self._wake, interval)
 
         self._poller_thread = threading.Thread(
             target=_loop, name="DeviceStatusPoller", daemon=True
         )
+        clock.register(self._poller_thread)
         self._poller_thread.start()
 
     # Preference callbacks
@@ -140,8 +275,15 @@ class DeviceStatusService:
             with self._lock:
                 self._buzzer_change_pending = bool(value)
                 debug(f"[DEVICE] Buzzer change detected: {value}")
+            self._changed()
 
     def register_callbacks(self) -> None:
+        storage = services.storage_manager
+        if storage is not None:
+            with self._lock:
+                self._latest_usb_mounted = storage.usb_mounted
+            storage.subscribe(self._on_storage_event)
+
         prefs = services.preferences_service
         if prefs is None:
             return
@@ -1,43 +1,198 @@
 # live_status_service.py
 from __future__ import annotations
 import threading
-import time
-from datetime import datetime
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, Optional, Tuple
 
-from system.log_utils import warn, error
+from system.log_utils import debug, warn, error
 from system import services
-from gasera.acquisition.base import BaseAcquisitionEngine, Progress, Phase
+from gasera import clock
+from gasera.acquisition.base import BaseAcquisitionEngine
+from gasera.acquisition.progress import Progress, ProgressPublisher, ProgressSnapshot
+from gasera.live_sample import LiveSample
+from gasera.live_history import LiveHistory
+
+ANALYSIS_PHASE = "Analysis"     # AMST description of the last phase in a cycle
+STALE_RESULT_RETRIES = 5        # ticks to wait for ACON to reflect a new iteration
 
 
 class LiveStatusService:
-    """High-frequency live data service capturing progress and live measurements."""
+    """High-frequency live data service capturing progress and live measurements.
+
+    Results are fetched on demand instead of on a fixed timer:
+    - primary trigger: the AITR iteration counter advancing (iteration N done -> fetch N)
+    - fallback trigger: AMST leaving the Analysis phase (for firmware without AITR)
+    - safety net: a slow periodic fetch, deduplicated by ACON timestamp
+
+    Iteration jumps larger than one are counted as missed results.
+    """
 
-    def __init__(self, update_interval: float = 25.0):
-        self.latest_progress_snapshot: Dict[str, Any] = {"phase": Phase.IDLE, "current_channel": 0, "repeat_index": 0}
-        self.latest_live_data: Dict[str, Any] = {}
+    def __init__(self, poll_interval: float = 1.0, fallback_interval: float = 25.0):
+        self._idle_progress = ProgressPublisher(Progress()).current
+        self.latest_live_sample: Optional[LiveSample] = None
+        self.history = LiveHistory()
+        self._was_running = False
 
         self._lock = threading.RLock()
-        self._update_interval = update_interval
+        self._poll_interval = poll_interval
+        self._fallback_interval = fallback_interval
         self._updater_stop_event = threading.Event()
         self._updater_thread: threading.Thread | None = None
         self._engine = None
 
+        # trigger state (updater thread only)
+        self._last_iteration: Optional[int] = None
+        self._last_gasera_phase: Optional[str] = None
+        self._fetch_pending = False
+        self._stale_retries = 0
+        self._last_result_epoch: Optional[float] = None
+        self._last_fetch_at = clock.monotonic()
+
+        self._metrics: Dict[str, Any] = {
+            "iterations_seen": 0,
+            "results_fetched": 0,
+            "missed_iterations": 0,
+            "stale_fetches": 0,
+            "fetch_errors": 0,
+            "trigger_iteration": 0,
+            "trigger_phase": 0,
+            "trigger_fallback": 0,
+            "last_iteration": None,
+            "last_result_timestamp": None,
+        }
+
     def attach_engine(self, engine: BaseAcquisitionEngine) -> None:
         self._engine = engine
+
+    def get_progress_snapshot(self) -> ProgressSnapshot:
+        """Latest immutable progress snapshot (atomically swapped by the engine)."""
+        engine = self._engine
+        if engine is None:
+            return self._idle_progress
+        return engine.progress_snapshot()
+
+    # ------------------------------------------------------------------
+    # Trigger detection
+    # ------------------------------------------------------------------
+    def _reset_triggers(self) -> None:
+        self._last_iteration = None
+        self._last_gasera_phase = None
+        self._fetch_pending = False
+        self._stale_retries = 0
+        self._last_fetch_at = clock.monotonic()
+
+    def _check_iteration(self) -> Optional[bool]:
+        """Return True if a new iteration completed, False if not, None if AITR is unavailable."""
         try:
-            engine.subscribe_progress_updates(self._on_progress)
+            itr = services.gasera_controller.get_iteration_number()
         except Exception:
-            # subscribe may not be present on all engine implementations
-            pass
+            return None
+
+        if not itr or itr.error or itr.iteration < 0:
+            return None
+
+        current = itr.iteration
+        last = self._last_iteration
+        self._last_iteration = current
+
+        with self._lock:
+            self._metrics["last_iteration"] = current
+
+        if last is None or current < last:
+            # first observation, or counter restarted with a new measurement (STAM)
+            return False
+
+        if current == last:
+            return False
+
+        advanced = current - last
+        with self._lock:
+            self._metrics["iterations_seen"] += advanced
+            if advanced > 1:
+                self._metrics["missed_iterations"] += advanced - 1
+                warn(f"[live] missed {advanced - 1} iteration(s): {last} -> {current}")
+        return True
+
+    def _check_phase_edge(self) -> bool:
+        """Return True when the analyzer leaves the Analysis phase (a result was just produced)."""
+        try:
+            meas = services.gasera_controller.get_measurement_status()
+        except Exception:
+            return False
+
+        if not meas or meas.error:
+            return False
+
+        phase = meas.description
+        last = self._last_gasera_phase
+        self._last_gasera_phase = phase
+        return last == ANALYSIS_PHASE and phase != ANALYSIS_PHASE
+
+    def _poll_triggers(self) -> None:
+        iteration_done = self._check_iteration()
+        if iteration_done:
+            self._fetch_pending = True
+            self._stale_retries = 0
+            with self._lock:
+                self._metrics["trigger_iteration"] += 1
+        elif iteration_done is None and self._check_phase_edge():
+            self._fetch_pending = True
+            self._stale_retries = 0
+            with self._lock:
+                self._metrics["trigger_phase"] += 1
+
+        if not self._fetch_pending and clock.monotonic() - self._last_fetch_at >= self._fallback_interval:
+            self._fetch_pending = True
+            self._stale_retries = STALE_RESULT_RETRIES  # one shot, no retries
+            with self._lock:
+                self._metrics["trigger_fallback"] += 1
+
+    # ------------------------------------------------------------------
+    # Result retrieval
+    # ------------------------------------------------------------------
+    def _fetch_result(self) -> None:
+        self._last_fetch_at = clock.monotonic()
+        sample = services.gasera_controller.get_live_sample()
+        if sample is None:
+            with self._lock:
+                self._metrics["fetch_errors"] += 1
+                self.latest_live_sample = None
+            self._fetch_pending = False
+            return
+
+        if sample.epoch == self._last_result_epoch:
+            # device has not published the new result yet; retry on the next tick
+            self._stale_retries += 1
+            with self._lock:
+                self._metrics["stale_fetches"] += 1
+            if self._stale_retries > STALE_RESULT_RETRIES:
+                self._fetch_pending = False
+            return
+
+        self._fetch_pending = False
+        self._last_result_epoch = sample.epoch
+        with self._lock:
+            self._metrics["results_fetched"] += 1
+            self._metrics["last_result_timestamp"] = sample.epoch
+
+        self._publish_sample(sample)
+
+    def _publish_sample(self, sample: LiveSample) -> None:
+        progress = self.get_progress_snapshot()
+
+        sample = sample.with_context(
+            channel=(progress.current_channel or 0) + 1,
+            repeat=progress.repeat_index or 0,
+            phase=progress.phase,
+        )
 
-    def _on_progress(self, progress: Progress) -> None:
         try:
-            snapshot = progress.to_dict()
+            is_new = self._engine.on_live_data(sample)
             with self._lock:
-                self.latest_progress_snapshot = snapshot
+                self.latest_live_sample = sample if is_new else None
+            if is_new:
+                self.history.append(sample)
         except Exception as e:
-            warn(f"[live] progress update error: {e}")
+            warn(f"[live] on_live_data error: {e}")
 
     def start_background_updater(self) -> None:
         if self._updater_thread and self._updater_thread.is_alive():
@@ -46,60 +201,41 @@ class LiveStatusService:
         def _background_status_updater() -> None:
             while not self._updater_stop_event.is_set():
                 try:
-                    if self._engine and getattr(self._engine, "is_running", lambda: False)():
-                        result = services.gasera_controller.acon_proxy()
-                        if isinstance(result, dict) and result.get("components"):
-                            with self._lock:
-                                progress_snapshot = self.latest_progress_snapshot.copy()
-
-                            # Timestamp selection
-                            if result.get("timestamp") is not None:
-                                ts_epoch = result["timestamp"]
-                                try:
-                                    ts = datetime.fromtimestamp(ts_epoch).strftime("%Y-%m-%d %H:%M:%S")
-                                except Exception:
-                                    ts = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
-                            elif result.get("readable"):
-                                ts = result["readable"]
-                            else:
-                                ts = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
-                                warn(f"[live] No timestamp from device, using local timestamp: {ts}")
-
-                            live_data = {
-                                "timestamp": ts,
-                                "phase": progress_snapshot.get("phase"),
-                                "channel": progress_snapshot.get("current_channel", 0) + 1,
-                                "repeat": progress_snapshot.get("repeat_index", 0),
-                                "components": [
-                                    {
-                                        "label": c["label"],
-                                        "ppm": float(c["ppm"]),
-                                        "color": c["color"],
-                                        "cas": c["cas"],
-                                    }
-                                    for c in result["components"]
-                                ],
-                            }
-
-                            try:
-                                is_new = self._engine.on_live_data(live_data)
-                                with self._lock:
-                                    self.latest_live_data = live_data if is_new else {}
-                            except Exception as e:
-                                warn(f"[live] on_live_data error: {e}")
-                        else:
-                            with self._lock:
-                                self.latest_live_data = {}
+                    running = bool(self._engine and getattr(self._engine, "is_running", lambda: False)())
+                    if running and not self._was_running:
+                        self.history.start_run()
+                    self._was_running = running
+
+                    if running:
+                        self._poll_triggers()
+                        if self._fetch_pending:
+                            self._fetch_result()
+                    else:
+                        if self._last_iteration is not None or self._fetch_pending:
+                            debug("[live] engine idle, resetting result triggers")
+                        self._reset_triggers()
                 except Exception as e:
                     error(f"[live] background updater error: {e}")
-                time.sleep(self._update_interval)
+                clock.wait(self._updater_stop_event, self._poll_interval)
 
         self._updater_thread = threading.Thread(target=_background_status_updater, daemon=True, name="sse-updater")
+        clock.register(self._updater_thread)
         self._updater_thread.start()
 
     def stop_background_updater(self) -> None:
         self._updater_stop_event.set()
 
+    def get_latest_live_sample(self) -> Optional[LiveSample]:
+        with self._lock:
+            return self.latest_live_sample
+
     def get_live_snapshots(self) -> Tuple[Dict[str, Any], Dict[str, Any]]:
         with self._lock:
-            return self.latest_progress_snapshot.copy(), self.latest_live_data.copy()
+            sample = self.latest_live_sample
+        progress = self.get_progress_snapshot().to_dict().copy()
+        # formatting happens here, at the SSE edge (cached on the sample)
+        return progress, (sample.to_dict() if sample is not None else {})
+
+    def get_metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._metrics)
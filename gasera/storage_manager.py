@@ -0,0 +1,213 @@
+# gasera/storage_manager.py
+from __future__ import annotations
+
+import glob
+import os
+import select
+import threading
+from typing import Callable, Dict, List, Optional
+
+from system.log_utils import debug, info, warn
+
+USB_ROOT = "/media/usb0"
+INTERNAL_LOG_DIR = "/data/logs"
+USB_DEVICE_GLOB = "/dev/sd[a-z]1"
+MOUNTINFO_PATH = "/proc/self/mountinfo"
+
+USB_MOUNT = "USB_MOUNT"
+USB_UNMOUNT = "USB_UNMOUNT"
+
+_ESCAPES = (("\\040", " "), ("\\011", "\t"), ("\\012", "\n"), ("\\134", "\\"))
+
+
+def _unescape(field: str) -> str:
+    for raw, char in _ESCAPES:
+        field = field.replace(raw, char)
+    return field
+
+
+def is_stable_path(path: str) -> bool:
+    """
+    False for files that can shrink or vanish while open: anything in a .tmp
+    directory (runs being written, relocated or recovered) or on the USB
+    stick. Readers memory-map only stable files: touching a mapped page past
+    the end of a shrunken file raises SIGBUS, which kills the whole server.
+    """
+    from system import services
+
+    manager = services.storage_manager
+    usb_root = os.path.realpath(manager.usb_root if manager is not None else USB_ROOT)
+    real = os.path.realpath(path)
+    if ".tmp" in real.split(os.sep):
+        return False
+    return os.path.commonpath([real, usb_root]) != usb_root
+
+
+def parse_mountinfo(text: str) -> Dict[str, str]:
+    """
+    Map mount point -> filesystem type from /proc/self/mountinfo.
+    Stacked mounts are listed in mount order, so the last one wins
+    (an ext4 mount on top of a systemd autofs trigger reports ext4).
+    """
+    mounts: Dict[str, str] = {}
+    for line in text.splitlines():
+        fields = line.split(" ")
+        try:
+            sep = fields.index("-")
+            mounts[_unescape(fields[4])] = fields[sep + 1]
+        except (ValueError, IndexError):
+            continue
+    return mounts
+
+
+class StorageManager:
+    """
+    Owns the active log root (USB when mounted, internal otherwise).
+
+    A watcher thread blocks on /proc/self/mountinfo (the kernel flags it
+    with POLLPRI on every mount table change) and rechecks the USB block
+    device every `rescan_interval` seconds, so request handlers and the
+    logger read a cached value instead of probing the filesystem.
+
+    Subscribers are called as cb(event, log_root) with USB_MOUNT/USB_UNMOUNT
+    from the watcher thread; keep them short.
+    """
+
+    def __init__(
+        self,
+        usb_root: str = USB_ROOT,
+        internal_dir: str = INTERNAL_LOG_DIR,
+        rescan_interval: float = 2.0,
+    ):
+        self.usb_root = usb_root
+        self.usb_log_dir = os.path.join(usb_root, "logs")
+        self.internal_dir = internal_dir
+        self.rescan_interval = rescan_interval
+
+        self._lock = threading.Lock()
+        self._usb_mounted = False
+        self._log_root = internal_dir
+        self._ensured: set = set()
+        self._subscribers: List[Callable[[str, str], None]] = []
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+        self.refresh()
+
+    # ------------------------------------------------------------------
+    # Public accessors
+    # ------------------------------------------------------------------
+    @property
+    def usb_mounted(self) -> bool:
+        return self._usb_mounted
+
+    @property
+    def log_root(self) -> str:
+        return self._log_root
+
+    def log_directory(self, temp_dir: bool = False) -> str:
+        """Active log directory (or its .tmp), created once per mount state."""
+        path = self._log_root
+        if temp_dir:
+            path = os.path.join(path, ".tmp")
+        if path not in self._ensured:
+            os.makedirs(path, exist_ok=True)
+            self._ensured.add(path)
+        return path
+
+    def subscribe(self, cb: Callable[[str, str], None]) -> None:
+        with self._lock:
+            self._subscribers.append(cb)
+
+    def unsubscribe(self, cb: Callable[[str, str], None]) -> None:
+        with self._lock:
+            if cb in self._subscribers:
+                self._subscribers.remove(cb)
+
+    # ------------------------------------------------------------------
+    # Detection
+    # ------------------------------------------------------------------
+    def _read_mounts(self) -> Optional[Dict[str, str]]:
+        try:
+            with open(MOUNTINFO_PATH, "r") as f:
+                return parse_mountinfo(f.read())
+        except OSError:
+            return None
+
+    def _probe(self) -> bool:
+        # A stale mount survives an unplugged stick, so the block device must exist too
+        if not glob.glob(USB_DEVICE_GLOB):
+            return False
+
+        mounts = self._read_mounts()
+        if mounts is None:
+            return os.path.ismount(self.usb_root)
+
+        fstype = mounts.get(self.usb_root)
+        if fstype == "autofs":
+            # x-systemd.automount: touching the mount point mounts the drive.
+            # Done here, off the request path, because it can block for a while.
+            os.path.ismount(self.usb_root)
+            fstype = (self._read_mounts() or {}).get(self.usb_root)
+        return fstype is not None and fstype != "autofs"
+
+    def refresh(self) -> Optional[str]:
+        """Re-evaluate the mount state; returns the emitted event, if any."""
+        try:
+            mounted = self._probe()
+        except Exception as e:
+            warn(f"[STORAGE] probe failed: {e}")
+            return None
+
+        with self._lock:
+            if mounted == self._usb_mounted:
+                return None
+            self._usb_mounted = mounted
+            self._log_root = self.usb_log_dir if mounted else self.internal_dir
+            self._ensured.clear()
+            subscribers = list(self._subscribers)
+            root = self._log_root
+
+        event = USB_MOUNT if mounted else USB_UNMOUNT
+        info(f"[STORAGE] {event}: log root -> {root}")
+        for cb in subscribers:
+            try:
+                cb(event, root)
+            except Exception as e:
+                warn(f"[STORAGE] subscriber error: {e}")
+        return event
+
+    # ------------------------------------------------------------------
+    # Watcher lifecycle
+    # ------------------------------------------------------------------
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, daemon=True, name="storage-watcher")
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _watch(self) -> None:
+        poller = None
+        mountinfo = None
+        try:
+            mountinfo = open(MOUNTINFO_PATH, "rb")
+            poller = select.poll()
+            poller.register(mountinfo.fileno(), select.POLLPRI | select.POLLERR)
+        except (OSError, AttributeError) as e:
+            debug(f"[STORAGE] mountinfo watch unavailable ({e}), polling only")
+
+        timeout_ms = int(self.rescan_interval * 1000)
+        try:
+            while not self._stop.is_set():
+                if poller is not None:
+                    poller.poll(timeout_ms)
+                else:
+                    self._stop.wait(self.rescan_interval)
+                self.refresh()
+        finally:
+            if mountinfo is not None:
+                mountinfo.close()
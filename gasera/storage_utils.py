@@ -3,6 +3,10 @@ import shutil
 import glob
 import time
 
+from gasera.column_log import COL_EXT
+from gasera.run_log import RUN_EXT
+from system.log_utils import warn
+
 def get_free_space(path):
     try:
         total, used, free = shutil.disk_usage(path)
@@ -24,12 +28,27 @@ def usb_block_device_exists():
     """
     return len(glob.glob("/dev/sd[a-z]1")) > 0
 
+def _storage_manager():
+    # imported lazily: services pulls in modules that import this one
+    from system import services
+    return services.storage_manager
+
+def _log_catalog():
+    from system import services
+    return services.log_catalog
+
 def usb_mounted():
     """
     Returns True if USB storage is both:
     - physically present as /dev/sdX1
     - mounted at /media/usb0
+
+    Served from the StorageManager cache once it is running.
     """
+    manager = _storage_manager()
+    if manager is not None:
+        return manager.usb_mounted
+
     # Check physical presence first (avoids systemd automount hang)
     dev_present = usb_block_device_exists()
     if not dev_present:
@@ -39,36 +58,11 @@ def usb_mounted():
     usb_path = "/media/usb0"
     return os.path.ismount(usb_path)
 
-_last_usb_state = None
-_latest_usb_mounted = False
-
-def check_usb_change():
-    """
-    Return (usb_mounted, usb_event), where:
-      usb_mounted = current on/off state
-      usb_event = "USB_MOUNT", "USB_UNMOUNT", or None
-    """
-    global _last_usb_state, _latest_usb_mounted
-
-    current_usb = usb_mounted()
-
-    # First-time initialization
-    if _last_usb_state is None:
-        _last_usb_state = current_usb
-        _latest_usb_mounted = current_usb
-        return current_usb, None
-
-    # Detect change
-    if current_usb != _last_usb_state:
-        _latest_usb_mounted = current_usb
-        _last_usb_state = current_usb
-        event = "USB_MOUNT" if current_usb else "USB_UNMOUNT"
-        return current_usb, event
-
-    # No change
-    return current_usb, None
-
 def get_log_directory(temp_dir: bool = False) -> str:
+    manager = _storage_manager()
+    if manager is not None:
+        return manager.log_directory(temp_dir=temp_dir)
+
     log_dir = "/data/logs"
     if usb_mounted():
         log_dir = "/media/usb0/logs"
@@ -82,6 +76,8 @@ def get_log_entries(get_segments: bool = False) -> list:
     """
     Returns completed CSV logs by default.
     If get_segments=True, returns incomplete TSV segment files from .tmp.
+    Run logs (.wal) and columnar logs (.gcl) are listed under the name of
+    their export view (.csv when completed, .tsv while in .tmp).
     Each entry is {name, size, mtime}.
     Sorted: newest → oldest.
     """
@@ -96,8 +92,10 @@ def get_log_entries(get_segments: bool = False) -> list:
         full = os.path.join(logdir, fname)
         if not os.path.isfile(full):
             continue
-        # Only include CSV/TSV logs
-        if not fname.lower().endswith(extension):
+        # Only include CSV/TSV logs and run logs
+        if fname.lower().endswith((RUN_EXT, COL_EXT)):
+            fname = os.path.splitext(fname)[0] + extension
+        elif not fname.lower().endswith(extension):
             continue
 
         try:
@@ -116,10 +114,15 @@ def get_log_entries(get_segments: bool = False) -> list:
     return entries
 
 
-def list_log_files(page=1, page_size=50, get_segments: bool = False) -> dict:
+def list_log_files(page=1, page_size=50, get_segments: bool = False, filters: dict = None) -> dict:
     """
     Paginated logs listing.
-    Returns dict: {"total": int, "files": [...], "page": int, "page_size": int}
+    Completed logs come from the log catalog (indexed, filterable, see
+    LogCatalog.query) once it has been reconciled with the directory;
+    segments, or any listing without a current catalog, from a directory
+    scan, which cannot filter.
+    Returns dict: {"total": int, "files": [...], "page": int, "page_size": int,
+    "filtered": bool}; filtered is False when filters were given but not applied.
     """
     # Sanitize inputs
     try:
@@ -136,10 +139,21 @@ def list_log_files(page=1, page_size=50, get_segments: bool = False) -> dict:
     if page_size <= 0:
         page_size = 50
 
+    start = (page - 1) * page_size
+
+    catalog = _log_catalog()
+    log_dir = get_log_directory()
+    # until reconcile() has run (startup, a freshly mounted stick) the catalog may miss logs
+    if catalog is not None and not get_segments and catalog.is_reconciled(log_dir):
+        try:
+            total, files = catalog.query(log_dir, start, page_size, filters)
+            return {"total": total, "page": page, "page_size": page_size, "files": files, "filtered": True}
+        except Exception as e:
+            warn(f"[CATALOG] query failed, scanning log directory: {e}")
+
     entries = get_log_entries(get_segments=get_segments)
     total = len(entries)
 
-    start = (page - 1) * page_size
     end = start + page_size
     if start >= total:
         start = max(0, (max(1, (total + page_size - 1) // page_size) - 1) * page_size)
@@ -149,19 +163,28 @@ def list_log_files(page=1, page_size=50, get_segments: bool = False) -> dict:
         "total": total,
         "page": page,
         "page_size": page_size,
-        "files": entries[start:end]
+        "files": entries[start:end],
+        # an unfiltered listing must not pass for a filtered one
+        "filtered": not any(v is not None for v in (filters or {}).values()),
     }
 
 
 def safe_join_in_logdir(log_dir, filename):
     """
-    Prevents path traversal. Returns the safe absolute path for a log file.
+    Prevents path traversal. Returns the safe absolute path for a log file,
+    or for the run log (.wal) or columnar log (.gcl) behind an export
+    name (.csv/.tsv).
     Raises FileNotFoundError if file does not exist.
     """
     safe_name = os.path.basename(filename)
     full = os.path.join(log_dir, safe_name)
 
-    if not os.path.isfile(full):
-        raise FileNotFoundError(f"{safe_name} not found")
+    if os.path.isfile(full):
+        return full
+
+    stem = os.path.splitext(full)[0]
+    for ext in (COL_EXT, RUN_EXT):
+        if os.path.isfile(stem + ext):
+            return stem + ext
 
-    return full
+    raise FileNotFoundError(f"{safe_name} not found")
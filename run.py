@@ -3,9 +3,13 @@
 from app import app
 from waitress import serve
 from system.log_utils import info
+from gasera.sse.async_server import SSE_PORT, start_sse_server
+
+# SSE streams and the /system/state long-poll are served from an asyncio loop
+# (nginx routes both paths to port 5002), so idle dashboards and pollers no
+# longer pin Waitress worker threads.
+start_sse_server(host='0.0.0.0', port=SSE_PORT)
 
 info("Serving via Waitress on http://0.0.0.0:5001")
-# Increase thread pool to handle SSE clients + API requests
-# Default is 4 threads, with 3 SSE clients that exhausts the pool
-# Using threads=10 provides headroom for concurrent API requests
-serve(app, host='0.0.0.0', port=5001, threads=10)
+# Waitress threads now only serve short API requests
+serve(app, host='0.0.0.0', port=5001, threads=6)
@@ -54,15 +54,29 @@ def _resp(func: str, err: int, data_tokens: List[str] = None) -> str:
     parts.append(ETX)
     return "".join(parts)
 
+class _WallClock:
+    """Default time source; any object with time()/sleep() can replace it
+    (e.g. gasera.clock.VirtualClock for time-compressed in-process runs)."""
+    def time(self) -> float:
+        return time.time()
+
+    def sleep(self, seconds: float) -> None:
+        time.sleep(seconds)
+
+    def register(self, thread: threading.Thread) -> None:
+        pass
+
 class GaseraSimulator:
     """Stateful simulator matching one-request-per-connection behavior,
     with continuous measurement cycles until STPM is received.
     """
-    def __init__(self):
+    def __init__(self, clock=None):
+        self.clock = clock or _WallClock()
         self._lock = threading.RLock()
         self.device_status = BOOTUP_STATUS  # 2 (idle)
         self.meas_status = 0                # 0 (Idle)
         self.last_results: List[Tuple[int, str, float]] = []  # [(ts, cas, conc)]
+        self.iteration = 0                  # zero-based iteration within current measurement
         self._stop_evt = threading.Event()
         self._meas_thread = None
         # Track online mode (SONL) preference; default disabled.
@@ -77,7 +91,7 @@ class GaseraSimulator:
                 self.meas_status = ms
 
     def _gen_results(self) -> List[Tuple[int, str, float]]:
-        ts = int(time.time())
+        ts = int(self.clock.time())
         values = {
             "74-82-8":  round(random.uniform(0.8, 1.2), 4),      # CH₄
             "124-38-9": round(random.uniform(400, 430), 4),      # CO₂
@@ -96,6 +110,10 @@ class GaseraSimulator:
         with self._lock:
             return _resp("AMST", 0, [str(self.meas_status)])
 
+    def aitr(self) -> str:
+        with self._lock:
+            return _resp("AITR", 0, [str(self.iteration)])
+
     def acon(self) -> str:
         with self._lock:
             if not self.last_results:
@@ -112,7 +130,7 @@ class GaseraSimulator:
             if self.device_status == 5:
                 self.device_status = 7  # cancelling
         def _finalize():
-            time.sleep(0.3)
+            self.clock.sleep(0.3)
             self._set(ds=2, ms=0)  # back to idle
         threading.Thread(target=_finalize, daemon=True).start()
         return _resp("STPM", 0, [])
@@ -125,15 +143,16 @@ class GaseraSimulator:
                     if self._stop_evt.is_set():
                         return
                     self._set(ms=phase)
-                    time.sleep(PHASE_SLEEP)
+                    self.clock.sleep(PHASE_SLEEP)
                 # End of one cycle: produce results (updates timestamp each cycle)
                 results = self._gen_results()
                 with self._lock:
                     self.last_results = results
+                    self.iteration += 1     # iteration N finished, N+1 begins
                     # remain in measuring (device_status=5); next cycle starts immediately/after dwell
                     self.meas_status = 1  # next cycle will set properly at start
                 if CYCLE_DWELL_SEC > 0:
-                    time.sleep(CYCLE_DWELL_SEC)
+                    self.clock.sleep(CYCLE_DWELL_SEC)
         finally:
             # On exit, set to idle if not explicitly cancelled elsewhere
             if self._stop_evt.is_set():
@@ -150,8 +169,10 @@ class GaseraSimulator:
             self._stop_evt.clear()
             self.device_status = 5  # measuring
             self.meas_status = 1    # start with Gas exchange
+            self.iteration = 0
 
         self._meas_thread = threading.Thread(target=self._run_measurement_loop, daemon=True)
+        self.clock.register(self._meas_thread)
         self._meas_thread.start()
         return _resp("STAM", 0, [])
 
@@ -178,54 +199,65 @@ def parse_command(line: str):
         data = parts[1:]
     return func, channel, data
 
+# ---------- Request dispatch ----------
+def dispatch(sim: GaseraSimulator, data: str) -> str:
+    """One framed request (STX ... ETX) -> framed response."""
+    if STX not in data or ETX not in data:
+        return _resp("UNKN", 1, [])
+    start = data.find(STX)
+    end = data.find(ETX, start + 1)
+    payload = data[start + 1:end].strip()
+
+    func, channel, tokens = parse_command(payload)
+    if not func:
+        return _resp("UNKN", 1, [])
+    if func == "ASTS":
+        return sim.asts()
+    if func == "AMST":
+        return sim.amst()
+    if func == "ACON":
+        return sim.acon()
+    if func == "AITR":
+        return sim.aitr()
+    if func == "STPM":
+        return sim.stpm()
+    if func == "STAM":
+        if not tokens:
+            return _resp("STAM", 1, [])  # missing task id
+        return sim.stam(tokens[0])
+    if func == "SONL":
+        if not tokens:
+            return _resp("SONL", 1, [])  # missing argument
+        return sim.sonl(tokens[0])
+    return _resp(func, 1, [])  # unsupported
+
+class InProcessClient:
+    """Drop-in for GaseraTCPClient (send_command) that calls the simulator
+    directly: no sockets, no jitter, for in-process runs on a virtual clock."""
+    def __init__(self, sim: GaseraSimulator):
+        self.sim = sim
+        self.on_status_change = None  # compat with GaseraTCPClient
+
+    def send_command(self, command: str) -> str:
+        return dispatch(self.sim, command)
+
 # ---------- One-request-per-connection handler ----------
 def handle_client(conn: socket.socket, addr, sim: GaseraSimulator):
     try:
         data = conn.recv(4096).decode(errors="ignore")
         if not data:
             return
-        if STX not in data or ETX not in data:
-            conn.sendall(_resp("UNKN", 1, []).encode())
-            return
-        start = data.find(STX)
-        end = data.find(ETX, start + 1)
-        payload = data[start + 1:end].strip()
-
-        func, channel, tokens = parse_command(payload)
-        if not func:
-            resp = _resp("UNKN", 1, [])
-        else:
-            if func == "ASTS":
-                resp = sim.asts()
-            elif func == "AMST":
-                resp = sim.amst()
-            elif func == "ACON":
-                resp = sim.acon()
-            elif func == "STPM":
-                resp = sim.stpm()
-            elif func == "STAM":
-                if not tokens:
-                    resp = _resp("STAM", 1, [])  # missing task id
-                else:
-                    resp = sim.stam(tokens[0])
-            elif func == "SONL":
-                if not tokens:
-                    resp = _resp("SONL", 1, [])  # missing argument
-                else:
-                    resp = sim.sonl(tokens[0])
-            else:
-                resp = _resp(func, 1, [])  # unsupported
-        conn.sendall(resp.encode())
+        conn.sendall(dispatch(sim, data).encode())
     finally:
         conn.close()  # short-lived connection
 
-def start_server():
-    sim = GaseraSimulator()
+def start_server(sim: GaseraSimulator = None, host: str = HOST, port: int = PORT):
+    sim = sim or GaseraSimulator()
     with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
         s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        s.bind((HOST, PORT))
+        s.bind((host, port))
         s.listen(8)
-        print(f"[SIMULATOR] Listening on {HOST}:{PORT} | PHASE_TOTAL_SEC={PHASE_TOTAL_SEC:.3f}s "
+        print(f"[SIMULATOR] Listening on {host}:{port} | PHASE_TOTAL_SEC={PHASE_TOTAL_SEC:.3f}s "
               f"(~{PHASE_SLEEP:.3f}s/phase) | CYCLE_DWELL_SEC={CYCLE_DWELL_SEC:.3f}s")
         while True:
             conn, addr = s.accept()
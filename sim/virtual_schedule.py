@@ -0,0 +1,231 @@
+"""
+Run a full MUX schedule against the simulator on a VirtualClock and check
+its timing. A 31-channel x 10-repeat schedule (days of device time) takes
+seconds to a few minutes of wall time.
+
+The real engine, device status poller, live status service, logger and
+simulator run in-process; only the mux hardware is replaced by a recorder
+and the TCP link by InProcessClient. Checks:
+  - every home/step happens exactly pause + measure + settle after the last
+  - the run takes the engine's own estimate (+ the start/stop settle times)
+  - every channel is logged, with the expected number of rows, in time order
+
+Usage (from the repository root):
+    python sim/virtual_schedule.py [--channels 31] [--repeats 10]
+                                   [--measure 300] [--pause 300]
+Exits 1 when a check fails.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "sim"))
+
+from server import CYCLE_DWELL_SEC, PHASE_TOTAL_SEC, GaseraSimulator, InProcessClient  # noqa: E402
+
+from gasera import clock  # noqa: E402
+from system import services  # noqa: E402
+from system import log_utils  # noqa: E402
+
+START_EPOCH = 1_700_000_000.0
+POLL_SEC = 1.0          # how often the main thread looks at the engine (simulated)
+ROW_TOLERANCE = 0.15    # allowed deviation of per-channel row counts
+
+
+class _SilentBuzzer:
+    def play(self, *args, **kwargs):
+        pass
+
+
+class _RecordingMux:
+    """MotionInterface that records (simulated time, action) instead of driving hardware."""
+
+    def __init__(self):
+        self.events = []
+        self._pos = 0
+
+    def home(self, unit_id=None):
+        self._pos = 0
+        self.events.append((clock.monotonic(), "home"))
+
+    def step(self, unit_id=None):
+        self._pos += 1
+        self.events.append((clock.monotonic(), "step"))
+
+    def reset(self, unit_id=None):
+        pass
+
+    def state(self, unit_id=None):
+        return {"status": "idle", "action": None, "position": self._pos}
+
+
+def _setup(work_dir: str, args):
+    from gasera.acquisition.mux import MuxAcquisitionEngine
+    from gasera.controller import GaseraController
+    from gasera.sse.device_status_service import DeviceStatusService
+    from gasera.sse.live_status_service import LiveStatusService
+    from gasera.storage_manager import StorageManager
+    from system.preferences import Preferences
+
+    services.preferences_service = Preferences(os.path.join(work_dir, "user_prefs.json"))
+    services.preferences_service.update_from_dict({
+        "measurement_duration": args.measure,
+        "pause_seconds": args.pause,
+        "repeat_count": args.repeats,
+        "include_channels": [1] * args.channels,
+        "measurement_start_mode": "per_cycle",
+        "buzzer_enabled": False,
+    })
+    services.buzzer_service = _SilentBuzzer()
+    services.storage_manager = StorageManager(
+        usb_root=os.path.join(work_dir, "usb"),
+        internal_dir=os.path.join(work_dir, "logs"),
+    )
+
+    sim = GaseraSimulator(clock=clock.get_clock())
+    services.gasera_controller = GaseraController(InProcessClient(sim))
+
+    # adaptive poller: fast/measuring/idle windows run on the virtual clock too
+    services.device_status_service = DeviceStatusService()
+    services.device_status_service.start_poller()
+
+    mux = _RecordingMux()
+    engine = MuxAcquisitionEngine(mux)
+    services.engine_service = engine
+
+    services.live_status_service = LiveStatusService(poll_interval=args.poll)
+    services.live_status_service.attach_engine(engine)
+    services.live_status_service.start_background_updater()
+    return engine, mux
+
+
+def _wait_device_online(timeout: float = 30.0) -> bool:
+    deadline = clock.monotonic() + timeout
+    while clock.monotonic() < deadline:
+        if services.device_status_service.get_latest_gasera_status().get("online"):
+            return True
+        clock.sleep(0.5)
+    return False
+
+
+def _check_motion(mux: _RecordingMux, args, settle: float, failures: list) -> None:
+    homes = sum(1 for _, action in mux.events if action == "home")
+    steps = sum(1 for _, action in mux.events if action == "step")
+    if homes != args.repeats or steps != args.repeats * (args.channels - 1):
+        failures.append(f"motion: {homes} homes / {steps} steps, expected "
+                        f"{args.repeats} / {args.repeats * (args.channels - 1)}")
+
+    # home -> step -> ... -> next home: one channel slot apart each
+    slot = args.pause + args.measure + settle
+    gaps = [b[0] - a[0] for a, b in zip(mux.events, mux.events[1:])]
+    worst = max((abs(g - slot) for g in gaps), default=0.0)
+    print(f"  motion:   {homes} homes, {steps} steps, slot {slot:.1f} s, worst deviation {worst:.6f} s")
+    if worst > 1e-3:
+        failures.append(f"motion: slot deviates by {worst:.6f} s")
+
+
+def _check_log(work_dir: str, args, settle: float, failures: list) -> None:
+    from gasera.log_reader import LogReader
+    from gasera.run_log import RUN_EXT
+
+    log_dir = os.path.join(work_dir, "logs")
+    logs = [f for f in os.listdir(log_dir) if f.endswith(RUN_EXT)]
+    if len(logs) != 1:
+        failures.append(f"log: expected one run log, found {logs}")
+        return
+
+    counts = {}
+    last_epoch = None
+    ordered = True
+    with LogReader(os.path.join(log_dir, logs[0])) as reader:
+        for chunk in reader.chunks():
+            for epoch, channel in zip(chunk.timestamp, chunk.channel):
+                counts[channel] = counts.get(channel, 0) + 1
+                ordered = ordered and (last_epoch is None or epoch >= last_epoch)
+                last_epoch = epoch
+
+    cycle = PHASE_TOTAL_SEC + CYCLE_DWELL_SEC
+    expected = args.repeats * (args.pause + args.measure + settle) / cycle
+    low, high = min(counts.values(), default=0), max(counts.values(), default=0)
+    print(f"  log:      {sum(counts.values())} rows, {len(counts)} channels, "
+          f"{low}..{high} rows/channel (expected ~{expected:.0f})")
+    if sorted(counts) != list(range(1, args.channels + 1)):
+        failures.append(f"log: channels {sorted(counts)}")
+    if abs(low - expected) > expected * ROW_TOLERANCE or abs(high - expected) > expected * ROW_TOLERANCE:
+        failures.append(f"log: {low}..{high} rows per channel, expected ~{expected:.0f}")
+    if not ordered:
+        failures.append("log: timestamps out of order")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--channels", type=int, default=31)
+    parser.add_argument("--repeats", type=int, default=10)
+    parser.add_argument("--measure", type=int, default=300, help="measure seconds per channel")
+    parser.add_argument("--pause", type=int, default=300, help="pause seconds per channel")
+    parser.add_argument("--poll", type=float, default=1.0, help="live status poll interval (simulated s)")
+    parser.add_argument("--keep", action="store_true", help="keep the work directory")
+    parser.add_argument("--verbose", action="store_true", help="keep service logging")
+    args = parser.parse_args()
+
+    if not args.verbose:
+        log_utils.set_level("WARNING")
+
+    from gasera.acquisition.base import GASERA_CMD_SETTLE_TIME, SWITCHING_SETTLE_TIME
+
+    work_dir = tempfile.mkdtemp(prefix="gasera-virtual-")
+    clock.set_clock(clock.VirtualClock(start_epoch=START_EPOCH))
+    clock.register()    # the main thread takes part in the schedule
+
+    engine, mux = _setup(work_dir, args)
+    if not _wait_device_online():
+        print("simulator did not come online")
+        return 1
+
+    wall0 = time.monotonic()
+    t0 = clock.monotonic()
+    ok, msg = engine.start()
+    if not ok:
+        print(f"engine did not start: {msg}")
+        return 1
+    estimate = engine.estimate_total_time_seconds()
+    while engine.is_running():
+        clock.sleep(POLL_SEC)
+    simulated = clock.monotonic() - t0
+    wall = time.monotonic() - wall0
+
+    # SONL + STAM settle before the run, STPM settle after it
+    expected = estimate + 3 * GASERA_CMD_SETTLE_TIME
+    print(f"schedule: {args.channels} channels x {args.repeats} repeats, "
+          f"pause {args.pause} s, measure {args.measure} s")
+    print(f"  duration: {simulated:.1f} s simulated ({simulated / 3600:.1f} h) in {wall:.1f} s wall, "
+          f"expected {expected:.1f} s")
+
+    polls = services.device_status_service.get_metrics()["polls"]
+    print(f"  poller:   {polls} device polls ({simulated / max(polls, 1):.1f} s apart on average)")
+
+    failures = []
+    if abs(simulated - expected) > POLL_SEC:
+        failures.append(f"duration: {simulated:.1f} s, expected {expected:.1f} s")
+    _check_motion(mux, args, SWITCHING_SETTLE_TIME, failures)
+    _check_log(work_dir, args, SWITCHING_SETTLE_TIME, failures)
+
+    if args.keep:
+        print(f"  work dir: {work_dir}")
+    else:
+        import shutil
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    print("OK" if not failures else f"{len(failures)} check(s) failed")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
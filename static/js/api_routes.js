@@ -6,6 +6,9 @@ API_PATHS = {
         "finish": "/gasera/api/measurement/finish",
         "events": "/gasera/api/measurement/events"
     },
+    "live": {
+        "history": "/gasera/api/live/history"
+    },
     "logs": {
         "list": "/gasera/api/logs",
         "download": "/gasera/api/logs/",
@@ -25,7 +28,8 @@ API_PATHS = {
         "rollback": "/system/version/rollback"
     },
     "gasera": {
-        "gas_colors": "/gasera/api/gas_colors"
+        "gas_colors": "/gasera/api/gas_colors",
+        "components": "/gasera/api/components"
     },
     "motion" : {
         "status": "/motion/status",
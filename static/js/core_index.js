@@ -246,15 +246,54 @@ function hideFetchError() {
 // ---------------------------------------------------------------------
 // SSE Setup
 // ---------------------------------------------------------------------
+let lastSSEEventId = null;
+
+// ---------------------------------------------------------------------
+// Component table: live_data carries ids/ppm arrays, metadata is fetched once
+// ---------------------------------------------------------------------
+window.GaseraComponents = {
+    version: null,
+    byId: new Map(),
+    async load() {
+        const res = await fetch(API_PATHS?.gasera?.components);
+        const data = await res.json();
+        this.byId = new Map(data.components.map(c => [c.id, c]));
+        this.version = data.version;
+    },
+    async expand(ld) {
+        if (!ld?.ids) return;
+        if (ld.components_version !== this.version || ld.ids.some(id => !this.byId.has(id))) {
+            await this.load();
+        }
+        // consumers keep the {label, color, cas, ppm} shape
+        ld.components = ld.ids.map((id, i) => {
+            const c = this.byId.get(id) || { label: String(id), color: null, cas: null };
+            return { label: c.label, color: c.color, cas: c.cas, ppm: ld.ppm[i] };
+        });
+    }
+};
+
+let sseChain = Promise.resolve();   // keeps messages in order while the table loads
+
 function startGaseraSSE() {
     if (window.gaseraSSE) try { window.gaseraSSE.close(); } catch { }
-    window.gaseraSSE = new EventSource(API_PATHS?.measurement?.events);
+
+    // resume where we left off; the server replays missed events (or sends a snapshot)
+    let url = API_PATHS?.measurement?.events;
+    if (lastSSEEventId) url += `?last_event_id=${encodeURIComponent(lastSSEEventId)}`;
+    window.gaseraSSE = new EventSource(url);
 
     window.gaseraSSE.onmessage = e => {
+        if (e.lastEventId) lastSSEEventId = e.lastEventId;
+        let data;
         try {
-            const data = JSON.parse(e.data || "{}");
-            window.GaseraHub.emit(data);
-        } catch (err) { console.error("[SSE] parse error", err); }
+            data = JSON.parse(e.data || "{}");
+        } catch (err) { console.error("[SSE] parse error", err); return; }
+
+        sseChain = sseChain
+            .then(() => data.live_data ? window.GaseraComponents.expand(data.live_data) : null)
+            .catch(err => console.error("[SSE] component table", err))
+            .then(() => window.GaseraHub.emit(data));
     };
 
     window.gaseraSSE.onerror = () => {
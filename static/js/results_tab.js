@@ -439,12 +439,36 @@ async function chartLoadCSVSeries(filename) {
 // Expose globally for logs panel
 window.chartLoadCSVSeries = chartLoadCSVSeries;
 
+// Fill the live chart with the current run's samples (columnar history API)
+async function backfillLiveChart() {
+  try {
+    const res = await fetch(API_PATHS?.live?.history);
+    if (!res.ok) return;
+    const h = await res.json();
+    if (!h.ok || !h.count) return;
+
+    const rows = h.timestamp.map((ts, i) => ({
+      timestamp: ts,
+      phase: h.phase[i],
+      channel: h.channel[i],
+      repeat: h.repeat[i],
+      components: h.components
+        .filter(c => c.ppm[i] !== null)
+        .map(c => ({ label: c.label, color: c.color, cas: c.cas, ppm: c.ppm[i] })),
+    }));
+    if (window.chartMode === "live") updateChartWithWideRows(rows);
+  } catch (err) {
+    console.warn("[results_livechart] history backfill failed", err);
+  }
+}
+
 function switchToLiveMode() {
   window.chartMode = "live";
   window.currentCSV = null;
   setChartModeUI("live");
   resetChart();
   window.liveChart.resetZoom();
+  backfillLiveChart();
 }
 
 function onSSEEvent(ev) {
@@ -468,4 +492,5 @@ document.addEventListener("DOMContentLoaded", async () => {
   renderTrackToggles();
   // console.log("[results_livechart] Subscribed to SSE for live updates");
   setChartModeUI("live");
+  backfillLiveChart();
 });
@@ -58,6 +58,21 @@ def init_display_stack():
     services.display_controller = DisplayController(driver)
     services.display_adapter = DisplayAdapter(services.display_controller)
 
+def init_storage_manager():
+    from gasera.storage_manager import StorageManager
+    services.storage_manager = StorageManager()
+    services.storage_manager.start()
+
+def init_merge_worker():
+    from gasera.merge_worker import MergeWorker
+    services.merge_worker = MergeWorker()
+    services.merge_worker.start()
+
+def init_log_catalog():
+    from gasera.log_catalog import LogCatalog
+    services.log_catalog = LogCatalog()
+    services.storage_manager.subscribe(services.log_catalog.on_storage_event)
+
 def init_device_status_service():
     from gasera.sse.device_status_service import DeviceStatusService
     services.device_status_service = DeviceStatusService()
@@ -222,6 +237,26 @@ def init_acquisition_engine():
     services.engine_actions = EngineActions(services.engine_service)
     init_trigger()
 
+def init_task_queue():
+    from gasera.acquisition.task_queue import TaskQueue
+
+    engine = services.engine_service
+    services.task_queue = TaskQueue(max_channels=getattr(engine, "TOTAL_CHANNELS", None))
+
+    if engine is not None and engine.supports_task_queue:
+        engine.task_queue = services.task_queue
+
+def start_task_scheduler():
+    # last: a task left pending before a reboot may start right away, and its
+    # events must reach the live status service, the display and the SSE broker
+    engine = services.engine_service
+    if services.task_queue is not None and engine is not None and engine.supports_task_queue:
+        services.task_queue.start_scheduler(
+            is_running=engine.is_running,
+            start=services.engine_actions.start,
+        )
+        info("[DEVICE] Task queue scheduler started")
+
 def init_live_status_service():
     from gasera.sse.live_status_service import LiveStatusService
     services.live_status_service = LiveStatusService()
@@ -239,6 +274,11 @@ def init_motion_status_service():
     from gasera.sse.motion_status_service import MotionStatusService
     services.motion_status_service = MotionStatusService()
 
+def init_sse_broker():
+    from gasera.sse.broker import SseBroker
+    services.sse_broker = SseBroker()
+    services.sse_broker.start()
+
 def init_version_manager():
     from system.version_manager import VersionManager
     services.version_manager = VersionManager()
@@ -253,14 +293,20 @@ def init_all_services(target_ip: str):
 
     init_buzzer_service()
     init_display_stack()
+    init_storage_manager()
+    init_merge_worker()
+    init_log_catalog()
     init_device_status_service()
 
     init_gasera_controller(target_ip)
     init_acquisition_engine()
+    init_task_queue()
 
     init_live_status_service()
     init_live_display_services()
     init_motion_status_service()
+    init_sse_broker()
 
     init_version_manager()
     start_display_thread()
+    start_task_scheduler()
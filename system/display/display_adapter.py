@@ -1,6 +1,6 @@
 # system/display_adapter.py
 
-from gasera.acquisition.base import Progress
+from gasera.acquisition.progress import ProgressSnapshot
 from system.display.display_state import DisplayState
 from system.display.display_controller import DisplayController
 from gasera.acquisition.base import BaseAcquisitionEngine as AcquisitionEngine
@@ -12,11 +12,11 @@ from gasera.acquisition.progress_view import ProgressView
 
 class DisplayAdapter:
     """
-    Converts Progress snapshots into DisplayState.
+    Converts ProgressSnapshot objects into DisplayState.
     ALL semantics live here.
     """
     def __init__(self, controller: DisplayController):
-        self._last_progress: Progress | None = None
+        self._last_progress: ProgressSnapshot | None = None
         self._controller = controller
         self._controller.set_idle_callback(self._idle)
         self._controller.set_refresh_callback(self._refresh, interval_seconds=10.0)
@@ -55,11 +55,14 @@ class DisplayAdapter:
     # ------------------------------------------------------------------
     # Progress = content updates ONLY
     # ------------------------------------------------------------------
-    def from_progress(self, p: Progress) -> None:
+    def from_progress(self, p: ProgressSnapshot) -> None:
         """
         Progress updates text inside the current screen.
         Must NOT change screen identity.
         """
+        last = self._last_progress
+        if last is not None and not p.changed_since(last.version):
+            return
         self._last_progress = p
 
         if not self._controller.current:
@@ -162,7 +165,7 @@ class DisplayAdapter:
     # ------------------------------------------------------------------
     # Progress → content (engine-specific)
     # ------------------------------------------------------------------
-    def _motor_content(self, p: Progress) -> DisplayState:
+    def _motor_content(self, p: ProgressSnapshot) -> DisplayState:
         pv = ProgressView(p)
         lines = []
         if pv:
@@ -179,7 +182,7 @@ class DisplayAdapter:
             lines=lines,
         )
 
-    def _mux_content(self, p: Progress) -> DisplayState:
+    def _mux_content(self, p: ProgressSnapshot) -> DisplayState:
         pv = ProgressView(p)
         lines = []
         if pv:
@@ -1,15 +1,94 @@
-import os, re, shutil
+import os, re
 from datetime import datetime
 from collections import defaultdict
 
+from gasera.fastcopy import copy_into
+from gasera.log_index import remove_index
+from gasera.run_log import RUN_EXT, join_parts, recover_tail
 from gasera.storage_utils import get_log_directory
 from system.log_utils import debug, warn, info
 
 
 SEGMENT_RE = re.compile(r"^segment_([A-Fa-f0-9]{6})_(\d{3})\.tsv$")
+RUN_PART_RE = re.compile(r"^(gasera_log_\d{8}_\d{6}_[A-Fa-f0-9]{6}(?:_MIRROR)?)(?:\.(\d{2}))?\.wal$")
 
 
-def recover_incomplete_segments():
+def recover_incomplete_segments() -> int:
+    """Recover everything left in .tmp; returns bytes copied (renames cost none)."""
+    return recover_incomplete_run_logs() + _recover_legacy_segments()
+
+
+def recover_incomplete_run_logs() -> int:
+    """
+    Publish run logs left in .tmp by a crash or power cut. Only the tail
+    after each part's last checkpoint is verified (and truncated if torn);
+    a single-part run is then renamed, never copied.
+    """
+    base_dir = get_log_directory()
+    tmp_dir = get_log_directory(temp_dir=True)
+
+    names = os.listdir(tmp_dir)
+
+    # recovery runs on the merge worker, so a task may already be logging;
+    # checked after listing, a run started since is either active or unlisted
+    active = _active_task_names()
+
+    runs = defaultdict(list)
+    for name in names:
+        m = RUN_PART_RE.match(name)
+        if m and m.group(1) not in active:
+            runs[m.group(1)].append((int(m.group(2) or 0), name))
+
+    if not runs:
+        debug("[LOGGER] no incomplete run logs found to recover")
+        return 0
+
+    info(f"[LOGGER] found {len(runs)} incomplete run log(s) to recover")
+
+    copied = 0
+    for task_name, items in runs.items():
+        items.sort()
+        paths = [os.path.join(tmp_dir, name) for _, name in items]
+        target = os.path.join(base_dir, f"{task_name}_RECOVERED{RUN_EXT}")
+
+        try:
+            rows = 0
+            for path in paths:
+                remove_index(path)  # rebuilt for the recovered file on first use
+                part_rows, cut = recover_tail(path)
+                rows += part_rows
+                if cut:
+                    warn(f"[LOGGER] {os.path.basename(path)}: dropped {cut} bytes of torn tail")
+
+            if len(paths) == 1:
+                os.replace(paths[0], target)
+            else:
+                _, n = join_parts([(p, None) for p in paths], target)
+                copied += n
+                for path in paths:
+                    os.remove(path)
+        except Exception as e:
+            warn(f"[LOGGER] failed to recover {task_name}: {e}")
+            warn("[LOGGER] leaving run log intact")
+            continue
+
+        info(f"[LOGGER] recovered {task_name} ({rows} rows) to {target}")
+
+    return copied
+
+
+def _active_task_names() -> set:
+    from system import services
+
+    writer = getattr(services.engine_service, "logger", None)
+    if writer is None:
+        return set()
+    loggers = [writer.primary, writer.mirror]
+    return {lg.task_name for lg in loggers if lg is not None}
+
+
+def _recover_legacy_segments() -> int:
+    """TSV segments written by loggers before the run log format."""
     base_dir = get_log_directory()
     tmp_dir = get_log_directory(temp_dir=True)
 
@@ -26,10 +105,12 @@ def recover_incomplete_segments():
 
     if not groups:
         debug("[LOGGER] no incomplete segments found to recover")
-        return
+        return 0
 
     info(f"[LOGGER] found {len(groups)} incomplete run(s) to recover")
 
+    copied = 0
+
     # 2) recover each run separately
     for run_id, items in groups.items():
         items.sort(key=lambda x: x[0])  # order by segment index
@@ -46,11 +127,10 @@ def recover_incomplete_segments():
         )
 
         try:
-            with open(target, "w", newline="") as out:
+            with open(target, "wb") as out:
                 for _, name in items:
-                    path = os.path.join(tmp_dir, name)
-                    with open(path, "r") as src:
-                        shutil.copyfileobj(src, out)
+                    n, _ = copy_into(out.fileno(), os.path.join(tmp_dir, name))
+                    copied += n
 
         except Exception as e:
             warn(f"[LOGGER] failed to recover run {run_id}: {e}")
@@ -69,3 +149,5 @@ def recover_incomplete_segments():
                 pass
 
         info(f"[LOGGER] recovery complete for run {run_id}")
+
+    return copied
@@ -13,6 +13,15 @@ class MotorActuatorMode(str, Enum):
     MOTOR_0_ONLY = "motor_0_only"
     MOTOR_1_ONLY = "motor_1_only"
 
+class LogDurability(str, Enum):
+    PER_ROW = "per_row"     # fsync after every row
+    GROUP = "group"         # fsync every N rows or T seconds
+    CHECKPOINT = "checkpoint"   # fsync only at run log checkpoints
+
+class LogFormat(str, Enum):
+    TEXT = "text"           # completed runs stay run logs (.wal)
+    BINARY = "binary"       # completed runs are compacted to columnar logs (.gcl)
+
 # --- Channel State Constants ---
 class ChannelState:
     """Channel state values for include_channels preference."""
@@ -32,7 +41,12 @@ VALID_PREF_KEYS = [
         "simulator_enabled",
         "motor_timeout",
         "measurement_start_mode",
-        "motor_actuator_mode"
+        "motor_actuator_mode",
+        "log_durability",
+        "log_commit_rows",
+        "log_commit_seconds",
+        "log_mirror_internal",
+        "log_format"
     ]
 
 KEY_MEASUREMENT_DURATION    = VALID_PREF_KEYS[0]
@@ -46,6 +60,11 @@ KEY_SIMULATOR_ENABLED       = VALID_PREF_KEYS[7]
 KEY_MOTOR_TIMEOUT           = VALID_PREF_KEYS[8]
 KEY_MEASUREMENT_START_MODE  = VALID_PREF_KEYS[9]
 KEY_MOTOR_ACTUATOR_MODE     = VALID_PREF_KEYS[10]
+KEY_LOG_DURABILITY          = VALID_PREF_KEYS[11]
+KEY_LOG_COMMIT_ROWS         = VALID_PREF_KEYS[12]
+KEY_LOG_COMMIT_SECONDS      = VALID_PREF_KEYS[13]
+KEY_LOG_MIRROR_INTERNAL     = VALID_PREF_KEYS[14]
+KEY_LOG_FORMAT              = VALID_PREF_KEYS[15]
 
 DEFAULT_INCLUDE_COUNT = 31  # default number of channels to include
 
@@ -60,6 +79,11 @@ DEFAULTS = {
     KEY_SIMULATOR_ENABLED       : True,
     KEY_MEASUREMENT_START_MODE  : MeasurementStartMode.PER_CYCLE,
     KEY_MOTOR_ACTUATOR_MODE     : MotorActuatorMode.BOTH,
+    KEY_LOG_DURABILITY          : LogDurability.PER_ROW,
+    KEY_LOG_COMMIT_ROWS         : 20,
+    KEY_LOG_COMMIT_SECONDS      : 10.0,
+    KEY_LOG_MIRROR_INTERNAL     : False,
+    KEY_LOG_FORMAT              : LogFormat.TEXT,
     KEY_INCLUDE_CHANNELS        : [True] * DEFAULT_INCLUDE_COUNT,
     KEY_TRACK_VISIBILITY        : {
         "Acetaldehyde (CH\u2083CHO)": True,
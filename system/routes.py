@@ -100,6 +100,42 @@ def version_rollback():
         warn(f"[VERSION] Rollback failed: {e}")
         return jsonify({"status": "error", "error": str(e)}), 400
 
+# ----------------------------------------------------------------------
+# Long-poll state (for clients that cannot hold an SSE stream)
+# ----------------------------------------------------------------------
+@system_bp.route("/state", methods=["GET"])
+def get_state() -> tuple[Response, int]:
+    """
+    Combined progress/device/motion/live/queue state with a version number.
+    - ?since=<version> (or If-None-Match: <etag>): only topics changed after
+      it are returned (?topics= filters them), 304 when there are none
+    - an unknown version (other boot, newer than the current one) gets the full state
+    Answers at once: the blocking long-poll is served by the async server
+    (gasera/sse/async_server.py), so it never holds a Waitress thread.
+    """
+    from gasera.sse.broker import parse_topics
+
+    broker = services.sse_broker
+    try:
+        topics = parse_topics(request.args.get("topics"))
+    except ValueError as e:
+        return jsonify({"ok": False, "error": str(e)}), 400
+
+    since = request.args.get("since", type=int)
+    if since is None:
+        since = broker.parse_version(request.headers.get("If-None-Match"))
+
+    seq, body = broker.state_since(since, topics)
+    if body is None:
+        resp = Response(status=304)
+        resp.headers["ETag"] = broker.etag(seq)
+        return resp, 304
+
+    resp = Response(body, mimetype="application/json")
+    resp.headers["ETag"] = broker.etag(seq)
+    resp.headers["Cache-Control"] = "no-cache"
+    return resp, 200
+
 # ----------------------------------------------------------------------
 # GET current preferences
 # ----------------------------------------------------------------------
@@ -5,10 +5,15 @@ from gasera.motion.iface import MotionInterface
 from gasera.sse.device_status_service import DeviceStatusService
 from gasera.sse.live_status_service import LiveStatusService
 from gasera.sse.motion_status_service import MotionStatusService
+from gasera.sse.broker import SseBroker
+from gasera.storage_manager import StorageManager
+from gasera.merge_worker import MergeWorker
+from gasera.log_catalog import LogCatalog
 from system.gpio.gpio_control import GPIOController
 from gasera.controller import GaseraController
 from system.buzzer.buzzer_facade import BuzzerFacade
 from gasera.acquisition.base import BaseAcquisitionEngine
+from gasera.acquisition.task_queue import TaskQueue
 from system.display.display_adapter import DisplayAdapter
 from system.display.display_controller import DisplayController
 from system.preferences import Preferences
@@ -28,6 +33,12 @@ display_controller: DisplayController = None
 
 display_adapter: DisplayAdapter = None
 
+storage_manager: StorageManager = None
+
+merge_worker: MergeWorker = None
+
+log_catalog: LogCatalog = None
+
 device_status_service: DeviceStatusService = None
 
 motion_service: MotionInterface = None
@@ -39,9 +50,13 @@ gasera_controller: GaseraController = None
 live_status_service: LiveStatusService = None
  
 motion_status_service: MotionStatusService = None
+
+sse_broker: SseBroker = None
  
 version_manager: VersionManager = None
 
 motion_actions: MotionActions = None
 
 engine_actions: EngineActions = None
+
+task_queue: TaskQueue = None